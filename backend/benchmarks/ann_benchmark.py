@@ -0,0 +1,88 @@
+"""
+Recall vs latency benchmark for the consultant vector index backends.
+
+Builds every configured index type over the same vectors, uses exact search
+(``flat``) as ground truth and reports recall@k, p50/p99 single-query latency,
+build time and serialized index size.
+
+    python -m backend.benchmarks.ann_benchmark --n 200000
+    python -m backend.benchmarks.ann_benchmark --source db
+"""
+import argparse
+import time
+import numpy as np
+from backend.services.vector_index import VectorIndex
+
+# (label, index type, parameter overrides)
+CONFIGS = [
+    ("ivf_flat nprobe=8", "ivf_flat", {"nprobe": 8}),
+    ("ivf_flat nprobe=32", "ivf_flat", {"nprobe": 32}),
+    ("ivf_pq nprobe=16", "ivf_pq", {"nprobe": 16}),
+    ("ivf_pq nprobe=64", "ivf_pq", {"nprobe": 64}),
+    ("hnsw ef=32", "hnsw", {"ef_search": 32}),
+    ("hnsw ef=128", "hnsw", {"ef_search": 128}),
+]
+
+def synthetic_vectors(n, dim, clusters=256, seed=0):
+    """Clustered vectors, closer to real profile embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype('float32')
+    assignment = rng.integers(0, clusters, size=n)
+    return centers[assignment] + 0.5 * rng.normal(size=(n, dim)).astype('float32')
+
+def stored_vectors():
+    from backend.models.consultant_embedding import ConsultantEmbedding
+    from backend.services.embedding_store import EmbeddingStore
+    rows = ConsultantEmbedding.get_all()
+    return np.vstack([EmbeddingStore.decode(r) for r in rows])
+
+def run(index, queries, k):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        ids, _, _ = index.search(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(ids)
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+def benchmark(vectors, num_queries=500, k=10, configs=CONFIGS, seed=1):
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), size=num_queries)]
+    queries = queries + 0.1 * rng.normal(size=queries.shape).astype('float32')
+    ids = list(range(len(vectors)))
+
+    rows = []
+    exact = VectorIndex("benchmark", "flat")
+    started = time.perf_counter()
+    exact.rebuild(ids, vectors)
+    build = time.perf_counter() - started
+    truth, p50, p99 = run(exact, queries, k)
+    rows.append(("flat (exact)", 1.0, p50, p99, build, exact.stats()["memory_bytes"]))
+
+    for label, index_type, params in configs:
+        index = VectorIndex("benchmark", index_type, **params)
+        started = time.perf_counter()
+        index.rebuild(ids, vectors)
+        build = time.perf_counter() - started
+        found, p50, p99 = run(index, queries, k)
+        recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth) if t])
+        rows.append((f"{label} [{index.built_type}]", recall, p50, p99, build, index.stats()["memory_bytes"]))
+    return rows
+
+def print_report(rows, n, dim, k):
+    print(f"\n{n} vectors, dim={dim}")
+    print(f"{'index':<32}{f'recall@{k}':>10}{'p50 ms':>10}{'p99 ms':>10}{'build s':>10}{'memory MB':>12}")
+    for label, recall, p50, p99, build, memory in rows:
+        print(f"{label:<32}{recall:>10.3f}{p50:>10.3f}{p99:>10.3f}{build:>10.2f}{memory / 2**20:>12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ANN index types against exact search")
+    parser.add_argument("--source", choices=["synthetic", "db"], default="synthetic")
+    parser.add_argument("--n", type=int, default=100000, help="number of synthetic vectors")
+    parser.add_argument("--dim", type=int, default=384, help="synthetic vector size (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    data = stored_vectors() if args.source == "db" else synthetic_vectors(args.n, args.dim)
+    print_report(benchmark(data, args.queries, args.k), len(data), data.shape[1], args.k)
@@ -0,0 +1,59 @@
+"""
+Filter and sort latency of the in-process consultant catalog.
+
+Synthetic consultants get random experience, rating (some unrated) and
+availability; each query filters the whole bench on all three and reports
+p50/p99 for the id-only path and for materializing the matching records.
+
+    python -m backend.benchmarks.catalog_benchmark --n 100000
+    python -m backend.benchmarks.catalog_benchmark --n 1000000 --queries 20
+"""
+import argparse
+import time
+import numpy as np
+from backend.services.consultant_catalog import ConsultantCatalog
+
+AVAILABILITY = ["available", "busy", "on_leave"]
+
+def synthetic_profiles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    experience = rng.integers(0, 30, size=n).tolist()
+    rating = np.round(rng.uniform(0, 5, size=n), 1).tolist()
+    availability = rng.integers(0, len(AVAILABILITY), size=n).tolist()
+    return [
+        {
+            "id": i, "name": f"consultant {i}", "email": f"c{i}@example.com", "skills": "python,sql",
+            "experience": experience[i], "profile_summary": "", "availability": AVAILABILITY[availability[i]],
+            "rating": None if i % 10 == 0 else rating[i],
+        }
+        for i in range(n)
+    ]
+
+def benchmark(n, num_queries=100, seed=1):
+    catalog = ConsultantCatalog()
+    started = time.perf_counter()
+    catalog.rebuild(synthetic_profiles(n))
+    build = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed)
+    ids_ms, records_ms = [], []
+    for _ in range(num_queries):
+        filters = {"min_experience": int(rng.integers(0, 15)), "availability": "available", "min_rating": float(rng.uniform(0, 4))}
+        started = time.perf_counter()
+        catalog.filter_ids(**filters)
+        ids_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        catalog.filter(sort_by="rating", **filters)
+        records_ms.append((time.perf_counter() - started) * 1000)
+    return build, ids_ms, records_ms
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the consultant catalog")
+    parser.add_argument("--n", type=int, default=100000, help="number of consultants")
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    build, ids_ms, records_ms = benchmark(args.n, args.queries)
+    print(f"\n{args.n} consultants, build {build:.2f}s")
+    print(f"filter ids            p50 {np.percentile(ids_ms, 50):.2f} ms, p99 {np.percentile(ids_ms, 99):.2f} ms")
+    print(f"filter + sort records p50 {np.percentile(records_ms, 50):.2f} ms, p99 {np.percentile(records_ms, 99):.2f} ms")
@@ -0,0 +1,62 @@
+"""
+Peak memory and time of chunked top-k scoring versus scoring the whole bench at once.
+
+The bench is generated chunk by chunk (as the batch matcher reads it from the
+embedding store), so the chunked path never holds more than one chunk; the
+reference path stacks every vector, computes the full similarity matrix and
+argsorts it. Peak memory is measured with tracemalloc, which sees NumPy buffers.
+
+    python -m backend.benchmarks.chunked_topk_benchmark --n 1000000
+    python -m backend.benchmarks.chunked_topk_benchmark --jobs 50 --chunk 4096
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from backend.services.batch_scoring import chunked_top_k, normalize_rows
+
+def synthetic_chunks(n, dim, chunk, seed=0):
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk):
+        size = min(chunk, n - start)
+        yield np.arange(start, start + size), rng.normal(size=(size, dim)).astype('float32')
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def full_top_k(queries, n, dim, chunk, k):
+    vectors = np.vstack([vectors for _, vectors in synthetic_chunks(n, dim, chunk)])
+    scores = normalize_rows(queries) @ normalize_rows(vectors).T
+    order = np.argsort(-scores, axis=1)[:, :k]
+    return order, np.take_along_axis(scores, order, axis=1)
+
+def benchmark(n, dim, num_jobs, chunk, k=10, seed=1):
+    queries = np.random.default_rng(seed).normal(size=(num_jobs, dim)).astype('float32')
+    (ids, _), chunked_time, chunked_peak = measure(lambda: chunked_top_k(queries, synthetic_chunks(n, dim, chunk), k))
+    (full_ids, _), full_time, full_peak = measure(lambda: full_top_k(queries, n, dim, chunk, k))
+    agreement = float(np.mean([len(set(a) & set(b)) / k for a, b in zip(ids.tolist(), full_ids.tolist())]))
+    return [
+        ("chunked", chunked_time, chunked_peak),
+        ("full matrix", full_time, full_peak),
+    ], agreement
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark chunked top-k scoring")
+    parser.add_argument("--n", type=int, default=1000000, help="number of consultants")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--jobs", type=int, default=20, help="job descriptions scored together")
+    parser.add_argument("--chunk", type=int, default=16384, help="consultants per chunk")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rows, agreement = benchmark(args.n, args.dim, args.jobs, args.chunk, args.k)
+    print(f"\n{'path':<12} {'time':>8} {'peak MB':>9}")
+    for name, elapsed, peak in rows:
+        print(f"{name:<12} {elapsed:>7.2f}s {peak / 2**20:>9.1f}")
+    print(f"top-{args.k} agreement {agreement:.3f}")
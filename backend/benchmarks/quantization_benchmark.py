@@ -0,0 +1,68 @@
+"""
+Memory, latency and ranking agreement of float16 / int8 embeddings versus float32.
+
+Every dtype is built with the same index type over the same vectors. The
+float32 index is the reference: for each query we report how much of its
+top-k the quantized index returns (overlap@k), how often the top hit is the
+same, and the mean absolute error of the cosine scores of shared hits. Storage
+size is what one vector costs in consultant_embeddings.
+
+    python -m backend.benchmarks.quantization_benchmark --n 200000
+    python -m backend.benchmarks.quantization_benchmark --index-type hnsw
+    python -m backend.benchmarks.quantization_benchmark --source db
+"""
+import argparse
+import time
+import numpy as np
+from backend.benchmarks.ann_benchmark import run, stored_vectors, synthetic_vectors
+from backend.services.quantization import EMBEDDING_DTYPES, quantize
+from backend.services.vector_index import INDEX_TYPES, VectorIndex
+
+def scores_by_id(index, queries, k):
+    return [dict(zip(*index.search(query, k)[:2])) for query in queries]
+
+def benchmark(vectors, index_type="flat", num_queries=500, k=10, seed=1):
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), size=num_queries)]
+    queries = queries + 0.1 * rng.normal(size=queries.shape).astype('float32')
+    ids = list(range(len(vectors)))
+
+    rows, reference = [], None
+    for dtype in EMBEDDING_DTYPES:
+        index = VectorIndex("benchmark", index_type, dtype=dtype)
+        started = time.perf_counter()
+        index.rebuild(ids, vectors)
+        build = time.perf_counter() - started
+        found, p50, p99 = run(index, queries, k)
+        scored = scores_by_id(index, queries, k)
+        if reference is None:
+            reference = (found, scored)
+        ref_found, ref_scored = reference
+        overlap = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, ref_found) if t])
+        top1 = np.mean([bool(f) and f[0] == t[0] for f, t in zip(found, ref_found) if t])
+        errors = [abs(s[i] - r[i]) for s, r in zip(scored, ref_scored) for i in s.keys() & r.keys()]
+        storage = len(quantize(vectors[0], dtype)[0])
+        rows.append((
+            f"{dtype} [{index.built_type}/{index.built_dtype}]", overlap, top1, float(np.mean(errors)) if errors else 0.0,
+            p50, p99, build, index.stats()["memory_bytes"], storage
+        ))
+    return rows
+
+def print_report(rows, n, dim, k):
+    print(f"\n{n} vectors, dim={dim}")
+    print(f"{'dtype':<28}{f'overlap@{k}':>11}{'top1':>8}{'score MAE':>11}{'p50 ms':>9}{'p99 ms':>9}{'build s':>9}{'memory MB':>11}{'B/vector':>10}")
+    for label, overlap, top1, mae, p50, p99, build, memory, storage in rows:
+        print(f"{label:<28}{overlap:>11.3f}{top1:>8.3f}{mae:>11.5f}{p50:>9.3f}{p99:>9.3f}{build:>9.2f}{memory / 2**20:>11.1f}{storage:>10}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare float16 / int8 embedding storage against float32")
+    parser.add_argument("--source", choices=["synthetic", "db"], default="synthetic")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--n", type=int, default=100000, help="number of synthetic vectors")
+    parser.add_argument("--dim", type=int, default=384, help="synthetic vector size (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    data = stored_vectors() if args.source == "db" else synthetic_vectors(args.n, args.dim)
+    print_report(benchmark(data, args.index_type, args.queries, args.k), len(data), data.shape[1], args.k)
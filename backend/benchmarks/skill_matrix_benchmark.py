@@ -0,0 +1,51 @@
+"""
+Build and scoring time of the bitset skill matrix.
+
+Synthetic consultants draw skills from a Zipf-like vocabulary (a few very common
+skills, a long tail of rare ones); each query scores one JD against every
+consultant and reports p50/p99 latency.
+
+    python -m backend.benchmarks.skill_matrix_benchmark --n 1000000
+    python -m backend.benchmarks.skill_matrix_benchmark --vocabulary 5000 --skills 12
+"""
+import argparse
+import time
+import numpy as np
+from backend.services.skill_matrix import SkillMatrix
+
+def synthetic_consultants(n, vocabulary, skills_per_consultant, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"skill {i}" for i in range(vocabulary)]
+    weights = 1 / np.arange(1, vocabulary + 1)
+    weights /= weights.sum()
+    picks = rng.choice(vocabulary, size=(n, skills_per_consultant), p=weights)
+    return names, weights, [{"id": i, "skills": ",".join(names[j] for j in row)} for i, row in enumerate(picks.tolist())]
+
+def benchmark(n, vocabulary, skills_per_consultant, num_queries=50, jd_skills=6, seed=1):
+    names, weights, consultants = synthetic_consultants(n, vocabulary, skills_per_consultant)
+    matrix = SkillMatrix()
+    started = time.perf_counter()
+    matrix.rebuild(consultants)
+    build = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed)
+    latencies = []
+    for _ in range(num_queries):
+        jd = [names[j] for j in rng.choice(vocabulary, size=jd_skills, replace=False, p=weights)]
+        started = time.perf_counter()
+        scores = matrix.score(jd)
+        scores.top(10)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return build, np.percentile(latencies, 50), np.percentile(latencies, 99), matrix.stats()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the bitset skill matrix")
+    parser.add_argument("--n", type=int, default=1000000, help="number of consultants")
+    parser.add_argument("--vocabulary", type=int, default=2000)
+    parser.add_argument("--skills", type=int, default=8, help="skills per consultant")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    build, p50, p99, stats = benchmark(args.n, args.vocabulary, args.skills, args.queries)
+    print(f"\n{stats['consultants']} consultants, {stats['vocabulary']} skills, {stats['memory_bytes'] / 2**20:.1f} MB")
+    print(f"build {build:.2f}s, score + top-10 p50 {p50:.1f} ms, p99 {p99:.1f} ms")
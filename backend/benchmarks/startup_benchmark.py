@@ -0,0 +1,108 @@
+"""
+Import-time and memory benchmark for backend modules.
+
+Each module is imported in a fresh interpreter and we record the wall time of
+the import and the process RSS right after it. Heavy dependencies (faiss,
+sentence_transformers, google.generativeai, sqlalchemy) and the database pool are meant to
+load on first use, so every module here should import in well under a second.
+
+    python -m backend.benchmarks.startup_benchmark
+    python -m backend.benchmarks.startup_benchmark --json startup.json
+    python -m backend.benchmarks.startup_benchmark --baseline startup.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODULES = [
+    "backend.config",
+    "backend.database",
+    "backend.init_db",
+    "backend.models",
+    "backend.services.auth_service",
+    "backend.services.email_service",
+    "backend.services.embedding_store",
+    "backend.services.vector_index",
+    "backend.services.llm_client",
+    "backend.services.agent_service",
+    "backend.services.matching_service",
+    "backend.main",
+]
+
+# Modules that must never be imported as a side effect of importing the backend
+DEFERRED = ["faiss", "sentence_transformers", "torch", "google.generativeai", "sklearn", "openai", "sqlalchemy"]
+
+PROBE = """
+import importlib, json, sys, time
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+before = rss_mb()
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": round(elapsed, 4),
+    "rss_mb": round(rss_mb(), 1),
+    "rss_delta_mb": round(rss_mb() - before, 1),
+    "deferred_loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules],
+}))
+"""
+
+def measure(module, repeats=3):
+    """Best-of-N import time (and the RSS of that run) for one module"""
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE, module, json.dumps(DEFERRED)],
+            cwd=root, capture_output=True, text=True
+        )
+        if out.returncode != 0:
+            return {"module": module, "error": out.stderr.strip().splitlines()[-1] if out.stderr else "failed"}
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r["seconds"])
+    return {"module": module, **best}
+
+def compare(results, baseline, tolerance):
+    """Return the modules whose import time regressed beyond ``tolerance`` versus the baseline"""
+    previous = {r["module"]: r for r in baseline if "seconds" in r}
+    regressions = []
+    for result in results:
+        old = previous.get(result["module"])
+        if old and "seconds" in result and result["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(f"{result['module']}: {old['seconds']:.3f}s -> {result['seconds']:.3f}s")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time and RSS of backend modules")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json output and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeats) for module in MODULES]
+    print(f"{'module':<40}{'import s':>10}{'RSS MB':>10}{'+RSS MB':>10}  deferred deps loaded")
+    for r in results:
+        if "error" in r:
+            print(f"{r['module']:<40}  error: {r['error']}")
+        else:
+            print(f"{r['module']:<40}{r['seconds']:>10.3f}{r['rss_mb']:>10.1f}{r['rss_delta_mb']:>10.1f}  {', '.join(r['deferred_loaded']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    failed = [r["module"] for r in results if r.get("deferred_loaded")]
+    if args.baseline:
+        with open(args.baseline) as f:
+            failed += compare(results, json.load(f), args.tolerance)
+    if failed:
+        print("\nRegressions:\n  " + "\n  ".join(failed))
+        sys.exit(1)
@@ -31,12 +31,83 @@ class Settings(BaseSettings):
     # Google Gemini LLM Configuration
     google_api_key: str = os.getenv("Google_API_Key", "")
     llm: str = os.getenv("LLM", "gemini-1.5-flash")
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    llm_timeout_seconds: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", 3))
+    llm_backoff_base_seconds: float = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 0.5))
+    llm_backoff_max_seconds: float = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 8))
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50000))
+    llm_streaming: bool = os.getenv("LLM_STREAMING", "true").lower() in ("1", "true", "yes")
+    llm_shard_token_budget: int = int(os.getenv("LLM_SHARD_TOKEN_BUDGET", 4000))
+    llm_output_tokens_per_profile: int = int(os.getenv("LLM_OUTPUT_TOKENS_PER_PROFILE", 200))
+
+    # Matching Configuration
+    match_shortlist_size: int = int(os.getenv("MATCH_SHORTLIST_SIZE", 10))
+    # Candidates proposed by the skill index before dense re-scoring, and the skill score's share of the fused score
+    skill_candidate_pool: int = int(os.getenv("SKILL_CANDIDATE_POOL", 200))
+    hybrid_skill_weight: float = float(os.getenv("HYBRID_SKILL_WEIGHT", 0.3))
+
+    # Re-score a consultant against every job's stored shortlist when the profile is created or updated
+    rescore_on_change: bool = os.getenv("RESCORE_ON_CHANGE", "true").lower() in ("1", "true", "yes")
+    # Matching job queue: jobs each worker process runs at once, how often idle workers poll,
+    # retries, and how long a running job may go without a heartbeat before it is requeued
+    matching_worker_concurrency: int = int(os.getenv("MATCHING_WORKER_CONCURRENCY", 4))
+    matching_worker_poll_seconds: float = float(os.getenv("MATCHING_WORKER_POLL_SECONDS", 1))
+    matching_job_max_attempts: int = int(os.getenv("MATCHING_JOB_MAX_ATTEMPTS", 3))
+    matching_job_retry_seconds: float = float(os.getenv("MATCHING_JOB_RETRY_SECONDS", 30))
+    matching_job_lock_timeout_seconds: float = float(os.getenv("MATCHING_JOB_LOCK_TIMEOUT_SECONDS", 300))
+    # Stage checkpoints older than this are ignored, so a run abandoned long ago starts over
+    matching_checkpoint_ttl_seconds: float = float(os.getenv("MATCHING_CHECKPOINT_TTL_SECONDS", 86400))
+
+    # Longest the in-process consultant catalog goes without checking the database for changes
+    consultant_catalog_refresh_seconds: float = float(os.getenv("CONSULTANT_CATALOG_REFRESH_SECONDS", 5))
+    # updated_at is the writing transaction's start time, so a row can commit stamped behind the
+    # catalog's watermark; every refresh re-reads this far behind it
+    consultant_catalog_overlap_seconds: float = float(os.getenv("CONSULTANT_CATALOG_OVERLAP_SECONDS", 60))
+
+    # Jobs returned by reverse matching (best open jobs for a consultant)
+    matching_jobs_top_k: int = int(os.getenv("MATCHING_JOBS_TOP_K", 10))
+    # Longest a process's job index goes without picking up jobs written by other processes
+    job_index_refresh_seconds: float = float(os.getenv("JOB_INDEX_REFRESH_SECONDS", 30))
+
+    # Batch matching: consultants per streamed embedding chunk / score tile, and jobs running their LLM stage at once
+    batch_match_block_rows: int = int(os.getenv("BATCH_MATCH_BLOCK_ROWS", 16384))
+    batch_match_concurrency: int = int(os.getenv("BATCH_MATCH_CONCURRENCY", 8))
+
+    # Embedding Configuration
+    embedding_model: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    embedding_max_batch_size: int = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", 64))
+    embedding_max_wait_ms: float = float(os.getenv("EMBEDDING_MAX_WAIT_MS", 5))
+    # Precision embeddings are stored and searched at (float32, float16, int8)
+    embedding_dtype: str = os.getenv("EMBEDDING_DTYPE", "float32")
+
+    # Vector Index Configuration (flat, ivf_flat, ivf_pq, hnsw)
+    vector_index_type: str = os.getenv("VECTOR_INDEX_TYPE", "flat")
+    ivf_nlist: int = int(os.getenv("IVF_NLIST", 1024))
+    ivf_nprobe: int = int(os.getenv("IVF_NPROBE", 16))
+    pq_m: int = int(os.getenv("PQ_M", 16))
+    hnsw_m: int = int(os.getenv("HNSW_M", 32))
+    hnsw_ef_construction: int = int(os.getenv("HNSW_EF_CONSTRUCTION", 200))
+    hnsw_ef_search: int = int(os.getenv("HNSW_EF_SEARCH", 64))
+    # Directory for memory-mapped index snapshots shared by all workers (empty = per-process index)
+    vector_index_path: str = os.getenv("VECTOR_INDEX_PATH", "")
 
     # SMTP/Email Configuration
     smtp_server: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
     smtp_port: int = int(os.getenv("SMTP_PORT", 587))
     email_username: str = os.getenv("EMAIL_USERNAME", "")
     email_password: str = os.getenv("EMAIL_PASSWORD", "")
+    # Sender address (defaults to EMAIL_USERNAME); STARTTLS can be turned off for a local SMTP sink
+    email_from: str = os.getenv("EMAIL_FROM", "")
+    smtp_use_tls: bool = os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")
+    smtp_timeout_seconds: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", 30))
+    # Email outbox: emails per sender batch, idle poll interval, retries with backoff, and how long
+    # a claimed batch may stay unsent before another sender takes it over
+    email_outbox_batch_size: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 50))
+    email_outbox_poll_seconds: float = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", 2))
+    email_max_attempts: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+    email_retry_seconds: float = float(os.getenv("EMAIL_RETRY_SECONDS", 60))
+    email_outbox_lock_timeout_seconds: float = float(os.getenv("EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS", 300))
 
     class Config:
         env_file = ".env"
@@ -1,6 +1,7 @@
 import psycopg2
 from psycopg2 import pool
 import logging
+import threading
 from contextlib import contextmanager
 from backend.config import get_settings
 
@@ -10,22 +11,31 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Create a connection pool
-try:
-    db_pool = psycopg2.pool.SimpleConnectionPool(
-        1,  # minconn
-        20, # maxconn
-        user=settings.database_user,
-        password=settings.database_password,
-        host=settings.database_host,
-        port=settings.database_port,
-        dbname=settings.database_name
-    )
-    if db_pool:
-        logger.info("Database connection pool created successfully.")
-except psycopg2.OperationalError as e:
-    logger.error(f"Failed to create database connection pool: {e}")
-    db_pool = None
+# The connection pool is created on first use rather than at import time, so processes that
+# never touch the database (CLI tools, test collection) do not pay for it. It is shared by
+# request handlers and background threads, hence the threaded pool.
+db_pool = None
+_pool_lock = threading.Lock()
+
+def get_db_pool():
+    global db_pool
+    if db_pool is None:
+        with _pool_lock:
+            if db_pool is None:
+                try:
+                    db_pool = psycopg2.pool.ThreadedConnectionPool(
+                        1,  # minconn
+                        20, # maxconn
+                        user=settings.database_user,
+                        password=settings.database_password,
+                        host=settings.database_host,
+                        port=settings.database_port,
+                        dbname=settings.database_name
+                    )
+                    logger.info("Database connection pool created successfully.")
+                except psycopg2.OperationalError as e:
+                    logger.error(f"Failed to create database connection pool: {e}")
+    return db_pool
 
 @contextmanager
 def get_db_connection():
@@ -33,19 +43,20 @@ def get_db_connection():
     Get a connection from the pool.
     This is a context manager, so it will handle closing the connection.
     """
-    if db_pool is None:
+    connection_pool = get_db_pool()
+    if connection_pool is None:
         raise ConnectionError("Database connection pool is not available.")
     
     conn = None
     try:
-        conn = db_pool.getconn()
+        conn = connection_pool.getconn()
         yield conn
     except Exception as e:
         logger.error(f"Error getting connection from pool: {e}")
         raise
     finally:
         if conn:
-            db_pool.putconn(conn)
+            connection_pool.putconn(conn)
 
 def close_db_pool():
     """Close all connections in the pool."""
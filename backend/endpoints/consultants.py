@@ -1,14 +1,22 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from ..models.consultant_profile import ConsultantProfile
 from ..models.user import User
 from ..schemas.consultant_profile import ConsultantProfileCreate, ConsultantProfileResponse, ConsultantProfileUpdate
+from ..schemas.job_description import JobMatchResponse
+from ..models.job_description import JobDescription
+from ..endpoints.jobs import job_dict_to_response
+from ..services.embedding_store import embedding_store
+from ..services.vector_index import job_index
+from ..config import get_settings
 from ..services.auth_service import auth_service
 from backend.logging import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter(prefix="/consultants", tags=["Consultants"])
 
@@ -30,12 +38,16 @@ async def create_consultant(profile: ConsultantProfileCreate, current_user: dict
     """Create a new consultant profile"""
     try:
         logger.info(f"Creating new consultant profile for user ID: {current_user['id']}")
-        profile_id = ConsultantProfile.create(
+        # The write hooks encode the profile and update the indexes; keep them off the event loop
+        profile_id = await asyncio.to_thread(
+            ConsultantProfile.create,
             name=profile.name,
             email=profile.email,
             experience=profile.experience,
             skills=','.join(profile.skills),
-            profile_summary=profile.bio or ''
+            profile_summary=profile.bio or '',
+            availability=profile.availability,
+            rating=profile.rating
         )
         new_profile = ConsultantProfile.get_by_id(profile_id)
         return consultant_dict_to_response(new_profile)
@@ -84,6 +96,39 @@ async def get_consultant_profile(
             detail=str(e)
         )
 
+def _matching_jobs(consultant, k):
+    """Top-k jobs for a consultant: one lookup of the consultant's stored vector in the job index"""
+    job_index.ensure_built()
+    job_index.refresh_in_background()
+    ids, scores, _ = job_index.search(embedding_store.get_embeddings([consultant]), k)
+    jobs = {job['id']: job for job in JobDescription.get_many(ids)}
+    return [{**job_dict_to_response(jobs[i]), 'score': score} for i, score in zip(ids, scores) if i in jobs]
+
+@router.get("/{consultant_id}/matching-jobs", response_model=List[JobMatchResponse])
+async def get_matching_jobs(
+    consultant_id: int,
+    k: Optional[int] = Query(None, ge=1, le=100),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """Best matching job descriptions for a consultant, by cosine similarity"""
+    try:
+        logger.info(f"Retrieving matching jobs for consultant ID: {consultant_id}")
+        consultant = ConsultantProfile.get_by_id(consultant_id)
+        if consultant is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Consultant profile not found"
+            )
+        return await asyncio.to_thread(_matching_jobs, consultant, k or settings.matching_jobs_top_k)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving matching jobs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
 @router.put("/{consultant_id}", response_model=ConsultantProfileResponse)
 async def update_consultant_profile(
     consultant_id: int,
@@ -99,11 +144,22 @@ async def update_consultant_profile(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Consultant profile not found"
             )
-        # Update fields
-        for field, value in consultant_update.dict(exclude_unset=True).items():
-            setattr(consultant, field, value)
-        consultant.update(consultant_id)
-        return consultant_dict_to_response(consultant)
+        # Merge the fields sent over the stored row
+        changes = consultant_update.dict(exclude_unset=True)
+        skills = changes.get('skills')
+        await asyncio.to_thread(
+            ConsultantProfile.update,
+            consultant_id,
+            name=changes.get('name') or consultant['name'],
+            email=changes.get('email') or consultant['email'],
+            experience=changes['experience'] if changes.get('experience') is not None else consultant['experience'],
+            skills=','.join(skills) if skills is not None else consultant['skills'],
+            profile_summary=changes['bio'] if changes.get('bio') is not None else consultant['profile_summary'],
+            availability=changes.get('availability') or consultant['availability'],
+            # An explicit null clears the rating
+            rating=changes['rating'] if 'rating' in changes else consultant['rating']
+        )
+        return consultant_dict_to_response(ConsultantProfile.get_by_id(consultant_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -128,7 +184,7 @@ async def delete_consultant_profile(
                 detail="Consultant profile not found"
             )
         
-        ConsultantProfile.delete(consultant_id)
+        await asyncio.to_thread(ConsultantProfile.delete, consultant_id)
         return {"message": "Consultant profile deleted successfully"}
     except HTTPException:
         raise
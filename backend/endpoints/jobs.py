@@ -1,3 +1,4 @@
+import asyncio
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from ..models.job_description import JobDescription
@@ -31,7 +32,9 @@ async def create_job(job: JobDescriptionCreate, current_user: dict = Depends(aut
     """Create a new job description"""
     try:
         logger.info(f"Creating new job description for user ID: {current_user['id']}")
-        job_id = JobDescription.create(
+        # The write hooks encode the job and update the job index; keep them off the event loop
+        job_id = await asyncio.to_thread(
+            JobDescription.create,
             title=job.title,
             description=job.description,
             skills=','.join(job.skills),
@@ -101,11 +104,16 @@ async def update_job_description(
             )
         
         # Update fields
-        for field, value in job_update.dict(exclude_unset=True).items():
-            setattr(job, field, value)
-        
-        job.update(job_id)
-        return job_dict_to_response(job)
+        changes = job_update.dict(exclude_unset=True)
+        skills = changes.get('skills')
+        await asyncio.to_thread(
+            JobDescription.update,
+            job_id,
+            title=changes.get('title') or job['title'],
+            description=changes.get('description') or job['description'],
+            skills=','.join(skills) if skills is not None else job['skills']
+        )
+        return job_dict_to_response(JobDescription.get_by_id(job_id))
     except HTTPException:
         raise
     except Exception as e:
@@ -130,7 +138,7 @@ async def delete_job_description(
                 detail="Job description not found"
             )
         
-        JobDescription.delete(job_id)
+        await asyncio.to_thread(JobDescription.delete, job_id)
         return {"message": "Job description deleted successfully"}
     except HTTPException:
         raise
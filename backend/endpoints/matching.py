@@ -1,19 +1,24 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, status
 from ..models.user import User
 from ..models.matching_result import MatchingResult
-from ..schemas.matching_result import MatchingRequest, MatchingResultResponse, AgentStatusResponse
-from ..services.matching_service import matching_service, MatchingService
+from ..schemas.matching_result import BatchMatchingRequest, MatchingJobRequest, MatchingJobResponse, MatchingProgressResponse, MatchingResultResponse
+from ..services.matching_service import matching_service
 from ..services.auth_service import auth_service
-from sqlalchemy.orm import Session
-from ..database import get_db_connection as get_db
 import logging
-from ..models.job_description import JobDescription
-from ..models.consultant_profile import ConsultantProfile
 from ..services.agent_service import agent_service
+from ..services.embedding_store import embedding_store
+from ..services.analysis_cache import analysis_cache
+from ..services.skill_index import skill_index
+from ..services.skill_matrix import skill_matrix
+from ..services.vector_index import job_index
+from ..services.rescoring import consultant_rescorer
+from ..services.consultant_catalog import consultant_catalog
+from ..services import matching_queue
+from ..models.matching_job import MatchingJob, IdempotencyKeyReused
+from ..models.email_outbox import EmailOutbox
 from backend.logging import logging
 import asyncio
-from datetime import datetime
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -21,46 +26,91 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/matching", tags=["Matching"])
 
-@router.post("/compare/{job_id}", response_model=AgentStatusResponse)
-async def start_comparison(job_id: int, db: Session = Depends(get_db)):
-    """Start the comparison process for a job"""
+def matching_job_to_response(job):
+    return {
+        'id': job['id'],
+        'kind': job['kind'],
+        'job_id': job['job_description_id'],
+        'status': job['status'],
+        'priority': job['priority'],
+        'attempts': job['attempts'],
+        'result': job['result'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+        'finished_at': job['finished_at'],
+    }
+
+@router.post("/compare/{job_id}", response_model=MatchingJobResponse, status_code=202)
+async def start_comparison(job_id: int, priority: int = 0, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
+    """Queue the comparison process for a job and return its queue handle; poll /matching/jobs/{id} for its progress"""
     try:
-        logger.info(f"Starting comparison for job ID: {job_id}")
-        matching_service.start_comparison(job_id)
-        return matching_service.get_status(job_id)
+        logger.info(f"Queueing comparison for job ID: {job_id}")
+        queue_id = await asyncio.to_thread(matching_queue.enqueue_comparison, job_id, priority, idempotency_key)
+        return matching_job_to_response(await asyncio.to_thread(MatchingJob.get_by_id, queue_id))
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"Error starting comparison: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/status/{job_id}")
-async def get_matching_status(job_id: int, db: Session = Depends(get_db)):
+@router.post("/jobs", response_model=MatchingJobResponse, status_code=202)
+async def enqueue_matching(
+    request: MatchingJobRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: dict = Depends(auth_service.get_current_user)
+):
     """
-    For the given job_id, fetch the job description and all available consultant profiles,
-    filter them using embeddings, send to the LLM, and return scores and reasoning.
+    Queue the full matching pipeline for a job and return its queue handle immediately. Retries
+    with the same Idempotency-Key, and requests for a run that is already queued or running,
+    get the existing handle; reusing a key for a different request is rejected with 422.
     """
     try:
-        job = db.query(JobDescription).filter(JobDescription.id == job_id).first()
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        consultant_profiles = db.query(ConsultantProfile).filter(
-            ConsultantProfile.availability == "available"
-        ).all()
-        if not consultant_profiles:
-            raise HTTPException(status_code=404, detail="No available consultants found")
-        # Run the LLM comparison agent synchronously
-        results = await agent_service.comparison_agent(db, job, consultant_profiles)
-        return {
-            "job_id": job_id,
-            "job_title": job.title,
-            "description": job.description,
-            "consultant_results": results
-        }
+        logger.info(f"Queueing matching for job ID: {request.job_id} (priority {request.priority})")
+        queue_id = await asyncio.to_thread(matching_queue.enqueue_match, request.job_id, request.filters, request.priority, idempotency_key)
+        return matching_job_to_response(await asyncio.to_thread(MatchingJob.get_by_id, queue_id))
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in LLM comparison for status endpoint: {str(e)}")
+        logger.error(f"Error queueing matching: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{queue_id}", response_model=MatchingJobResponse)
+async def get_matching_job(queue_id: int, current_user: dict = Depends(auth_service.get_current_user)):
+    """Status (and, once finished, result or error) of a queued matching job"""
+    job = await asyncio.to_thread(MatchingJob.get_by_id, queue_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Matching job not found")
+    return matching_job_to_response(job)
+
+@router.post("/batch", response_model=MatchingJobResponse, status_code=202)
+async def start_batch_matching(
+    request: BatchMatchingRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: dict = Depends(auth_service.get_current_user)
+):
+    """Queue matching of several jobs against the whole bench in one pass"""
+    if not request.job_ids:
+        raise HTTPException(status_code=400, detail="job_ids must not be empty")
+    job_ids = list(dict.fromkeys(request.job_ids))
+    logger.info(f"Queueing batch matching for job IDs: {job_ids}")
+    try:
+        queue_id = await asyncio.to_thread(matching_queue.enqueue_batch, job_ids, request.filters, request.priority, idempotency_key)
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return matching_job_to_response(await asyncio.to_thread(MatchingJob.get_by_id, queue_id))
+
+@router.get("/status/{job_id}", response_model=MatchingProgressResponse)
+async def get_matching_status(job_id: int):
+    """Stage status and partial results of a job's latest matching run, read from matching_progress"""
+    try:
+        return await asyncio.to_thread(matching_service.get_agent_status, job_id)
+    except Exception as e:
+        logger.error(f"Error getting matching status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/results/{job_id}", response_model=List[MatchingResultResponse])
-async def get_matching_results(job_id: int, db: Session = Depends(get_db)):
+async def get_matching_results(job_id: int):
     """Get matching results for a job"""
     try:
         results = matching_service.get_results(job_id)
@@ -98,20 +148,33 @@ async def get_all_matching_results(current_user: dict = Depends(auth_service.get
     # In a real scenario, you'd probably get all results or paginate
     return [dict(result) for result in results]
 
-@router.get("/status/{job_id}", response_model=dict)
-async def get_matching_status(job_id: int, current_user: dict = Depends(auth_service.get_current_user)):
-    # Existing code for getting status...
-    pass
-
 @router.post("/compare_and_get/{job_id}")
-async def compare_and_get(job_id: int, db: Session = Depends(get_db)):
+async def compare_and_get(job_id: int):
+    """Run the LLM comparison now and return it; concurrent calls for the same job share one run"""
     try:
-        job = db.query(JobDescription).filter(JobDescription.id == job_id).first()
-        consultant_profiles = db.query(ConsultantProfile).filter(
-            ConsultantProfile.availability == "available"
-        ).all()
-        results = await agent_service.comparison_agent(db, job, consultant_profiles)
-        return results
+        return await matching_service.compare(job_id)
     except Exception as e:
         logger.error(f"Error in direct LLM comparison: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/metrics")
+async def get_matching_metrics(current_user: dict = Depends(auth_service.get_current_user)):
+    """Queue depth and throughput counters for the LLM client, its analysis cache, the embedding worker, the skill indexes, the job index, push re-scoring, the consultant catalog, single-flight runs and the email outbox"""
+    try:
+        # Emails are sent by the worker processes, so the outbox table is the shared view of their progress
+        outbox = await asyncio.to_thread(EmailOutbox.counts)
+    except Exception as e:
+        logger.warning(f"Could not read email outbox counts: {e}")
+        outbox = None
+    return {
+        "llm": agent_service.llm.stats(),
+        "llm_analysis_cache": analysis_cache.stats(),
+        "embedding_worker": embedding_store.worker.stats(),
+        "skill_index": skill_index.stats(),
+        "skill_matrix": skill_matrix.stats(),
+        "job_index": job_index.stats(),
+        "consultant_rescorer": consultant_rescorer.stats(),
+        "consultant_catalog": consultant_catalog.stats(),
+        "single_flight": matching_service.flights.stats(),
+        "email_outbox": outbox
+    }
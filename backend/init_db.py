@@ -101,14 +101,163 @@ def init_db():
             );
             """,
             """
+            ALTER TABLE consultant_profiles ADD COLUMN IF NOT EXISTS availability VARCHAR(50) NOT NULL DEFAULT 'available';
+            """,
+            """
+            ALTER TABLE consultant_profiles ADD COLUMN IF NOT EXISTS rating REAL;
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_consultant_profiles_availability_experience ON consultant_profiles (availability, experience);
+            """,
+            """
+            -- Incremental consultant catalog refreshes read rows changed since their watermark
+            CREATE INDEX IF NOT EXISTS idx_consultant_profiles_updated_at ON consultant_profiles (updated_at);
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS consultant_deletions (
+                id BIGSERIAL PRIMARY KEY,
+                consultant_id INTEGER NOT NULL, -- no foreign key: the profile is gone
+                deleted_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_consultant_deletions_deleted_at ON consultant_deletions (deleted_at);
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS consultant_embeddings (
+                consultant_id INTEGER PRIMARY KEY REFERENCES consultant_profiles(id) ON DELETE CASCADE,
+                content_hash VARCHAR(64) NOT NULL, -- sha256 of model name + profile text
+                model VARCHAR(255) NOT NULL,
+                dim INTEGER NOT NULL,
+                embedding BYTEA NOT NULL, -- vector bytes in the given dtype
+                dtype VARCHAR(16) NOT NULL DEFAULT 'float32', -- float32, float16 or int8
+                scale REAL, -- int8 only: embedding = bytes * scale
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            ALTER TABLE consultant_embeddings ADD COLUMN IF NOT EXISTS dtype VARCHAR(16) NOT NULL DEFAULT 'float32';
+            """,
+            """
+            ALTER TABLE consultant_embeddings ADD COLUMN IF NOT EXISTS scale REAL;
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS job_embeddings (
+                job_id INTEGER PRIMARY KEY REFERENCES job_descriptions(id) ON DELETE CASCADE,
+                content_hash VARCHAR(64) NOT NULL, -- sha256 of model name + job text
+                model VARCHAR(255) NOT NULL,
+                dim INTEGER NOT NULL,
+                embedding BYTEA NOT NULL, -- vector bytes in the given dtype
+                dtype VARCHAR(16) NOT NULL DEFAULT 'float32', -- float32, float16 or int8
+                scale REAL, -- int8 only: embedding = bytes * scale
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS llm_analysis_cache (
+                cache_key VARCHAR(64) PRIMARY KEY, -- sha256 of model + JD text + consultant profile text
+                model VARCHAR(255) NOT NULL,
+                analysis JSONB NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_llm_analysis_cache_last_used ON llm_analysis_cache (last_used_at);
+            """,
+            """
             CREATE TABLE IF NOT EXISTS matching_results (
                 id SERIAL PRIMARY KEY,
                 job_description_id INTEGER REFERENCES job_descriptions(id) ON DELETE CASCADE,
                 status VARCHAR(50) NOT NULL DEFAULT 'PENDING', -- PENDING, IN_PROGRESS, COMPLETED, FAILED
-                results JSONB, -- {'top_matches': [{'consultant_id': X, 'score': Y}, ...]}
+                results JSONB, -- {'top_matches': [...], 'shortlist': [{'consultant_id': X, 'score': Y}, ...]}
                 created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
             );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS email_outbox (
+                id SERIAL PRIMARY KEY,
+                job_description_id INTEGER REFERENCES job_descriptions(id) ON DELETE SET NULL,
+                matching_result_id INTEGER REFERENCES matching_results(id) ON DELETE SET NULL,
+                recipients JSONB NOT NULL,
+                subject TEXT NOT NULL,
+                html TEXT NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, sending, sent, failed
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 5,
+                run_after TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                sender VARCHAR(255),
+                locked_at TIMESTAMP WITH TIME ZONE,
+                error TEXT,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                sent_at TIMESTAMP WITH TIME ZONE
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_email_outbox_queued ON email_outbox (id) WHERE status = 'queued';
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS matching_progress (
+                job_description_id INTEGER PRIMARY KEY REFERENCES job_descriptions(id) ON DELETE CASCADE,
+                comparison_status VARCHAR(20) NOT NULL DEFAULT 'idle', -- idle, in-progress, completed
+                comparison_progress REAL NOT NULL DEFAULT 0,
+                ranking_status VARCHAR(20) NOT NULL DEFAULT 'idle',
+                ranking_progress REAL NOT NULL DEFAULT 0,
+                communication_status VARCHAR(20) NOT NULL DEFAULT 'idle',
+                communication_progress REAL NOT NULL DEFAULT 0,
+                partial_results JSONB NOT NULL DEFAULT '[]'::jsonb, -- similarity results received so far
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS matching_checkpoints (
+                run_key VARCHAR(64) NOT NULL, -- hash of kind, job, JD content and filters
+                stage VARCHAR(32) NOT NULL, -- shortlist, comparison, ranking, communication
+                job_description_id INTEGER REFERENCES job_descriptions(id) ON DELETE CASCADE,
+                output JSONB NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (run_key, stage)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS matching_jobs (
+                id SERIAL PRIMARY KEY,
+                kind VARCHAR(32) NOT NULL, -- match, batch, comparison
+                job_description_id INTEGER REFERENCES job_descriptions(id) ON DELETE CASCADE,
+                payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+                priority INTEGER NOT NULL DEFAULT 0, -- higher runs first
+                status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                run_after TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                worker VARCHAR(255),
+                locked_at TIMESTAMP WITH TIME ZONE,
+                result JSONB,
+                error TEXT,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP WITH TIME ZONE
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_matching_jobs_queued ON matching_jobs (priority DESC, id) WHERE status = 'queued';
+            """,
+            """
+            ALTER TABLE matching_jobs ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(255); -- client-supplied Idempotency-Key header
+            """,
+            """
+            ALTER TABLE matching_jobs ADD COLUMN IF NOT EXISTS dedupe_key VARCHAR(64); -- hash of kind, job ids, JD content and filters
+            """,
+            """
+            ALTER TABLE matching_jobs ADD COLUMN IF NOT EXISTS idempotency_hash VARCHAR(64); -- hash of the request the idempotency key was first used with
+            """,
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_matching_jobs_idempotency_key ON matching_jobs (idempotency_key) WHERE idempotency_key IS NOT NULL;
+            """,
+            """
+            -- At most one queued or running job per dedupe key, so concurrent enqueues of the same run collapse into one
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_matching_jobs_in_flight ON matching_jobs (dedupe_key) WHERE status IN ('queued', 'running');
             """
         ]
 
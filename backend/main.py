@@ -1,9 +1,12 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from backend.database import get_db_connection
 from backend.config import get_settings
 from backend.init_db import init_db
 from backend.endpoints import auth_router, jobs_router, consultants_router, matching_router
+from backend.services.agent_service import agent_service
 
 settings = get_settings()
 
@@ -48,14 +51,22 @@ async def root():
         "redoc_url": "/redoc"
     }
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 only once the embedding model is loaded and the vector index is built"""
+    readiness = agent_service.readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
+    """Initialize database on startup and warm the models up in the background"""
     try:
         init_db()
     except Exception as e:
         print(f"Error initializing database: {e}")
         raise
+    # Serving starts immediately; /ready reports when matching is warm
+    app.state.warmup_task = asyncio.create_task(asyncio.to_thread(agent_service.warmup))
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,55 @@
+from backend.database import get_db_connection
+from psycopg2 import Binary
+from psycopg2.extras import RealDictCursor, execute_values
+
+class ConsultantEmbedding:
+    @staticmethod
+    def upsert(consultant_id, content_hash, model, dim, embedding, dtype='float32', scale=None):
+        ConsultantEmbedding.upsert_many([(consultant_id, content_hash, model, dim, embedding, dtype, scale)])
+
+    @staticmethod
+    def upsert_many(rows):
+        """Insert or replace embeddings given (consultant_id, content_hash, model, dim, bytes, dtype, scale) tuples."""
+        if not rows:
+            return
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO consultant_embeddings (consultant_id, content_hash, model, dim, embedding, dtype, scale)
+                    VALUES %s
+                    ON CONFLICT (consultant_id) DO UPDATE
+                    SET content_hash = EXCLUDED.content_hash, model = EXCLUDED.model, dim = EXCLUDED.dim,
+                        embedding = EXCLUDED.embedding, dtype = EXCLUDED.dtype, scale = EXCLUDED.scale,
+                        updated_at = CURRENT_TIMESTAMP;
+                    """,
+                    [(cid, h, model, dim, Binary(emb), dtype, scale) for cid, h, model, dim, emb, dtype, scale in rows]
+                )
+                conn.commit()
+
+    @staticmethod
+    def get_many(consultant_ids):
+        if not consultant_ids:
+            return []
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    "SELECT consultant_id, content_hash, model, dim, embedding, dtype, scale FROM consultant_embeddings WHERE consultant_id = ANY(%s);",
+                    (list(consultant_ids),)
+                )
+                return cursor.fetchall()
+
+    @staticmethod
+    def get_all():
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT consultant_id, content_hash, model, dim, embedding, dtype, scale FROM consultant_embeddings ORDER BY consultant_id;")
+                return cursor.fetchall()
+
+    @staticmethod
+    def delete(consultant_id):
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM consultant_embeddings WHERE consultant_id = %s;", (consultant_id,))
+                conn.commit()
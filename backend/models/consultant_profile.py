@@ -2,8 +2,49 @@ from typing import List, Optional
 from datetime import datetime
 from backend.database import get_db_connection
 from psycopg2.extras import RealDictCursor
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _sync_indexes(profile_id, name, skills, experience, profile_summary):
+    """Keep the stored embedding, the vector index and the skill index current; matching re-encodes lazily if this fails."""
+    from backend.services.embedding_store import embedding_store, consultant_text
+    from backend.services.vector_index import consultant_index
+    from backend.services.skill_index import skill_index
+    from backend.services.skill_matrix import skill_matrix
+    from backend.services.consultant_catalog import consultant_catalog
+    consultant_catalog.mark_stale(profile_id)
+    skill_index.upsert(profile_id, skills)
+    skill_matrix.upsert(profile_id, skills)
+    try:
+        embedding = embedding_store.upsert_profile(profile_id, name, skills, experience, profile_summary)
+        content_hash = embedding_store.content_hash(consultant_text(name, skills, experience, profile_summary))
+        consultant_index.upsert(profile_id, embedding, content_hash)
+    except Exception as e:
+        logger.warning(f"Could not refresh embedding for consultant {profile_id}: {e}")
+    _enqueue_rescore(profile_id)
+
+def _enqueue_rescore(profile_id):
+    """Refresh the stored job shortlists for this consultant in the background"""
+    from backend.config import get_settings
+    if not get_settings().rescore_on_change:
+        return
+    from backend.services.rescoring import consultant_rescorer
+    consultant_rescorer.enqueue(profile_id)
+
+def _drop_indexes(profile_id):
+    from backend.services.vector_index import consultant_index
+    from backend.services.skill_index import skill_index
+    from backend.services.skill_matrix import skill_matrix
+    from backend.services.consultant_catalog import consultant_catalog
+    consultant_catalog.remove(profile_id)
+    consultant_index.remove(profile_id)
+    skill_index.remove(profile_id)
+    skill_matrix.remove(profile_id)
 
 class ConsultantProfile:
+    __slots__ = ("name", "email", "skills", "experience", "bio", "availability", "rating")
+
     def __init__(self, name: str, email: str, skills: List[str], experience: int,
                  bio: str, availability: str = "available", rating: float = 0.0):
         self.name = name
@@ -15,19 +56,20 @@ class ConsultantProfile:
         self.rating = rating
 
     @staticmethod
-    def create(name, email, experience, skills, profile_summary):
+    def create(name, email, experience, skills, profile_summary, availability="available", rating=None):
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     """
-                    INSERT INTO consultant_profiles (name, email, experience, skills, profile_summary)
-                    VALUES (%s, %s, %s, %s, %s) RETURNING id;
+                    INSERT INTO consultant_profiles (name, email, experience, skills, profile_summary, availability, rating)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id;
                     """,
-                    (name, email, experience, skills, profile_summary)
+                    (name, email, experience, skills, profile_summary, availability, rating)
                 )
                 profile_id = cursor.fetchone()[0]
                 conn.commit()
-                return profile_id
+        _sync_indexes(profile_id, name, skills, experience, profile_summary)
+        return profile_id
 
     @staticmethod
     def get_by_id(profile_id):
@@ -44,22 +86,51 @@ class ConsultantProfile:
                 return cursor.fetchall()
 
     @staticmethod
-    def update(profile_id, name, email, experience, skills, profile_summary):
+    def get_many(profile_ids):
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM consultant_profiles WHERE id = ANY(%s);", (list(profile_ids),))
+                return cursor.fetchall()
+
+    @staticmethod
+    def get_changed_since(updated_at):
+        """Profiles updated at or after ``updated_at``"""
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM consultant_profiles WHERE updated_at >= %s;", (updated_at,))
+                return cursor.fetchall()
+
+    @staticmethod
+    def get_deleted_since(deleted_at):
+        """(consultant_id, deleted_at) of profiles deleted at or after ``deleted_at``"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT consultant_id, deleted_at FROM consultant_deletions WHERE deleted_at >= %s;", (deleted_at,))
+                return cursor.fetchall()
+
+    @staticmethod
+    def update(profile_id, name, email, experience, skills, profile_summary, availability, rating):
+        """Overwrite every field; pass the stored values for the ones that do not change (``rating=None`` clears it)"""
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     """
                     UPDATE consultant_profiles
-                    SET name = %s, email = %s, experience = %s, skills = %s, profile_summary = %s, updated_at = CURRENT_TIMESTAMP
+                    SET name = %s, email = %s, experience = %s, skills = %s, profile_summary = %s,
+                        availability = %s, rating = %s, updated_at = CURRENT_TIMESTAMP
                     WHERE id = %s;
                     """,
-                    (name, email, experience, skills, profile_summary, profile_id)
+                    (name, email, experience, skills, profile_summary, availability, rating, profile_id)
                 )
                 conn.commit()
+        _sync_indexes(profile_id, name, skills, experience, profile_summary)
 
     @staticmethod
     def delete(profile_id):
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM consultant_profiles WHERE id = %s;", (profile_id,))
-                conn.commit()
\ No newline at end of file
+                # Lets other processes' consultant catalogs drop it without scanning the table
+                cursor.execute("INSERT INTO consultant_deletions (consultant_id) VALUES (%s);", (profile_id,))
+                conn.commit()
+        _drop_indexes(profile_id)
\ No newline at end of file
@@ -0,0 +1,111 @@
+from backend.database import get_db_connection
+from psycopg2.extras import RealDictCursor
+import json
+
+class EmailOutbox:
+    """
+    Transactional outbox for notification emails. Rows are written in the same transaction
+    as the matching result they report on, and the outbox sender delivers them later;
+    senders claim rows with ``FOR UPDATE SKIP LOCKED``, like the matching job queue.
+    """
+
+    @staticmethod
+    def add(cursor, emails, job_description_id=None, matching_result_id=None, max_attempts=5):
+        """Queue emails on the caller's cursor, so they commit (or roll back) with the caller's transaction"""
+        for email in emails:
+            cursor.execute(
+                """
+                INSERT INTO email_outbox (job_description_id, matching_result_id, recipients, subject, html, max_attempts)
+                VALUES (%s, %s, %s, %s, %s, %s);
+                """,
+                (job_description_id, matching_result_id, json.dumps(email["recipients"]), email["subject"], email["html"], max_attempts)
+            )
+
+    @staticmethod
+    def claim(sender, limit):
+        """Mark up to ``limit`` due emails as sending for ``sender``, oldest first, and return them"""
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    """
+                    UPDATE email_outbox
+                    SET status = 'sending', attempts = attempts + 1, sender = %s, locked_at = CURRENT_TIMESTAMP
+                    WHERE id IN (
+                        SELECT id FROM email_outbox
+                        WHERE status = 'queued' AND run_after <= CURRENT_TIMESTAMP
+                        ORDER BY id
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT %s
+                    )
+                    RETURNING *;
+                    """,
+                    (sender, limit)
+                )
+                emails = cursor.fetchall()
+                conn.commit()
+                return sorted(emails, key=lambda email: email['id'])
+
+    @staticmethod
+    def mark_sent(outbox_id):
+        """Mark an email delivered and flag its matching result as emailed"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    WITH sent AS (
+                        UPDATE email_outbox
+                        SET status = 'sent', error = NULL, locked_at = NULL, sent_at = CURRENT_TIMESTAMP
+                        WHERE id = %s
+                        RETURNING matching_result_id
+                    )
+                    UPDATE matching_results
+                    SET results = jsonb_set(results, '{email_sent}', 'true'), updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (SELECT matching_result_id FROM sent) AND results IS NOT NULL;
+                    """,
+                    (outbox_id,)
+                )
+                conn.commit()
+
+    @staticmethod
+    def fail(outbox_id, error, retry_seconds):
+        """Requeue after ``retry_seconds`` (times the attempt number) while attempts remain, else mark failed"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE email_outbox
+                    SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                        run_after = CURRENT_TIMESTAMP + make_interval(secs => %s * attempts),
+                        error = %s, locked_at = NULL
+                    WHERE id = %s;
+                    """,
+                    (retry_seconds, error, outbox_id)
+                )
+                conn.commit()
+
+    @staticmethod
+    def requeue_stale(timeout_seconds):
+        """Put back emails whose sender died mid-batch; returns their ids"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE email_outbox
+                    SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                        error = 'sender lost', locked_at = NULL
+                    WHERE status = 'sending' AND locked_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    RETURNING id;
+                    """,
+                    (timeout_seconds,)
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+                conn.commit()
+                return ids
+
+    @staticmethod
+    def counts():
+        """Emails per status"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status;")
+                return dict(cursor.fetchall())
@@ -1,5 +1,22 @@
 from backend.database import get_db_connection
 from psycopg2.extras import RealDictCursor
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _sync_job_index(jd_id, title, description, skills):
+    """Keep the stored JD embedding and the job index current; reverse matching re-encodes lazily if this fails."""
+    from backend.services.embedding_store import embedding_store, job_text_of
+    from backend.services.vector_index import job_index
+    try:
+        job = {"id": jd_id, "title": title, "description": description, "skills": skills}
+        job_index.upsert(jd_id, embedding_store.get_job_embeddings([job]), embedding_store.content_hash(job_text_of(job)))
+    except Exception as e:
+        logger.warning(f"Could not refresh embedding for job {jd_id}: {e}")
+
+def _drop_job_index(jd_id):
+    from backend.services.vector_index import job_index
+    job_index.remove(jd_id)
 
 class JobDescription:
     @staticmethod
@@ -15,7 +32,8 @@ class JobDescription:
                 )
                 jd_id = cursor.fetchone()[0]
                 conn.commit()
-                return jd_id
+        _sync_job_index(jd_id, title, description, skills)
+        return jd_id
 
     @staticmethod
     def get_by_id(jd_id):
@@ -24,6 +42,13 @@ class JobDescription:
                 cursor.execute("SELECT * FROM job_descriptions WHERE id = %s;", (jd_id,))
                 return cursor.fetchone()
 
+    @staticmethod
+    def get_many(jd_ids):
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM job_descriptions WHERE id = ANY(%s);", (list(jd_ids),))
+                return cursor.fetchall()
+
     @staticmethod
     def get_all():
         with get_db_connection() as conn:
@@ -51,10 +76,12 @@ class JobDescription:
                     (title, description, skills, jd_id)
                 )
                 conn.commit()
+        _sync_job_index(jd_id, title, description, skills)
 
     @staticmethod
     def delete(jd_id):
         with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM job_descriptions WHERE id = %s;", (jd_id,))
-                conn.commit()
\ No newline at end of file
+                conn.commit()
+        _drop_job_index(jd_id)
\ No newline at end of file
@@ -0,0 +1,63 @@
+from backend.database import get_db_connection
+from psycopg2 import Binary
+from psycopg2.extras import RealDictCursor, execute_values
+
+class JobEmbedding:
+    @staticmethod
+    def upsert(job_id, content_hash, model, dim, embedding, dtype='float32', scale=None):
+        JobEmbedding.upsert_many([(job_id, content_hash, model, dim, embedding, dtype, scale)])
+
+    @staticmethod
+    def upsert_many(rows):
+        """Insert or replace embeddings given (job_id, content_hash, model, dim, bytes, dtype, scale) tuples."""
+        if not rows:
+            return
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO job_embeddings (job_id, content_hash, model, dim, embedding, dtype, scale)
+                    VALUES %s
+                    ON CONFLICT (job_id) DO UPDATE
+                    SET content_hash = EXCLUDED.content_hash, model = EXCLUDED.model, dim = EXCLUDED.dim,
+                        embedding = EXCLUDED.embedding, dtype = EXCLUDED.dtype, scale = EXCLUDED.scale,
+                        updated_at = CURRENT_TIMESTAMP;
+                    """,
+                    [(cid, h, model, dim, Binary(emb), dtype, scale) for cid, h, model, dim, emb, dtype, scale in rows]
+                )
+                conn.commit()
+
+    @staticmethod
+    def get_many(job_ids):
+        if not job_ids:
+            return []
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    "SELECT job_id, content_hash, model, dim, embedding, dtype, scale FROM job_embeddings WHERE job_id = ANY(%s);",
+                    (list(job_ids),)
+                )
+                return cursor.fetchall()
+
+    @staticmethod
+    def get_hashes(model):
+        """{job_id: content_hash} of every embedding stored for the given model"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT job_id, content_hash FROM job_embeddings WHERE model = %s;", (model,))
+                return dict(cursor.fetchall())
+
+    @staticmethod
+    def get_all():
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT job_id, content_hash, model, dim, embedding, dtype, scale FROM job_embeddings ORDER BY job_id;")
+                return cursor.fetchall()
+
+    @staticmethod
+    def delete(job_id):
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM job_embeddings WHERE job_id = %s;", (job_id,))
+                conn.commit()
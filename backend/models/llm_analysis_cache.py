@@ -0,0 +1,65 @@
+from backend.database import get_db_connection
+from psycopg2.extras import RealDictCursor, Json, execute_values
+
+class LLMAnalysisCache:
+    @staticmethod
+    def get_many(cache_keys):
+        """Return {cache_key: analysis} for the keys present, marking them as recently used"""
+        if not cache_keys:
+            return {}
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    """
+                    UPDATE llm_analysis_cache SET last_used_at = CURRENT_TIMESTAMP
+                    WHERE cache_key = ANY(%s)
+                    RETURNING cache_key, analysis;
+                    """,
+                    (list(cache_keys),)
+                )
+                rows = cursor.fetchall()
+                conn.commit()
+                return {row['cache_key']: row['analysis'] for row in rows}
+
+    @staticmethod
+    def put_many(model, entries):
+        """Store (cache_key, analysis) pairs"""
+        if not entries:
+            return
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO llm_analysis_cache (cache_key, model, analysis)
+                    VALUES %s
+                    ON CONFLICT (cache_key) DO UPDATE
+                    SET analysis = EXCLUDED.analysis, last_used_at = CURRENT_TIMESTAMP;
+                    """,
+                    [(key, model, Json(analysis)) for key, analysis in entries]
+                )
+                conn.commit()
+
+    @staticmethod
+    def count():
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM llm_analysis_cache;")
+                return cursor.fetchone()[0]
+
+    @staticmethod
+    def evict(max_entries):
+        """Delete least recently used entries beyond max_entries; returns the number removed"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    DELETE FROM llm_analysis_cache WHERE cache_key IN (
+                        SELECT cache_key FROM llm_analysis_cache ORDER BY last_used_at DESC OFFSET %s
+                    );
+                    """,
+                    (max_entries,)
+                )
+                removed = cursor.rowcount
+                conn.commit()
+                return removed
@@ -0,0 +1,51 @@
+from backend.database import get_db_connection
+from psycopg2.extras import RealDictCursor
+import json
+
+class MatchingCheckpoint:
+    """
+    Output of each completed stage of a matching run (shortlist, comparison, ranking,
+    communication), keyed by the run key, so a retried run resumes after its last
+    completed stage.
+    """
+
+    @staticmethod
+    def save(run_key, job_description_id, stage, output):
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO matching_checkpoints (run_key, stage, job_description_id, output)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (run_key, stage) DO UPDATE
+                    SET output = EXCLUDED.output, created_at = CURRENT_TIMESTAMP;
+                    """,
+                    (run_key, stage, job_description_id, json.dumps(output))
+                )
+                conn.commit()
+
+    @staticmethod
+    def get_completed(run_keys, max_age_seconds):
+        """{run key: {stage: output}} for checkpoints newer than ``max_age_seconds``"""
+        if not run_keys:
+            return {}
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    """
+                    SELECT run_key, stage, output FROM matching_checkpoints
+                    WHERE run_key = ANY(%s) AND created_at > CURRENT_TIMESTAMP - make_interval(secs => %s);
+                    """,
+                    (list(run_keys), max_age_seconds)
+                )
+                completed = {}
+                for row in cursor.fetchall():
+                    completed.setdefault(row['run_key'], {})[row['stage']] = row['output']
+                return completed
+
+    @staticmethod
+    def clear(run_key):
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM matching_checkpoints WHERE run_key = %s;", (run_key,))
+                conn.commit()
@@ -0,0 +1,174 @@
+from backend.database import get_db_connection
+from psycopg2.extras import RealDictCursor
+import json
+
+class IdempotencyKeyReused(ValueError):
+    """An Idempotency-Key was sent again with a different request"""
+
+class MatchingJob:
+    """
+    Rows of the matching_jobs queue. Workers claim queued rows with
+    ``FOR UPDATE SKIP LOCKED``, so any number of worker processes can drain the
+    same queue without claiming a row twice.
+    """
+
+    @staticmethod
+    def enqueue(kind, job_description_id=None, payload=None, priority=0, max_attempts=3, idempotency_key=None, dedupe_key=None, idempotency_hash=None):
+        """
+        Insert a queued job and return its id. A job already holding ``idempotency_key``, or a
+        queued/running job with the same ``dedupe_key``, is returned instead of inserting a
+        duplicate (the unique indexes make this hold across processes); a queued job found that
+        way is raised to ``priority`` if that is higher. Raises ``IdempotencyKeyReused`` when the
+        key is held by a job enqueued with a different ``idempotency_hash``.
+        """
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                # The job found by a dedupe key may finish between the insert and the lookup
+                for _ in range(3):
+                    cursor.execute(
+                        """
+                        INSERT INTO matching_jobs (kind, job_description_id, payload, priority, max_attempts, idempotency_key, dedupe_key, idempotency_hash)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT DO NOTHING
+                        RETURNING id;
+                        """,
+                        (kind, job_description_id, json.dumps(payload or {}), priority, max_attempts, idempotency_key, dedupe_key, idempotency_hash)
+                    )
+                    row = cursor.fetchone()
+                    if row is None:
+                        # Rows written before request hashes were recorded match any request
+                        cursor.execute(
+                            """
+                            SELECT id, COALESCE(idempotency_key = %s AND idempotency_hash <> %s, FALSE) AS reused
+                            FROM matching_jobs
+                            WHERE idempotency_key = %s OR (dedupe_key = %s AND status IN ('queued', 'running'))
+                            ORDER BY idempotency_key = %s DESC NULLS LAST, id DESC
+                            LIMIT 1;
+                            """,
+                            (idempotency_key, idempotency_hash, idempotency_key, dedupe_key, idempotency_key)
+                        )
+                        row = cursor.fetchone()
+                        if row is not None and row[1]:
+                            conn.rollback()
+                            raise IdempotencyKeyReused(f"Idempotency-Key {idempotency_key!r} was already used for a different request (matching job {row[0]})")
+                        if row is not None:
+                            cursor.execute(
+                                "UPDATE matching_jobs SET priority = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s AND status = 'queued' AND priority < %s;",
+                                (priority, row[0], priority)
+                            )
+                    conn.commit()
+                    if row is not None:
+                        return row[0]
+                raise RuntimeError(f"Could not enqueue {kind} matching job (dedupe key {dedupe_key})")
+
+    @staticmethod
+    def claim(worker, limit=1):
+        """Mark up to ``limit`` runnable jobs as running for ``worker``, highest priority first, and return them"""
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    """
+                    UPDATE matching_jobs
+                    SET status = 'running', attempts = attempts + 1, worker = %s,
+                        locked_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (
+                        SELECT id FROM matching_jobs
+                        WHERE status = 'queued' AND run_after <= CURRENT_TIMESTAMP
+                        ORDER BY priority DESC, id
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT %s
+                    )
+                    RETURNING *;
+                    """,
+                    (worker, limit)
+                )
+                jobs = cursor.fetchall()
+                conn.commit()
+                return sorted(jobs, key=lambda job: (-job['priority'], job['id']))
+
+    @staticmethod
+    def complete(queue_id, worker, result):
+        """Record the result; False when ``worker`` no longer holds the job (its lock expired and it was requeued)"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE matching_jobs
+                    SET status = 'completed', result = %s, error = NULL, locked_at = NULL,
+                        finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND worker = %s AND status = 'running';
+                    """,
+                    (json.dumps(result, default=str), queue_id, worker)
+                )
+                conn.commit()
+                return cursor.rowcount > 0
+
+    @staticmethod
+    def fail(queue_id, worker, error, retry_seconds):
+        """
+        Requeue after ``retry_seconds`` (times the attempt number) while attempts remain, else mark
+        failed; False when ``worker`` no longer holds the job
+        """
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE matching_jobs
+                    SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                        run_after = CURRENT_TIMESTAMP + make_interval(secs => %s * attempts),
+                        finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE CURRENT_TIMESTAMP END,
+                        error = %s, locked_at = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND worker = %s AND status = 'running';
+                    """,
+                    (retry_seconds, error, queue_id, worker)
+                )
+                conn.commit()
+                return cursor.rowcount > 0
+
+    @staticmethod
+    def requeue_stale(timeout_seconds):
+        """Put jobs back whose worker stopped renewing its lock (crashed or killed); returns their ids"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE matching_jobs
+                    SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                        finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE CURRENT_TIMESTAMP END,
+                        error = 'worker lost', locked_at = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE status = 'running' AND locked_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    RETURNING id;
+                    """,
+                    (timeout_seconds,)
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+                conn.commit()
+                return ids
+
+    @staticmethod
+    def heartbeat(worker, queue_ids):
+        """Renew the locks ``worker`` still holds"""
+        if not queue_ids:
+            return
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE matching_jobs SET locked_at = CURRENT_TIMESTAMP WHERE id = ANY(%s) AND worker = %s AND status = 'running';",
+                    (list(queue_ids), worker)
+                )
+                conn.commit()
+
+    @staticmethod
+    def get_by_id(queue_id):
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM matching_jobs WHERE id = %s;", (queue_id,))
+                return cursor.fetchone()
+
+    @staticmethod
+    def counts():
+        """Jobs per status"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT status, COUNT(*) FROM matching_jobs GROUP BY status;")
+                return dict(cursor.fetchall())
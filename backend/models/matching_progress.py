@@ -0,0 +1,41 @@
+from backend.database import get_db_connection
+from psycopg2.extras import RealDictCursor
+import json
+
+STAGES = ("comparison", "ranking", "communication")
+
+class MatchingProgress:
+    """One row per job with the status and progress of each agent stage, plus the partial results"""
+
+    @staticmethod
+    def upsert_stage(job_description_id, stage, status, progress, partial_results=None, reset=False):
+        """
+        Record one stage's status. ``partial_results`` replaces the stored list when given;
+        ``reset`` marks the other stages idle (a new run is starting).
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown matching stage '{stage}', expected one of {STAGES}")
+        others = [s for s in STAGES if s != stage]
+        reset_sql = "".join(f", {s}_status = 'idle', {s}_progress = 0" for s in others) if reset else ""
+        partial = json.dumps(partial_results) if partial_results is not None else None
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO matching_progress (job_description_id, {stage}_status, {stage}_progress, partial_results)
+                    VALUES (%s, %s, %s, COALESCE(%s::jsonb, '[]'::jsonb))
+                    ON CONFLICT (job_description_id) DO UPDATE
+                    SET {stage}_status = EXCLUDED.{stage}_status, {stage}_progress = EXCLUDED.{stage}_progress,
+                        partial_results = COALESCE(%s::jsonb, matching_progress.partial_results),
+                        updated_at = CURRENT_TIMESTAMP{reset_sql};
+                    """,
+                    (job_description_id, status, progress, partial, partial)
+                )
+                conn.commit()
+
+    @staticmethod
+    def get(job_description_id):
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("SELECT * FROM matching_progress WHERE job_description_id = %s;", (job_description_id,))
+                return cursor.fetchone()
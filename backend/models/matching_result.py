@@ -1,6 +1,8 @@
 from typing import Optional
 from datetime import datetime
 from backend.database import get_db_connection
+from psycopg2.extras import RealDictCursor
+from backend.models.email_outbox import EmailOutbox
 import json
 
 class MatchingResult:
@@ -27,6 +29,23 @@ class MatchingResult:
                 conn.commit()
                 return result_id
 
+    @staticmethod
+    def create_with_emails(job_description_id, results, emails, max_attempts=5):
+        """Insert a completed result and queue its emails in the outbox, in one transaction"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO matching_results (job_description_id, status, results)
+                    VALUES (%s, 'COMPLETED', %s) RETURNING id;
+                    """,
+                    (job_description_id, json.dumps(results))
+                )
+                result_id = cursor.fetchone()[0]
+                EmailOutbox.add(cursor, emails, job_description_id, result_id, max_attempts)
+                conn.commit()
+                return result_id
+
     @staticmethod
     def get_by_id(result_id):
         with get_db_connection() as conn:
@@ -47,6 +66,40 @@ class MatchingResult:
                 )
                 return cursor.fetchall()
 
+    @staticmethod
+    def get_latest_by_job_ids(job_description_ids):
+        """Most recent result row per job"""
+        if not job_description_ids:
+            return []
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    """
+                    SELECT DISTINCT ON (job_description_id) *
+                    FROM matching_results
+                    WHERE job_description_id = ANY(%s)
+                    ORDER BY job_description_id, created_at DESC;
+                    """,
+                    (list(job_description_ids),)
+                )
+                return cursor.fetchall()
+
+    @staticmethod
+    def update_shortlist(result_id, shortlist):
+        """Replace only the stored shortlist, leaving the rest of the results document untouched"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE matching_results
+                    SET results = jsonb_set(COALESCE(results, '{}'::jsonb), '{shortlist}', %s::jsonb),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s;
+                    """,
+                    (json.dumps(shortlist), result_id)
+                )
+                conn.commit()
+
     @staticmethod
     def update_status(result_id, status):
         with get_db_connection() as conn:
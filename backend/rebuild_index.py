@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import argparse
+import logging
+
+# Add the project root to the Python path
+# This allows the script to be run from the 'backend' directory or the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.services.vector_index import ConsultantIndex, INDEX_TYPES
+from backend.services.quantization import EMBEDDING_DTYPES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def rebuild_index(index_type=None, snapshot_path=None, **params):
+    """
+    Train and build the consultant index from the stored embeddings and report its stats.
+    With a snapshot path (or VECTOR_INDEX_PATH) the result is published and running workers switch to it.
+    """
+    index = ConsultantIndex(index_type, snapshot_path, **params)
+    started = time.perf_counter()
+    index.rebuild_from_store()
+    stats = index.stats()
+    stats["build_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Consultant index rebuilt: {stats}")
+    return index, stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and rebuild the consultant vector index")
+    parser.add_argument("--type", choices=INDEX_TYPES, help="index type (defaults to VECTOR_INDEX_TYPE)")
+    parser.add_argument("--nlist", type=int)
+    parser.add_argument("--nprobe", type=int)
+    parser.add_argument("--pq-m", type=int, dest="pq_m")
+    parser.add_argument("--hnsw-m", type=int, dest="hnsw_m")
+    parser.add_argument("--ef-search", type=int, dest="ef_search")
+    parser.add_argument("--path", help="snapshot directory to publish to (defaults to VECTOR_INDEX_PATH)")
+    parser.add_argument("--dtype", choices=EMBEDDING_DTYPES, help="in-memory precision (defaults to EMBEDDING_DTYPE)")
+    args = parser.parse_args()
+    overrides = {k: v for k, v in vars(args).items() if k not in ("type", "path") and v is not None}
+    rebuild_index(args.type, args.path, **overrides)
@@ -20,6 +20,7 @@ class ConsultantProfileCreate(BaseModel):
     experience: int
     bio: Optional[str] = None
     availability: str = "available"
+    rating: Optional[float] = None
 
 class ConsultantProfileUpdate(BaseModel):
     name: Optional[str] = None
@@ -44,4 +44,7 @@ class JobDescriptionResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class JobMatchResponse(JobDescriptionResponse):
+    score: float
@@ -6,6 +6,48 @@ class MatchingRequest(BaseModel):
     job_id: int
     consultant_ids: List[int]
 
+class ConsultantFilters(BaseModel):
+    """Structured eligibility filters applied before similarity search"""
+    min_experience: Optional[int] = None
+    max_experience: Optional[int] = None
+    availability: Optional[str] = "available"
+    min_rating: Optional[float] = None
+
+    def allows(self, consultant: Dict[str, Any]) -> bool:
+        """Whether one profile row passes, by the same rules as the catalog's vectorized filter"""
+        experience, rating = consultant.get("experience"), consultant.get("rating")
+        if self.min_experience is not None and (experience is None or experience < self.min_experience):
+            return False
+        if self.max_experience is not None and (experience is None or experience > self.max_experience):
+            return False
+        if self.availability is not None and consultant.get("availability", "available") != self.availability:
+            return False
+        # Unrated never passes a rating filter
+        return self.min_rating is None or (rating is not None and rating >= self.min_rating)
+
+class BatchMatchingRequest(BaseModel):
+    job_ids: List[int]
+    filters: Optional[ConsultantFilters] = None
+    priority: int = 0
+
+class MatchingJobRequest(BaseModel):
+    job_id: int
+    filters: Optional[ConsultantFilters] = None
+    priority: int = 0
+
+class MatchingJobResponse(BaseModel):
+    id: int
+    kind: str
+    job_id: Optional[int] = None
+    status: str
+    priority: int
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
 class MatchingResultResponse(BaseModel):
     id: int
     job_id: int
@@ -13,6 +55,8 @@ class MatchingResultResponse(BaseModel):
     department: str
     similarity_score: float
     top_matches: List[Dict[str, Any]]
+    # Current top-k (consultant_id, consultant_name, score), kept fresh by push re-scoring
+    shortlist: List[Dict[str, Any]] = []
     email_sent: bool
     email_recipients: List[str] = []
     created_at: datetime
@@ -21,6 +65,18 @@ class MatchingResultResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class StageStatus(BaseModel):
+    status: str
+    progress: float
+
+class MatchingProgressResponse(BaseModel):
+    job_id: int
+    comparison: StageStatus
+    ranking: StageStatus
+    communication: StageStatus
+    partial_results: List[Dict[str, Any]] = []
+    updated_at: Optional[datetime] = None
+
 class AgentStatusResponse(BaseModel):
     job_id: int
     status: str
@@ -1,6 +1,17 @@
-from .auth_service import AuthService
-from .matching_service import MatchingService
-from .email_service import EmailService
-from .agent_service import AgentService
+from importlib import import_module
 
-__all__ = ["AuthService", "MatchingService", "EmailService", "AgentService"]
\ No newline at end of file
+# Services are imported on first attribute access, so importing one service module
+# (e.g. from a CLI tool) does not drag in FastAPI, SQLAlchemy and the model stack
+_SERVICES = {
+    "AuthService": ".auth_service",
+    "MatchingService": ".matching_service",
+    "EmailService": ".email_service",
+    "AgentService": ".agent_service",
+}
+
+__all__ = ["AuthService", "MatchingService", "EmailService", "AgentService"]
+
+def __getattr__(name):
+    if name in _SERVICES:
+        return getattr(import_module(_SERVICES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
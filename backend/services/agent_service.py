@@ -1,165 +1,422 @@
 import asyncio
+import heapq
 import json
-from typing import List, Dict, Any, Tuple
-from openai import AzureOpenAI
-from sqlalchemy.orm import Session
-from backend.models.agent_status import AgentStatus
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+import numpy as np
+from backend.models.matching_progress import MatchingProgress
 from backend.models.consultant_profile import ConsultantProfile
 from backend.models.job_description import JobDescription
 from backend.config import get_settings
-import faiss
-import numpy as np
 from backend.services.email_service import email_service
-from sentence_transformers import SentenceTransformer
-import google.generativeai as genai
-from sklearn.metrics.pairwise import cosine_similarity
+from backend.services.embedding_store import embedding_store, consultant_id_of, consultant_text_of, job_text_of
+from backend.services.vector_index import consultant_index, job_index
+from backend.services.skill_index import skill_index
+from backend.services.skill_matrix import skill_matrix
+from backend.services.consultant_catalog import consultant_catalog
+from backend.services.batch_scoring import chunked_top_k, normalize_rows, row_blocks
+from backend.services.llm_client import llm_client
+from backend.services.analysis_cache import analysis_cache
+from backend.services.stream_parser import IncrementalJSONArrayParser
 from backend.logging import logging
+if TYPE_CHECKING:
+    # Only used in annotations; importing sqlalchemy.orm costs ~250ms at startup
+    from sqlalchemy.orm import Session
 
 settings = get_settings()
 
 class AgentService:
     def __init__(self):
-        # Google Gemini setup
-        genai.configure(api_key=settings.google_api_key)
-        self.llm_model = genai.GenerativeModel(settings.llm)
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.index = None
-        self.profile_id_map = {}
+        # Google Gemini calls go through the shared non-blocking, concurrency-limited client
+        self.llm = llm_client
+        # Results of comparisons still in flight, by job id (dropped once the run ends)
+        self.partial_results: Dict[int, List[Dict[str, Any]]] = {}
+        # Models and the vector index load lazily; warmup() preloads them in the background
+        self.warmup_error = None
+
+    @property
+    def embedding_model(self):
+        return embedding_store.model
+
+    def warmup(self):
+        """Load the embedding model, configure the LLM client and build the consultant, skill and job indexes and the consultant catalog"""
+        try:
+            started = time.perf_counter()
+            embedding_store.encode(["warmup"])
+            self.llm.model  # configure Gemini once, off the request path
+            consultant_index.ensure_built()
+            skill_index.ensure_built()
+            skill_matrix.ensure_built()
+            job_index.ensure_built()
+            consultant_catalog.ensure_built()
+            self.warmup_error = None
+            logging.info(f"Agent warmup completed in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            self.warmup_error = str(e)
+            logging.error(f"Agent warmup failed: {e}")
+
+    def readiness(self) -> Dict[str, Any]:
+        """Ready once the embedding model is loaded and the vector and skill indexes are built"""
+        checks = {
+            "embedding_model_loaded": embedding_store.is_loaded,
+            "vector_index_built": consultant_index.is_built,
+            "skill_index_built": skill_index.is_built,
+            "skill_matrix_built": skill_matrix.is_built,
+        }
+        return {"ready": all(checks.values()), **checks, "error": self.warmup_error}
 
     async def update_agent_status(
         self, 
-        db: Session, 
+        db: "Session", 
         job_id: int, 
         agent_type: str, 
         status: str, 
         progress: float
     ):
-        """Update agent status in database"""
-        agent_status = db.query(AgentStatus).filter(AgentStatus.job_id == job_id).first()
-        if not agent_status:
-            agent_status = AgentStatus(job_id=job_id)
-            db.add(agent_status)
-
-        if agent_type == "comparison":
-            agent_status.comparison_status = status
-            agent_status.comparison_progress = progress
-        elif agent_type == "ranking":
-            agent_status.ranking_status = status
-            agent_status.ranking_progress = progress
-        elif agent_type == "communication":
-            agent_status.communication_status = status
-            agent_status.communication_progress = progress
-
-        db.commit()
-        db.refresh(agent_status)
+        """
+        Record a stage's status (and, for comparison, the partial results so far) in
+        matching_progress, which status polling reads; a failed write never fails the run
+        """
+        try:
+            partial = self.partial_results.get(job_id, []) if agent_type == "comparison" else None
+            starting = agent_type == "comparison" and status == "in-progress" and progress == 0
+            await asyncio.to_thread(MatchingProgress.upsert_stage, job_id, agent_type, status, progress, partial, starting)
+        except Exception as e:
+            logging.warning(f"Could not record {agent_type} status for job_id={job_id}: {e}")
 
     def build_faiss_index(self, consultant_profiles):
-        """Build a FAISS index from consultant profiles."""
-        embeddings = []
-        self.profile_id_map = {}
-        for i, profile in enumerate(consultant_profiles):
-            text = f"{profile.name} {profile.skills} {profile.experience} {profile.bio or ''}"
-            emb = self.embedding_model.encode(text)
-            embeddings.append(emb)
-            self.profile_id_map[i] = profile
-        embeddings = np.vstack(embeddings).astype('float32')
-        self.index = faiss.IndexFlatL2(embeddings.shape[1])
-        self.index.add(embeddings)
+        """Rebuild the consultant index from scratch (ids map back to consultant ids)."""
+        embeddings = embedding_store.get_embeddings(consultant_profiles)
+        return consultant_index.rebuild([consultant_id_of(p) for p in consultant_profiles], embeddings)
 
     def retrieve_similar_profiles(self, job_description, consultant_profiles, top_k=5):
-        """Retrieve top_k similar consultant profiles using FAISS."""
-        if self.index is None:
-            self.build_faiss_index(consultant_profiles)
-        jd_text = f"{job_description.title} {job_description.skills} {job_description.experience_required} {job_description.description}"
-        jd_emb = self.embedding_model.encode(jd_text).astype('float32').reshape(1, -1)
-        D, I = self.index.search(jd_emb, top_k)
-        return [self.profile_id_map[idx] for idx in I[0]]
+        """Retrieve top_k similar consultant profiles using the incrementally maintained FAISS index."""
+        consultant_index.ensure_built()
+        jd_text = self._jd_text(job_description)
+        jd_emb = embedding_store.encode([jd_text])
+        ids, scores, version = consultant_index.search(jd_emb, top_k)
+        logging.info(f"Searched consultant index version {version}, {len(ids)} hits")
+        profiles_by_id = {consultant_id_of(p): p for p in consultant_profiles}
+        return [profiles_by_id[i] for i in ids if i in profiles_by_id]
 
     async def comparison_agent(
         self, 
-        db: Session, 
+        db: "Session", 
         job_description: JobDescription, 
         consultant_profiles: List[ConsultantProfile]
     ) -> List[Dict[str, Any]]:
         """
         Comparison Agent: Compare job description with consultant profiles using Google Gemini
         """
+        jd_text, top_profiles, top_scores = await self.shortlist(db, job_description, consultant_profiles)
+        return await self.compare_shortlist(db, job_description, jd_text, top_profiles, top_scores)
+
+    async def shortlist(
+        self,
+        db: "Session",
+        job_description: JobDescription,
+        consultant_profiles: List[ConsultantProfile]
+    ) -> Tuple[str, List[ConsultantProfile], List[float]]:
+        """Retrieval stage of the comparison agent: (jd_text, shortlisted profiles, fused scores)"""
         job_id = job_description.job_id if hasattr(job_description, 'job_id') else job_description.id
         logging.info(f"Starting comparison agent for job_id={job_id}")
         await self.update_agent_status(db, job_id, "comparison", "in-progress", 0)
 
         # 1. Convert job description to embedding
-        jd_text = f"{job_description.title} {job_description.skills} {job_description.experience_required} {job_description.description}"
-        jd_emb = self.embedding_model.encode(jd_text).reshape(1, -1)
+        jd_text = self._jd_text(job_description)
+        jd_emb = await embedding_store.aencode([jd_text])
         logging.info(f"Job description embedding generated for job_id={job_id}")
 
-        # 2. Convert all consultant profiles to embeddings
-        consultant_texts = [
-            f"{c.name} {c.skills} {c.experience} {getattr(c, 'bio', getattr(c, 'profile_summary', ''))}"
-            for c in consultant_profiles
-        ]
-        consultant_embs = self.embedding_model.encode(consultant_texts)
-        logging.info(f"Consultant profile embeddings generated for job_id={job_id}, num_profiles={len(consultant_profiles)}")
-
-        # 3. Compute cosine similarity between JD and all consultant profiles
-        similarities = cosine_similarity(jd_emb, consultant_embs)[0]
-        top_indices = np.argsort(similarities)[-10:][::-1]  # Top 10 most similar
-        top_profiles = [consultant_profiles[i] for i in top_indices]
-        top_scores = [similarities[i] for i in top_indices]
-        logging.info(f"Top 10 consultant profiles selected for LLM comparison for job_id={job_id}")
-
-        # 4. Prepare batch prompt for LLM
-        batch_prompt = self._create_batch_comparison_prompt(job_description, top_profiles, top_scores)
-        logging.info(f"Calling LLM for job_id={job_id} with batch of {len(top_profiles)} profiles")
-        logging.debug(f"LLM batch prompt: {batch_prompt}")
-        try:
-            response = self.llm_model.generate_content(batch_prompt)
-            logging.info(f"LLM raw response for job_id={job_id}: {getattr(response, 'text', str(response))}")
-        except Exception as e:
-            logging.error(f"LLM call failed for job_id={job_id}: {e}")
-            raise
-        logging.info(f"LLM response received for job_id={job_id}")
-        # Assume LLM returns a JSON list of results for each profile
+        # 2. Make sure every candidate has a stored embedding in the consultant index (DB reads and any
+        # encoding run on a helper thread and the embedding worker, never on the event loop)
+        index_version = await asyncio.to_thread(consultant_index.ensure_indexed, consultant_profiles)
+        await asyncio.to_thread(skill_index.ensure_indexed, consultant_profiles)
+        await asyncio.to_thread(skill_matrix.ensure_indexed, consultant_profiles)
+        logging.info(f"Consultant index version {index_version} ready for job_id={job_id}, num_profiles={len(consultant_profiles)}")
+
+        # 3. Hybrid shortlist: the skill index proposes candidates, dense similarity re-scores them
+        profiles_by_id = {consultant_id_of(c): c for c in consultant_profiles}
+        candidate_ids = list(profiles_by_id)
+        top_ids, top_scores = await asyncio.to_thread(
+            self._hybrid_shortlist,
+            job_description.skills,
+            candidate_ids,
+            lambda ids: consultant_index.score(jd_emb, ids),
+            lambda k: consultant_index.search(jd_emb, k, candidate_ids)[:2]
+        )
+        top_profiles = [profiles_by_id[i] for i in top_ids]
+        logging.info(f"Top {len(top_profiles)} consultant profiles selected for LLM comparison for job_id={job_id}")
+        return jd_text, top_profiles, top_scores
+
+    async def compare_shortlist(
+        self,
+        db: "Session",
+        job_description: JobDescription,
+        jd_text: str,
+        top_profiles: List[ConsultantProfile],
+        top_scores: List[float]
+    ) -> List[Dict[str, Any]]:
+        """LLM stage of the comparison agent for an already shortlisted set of consultants"""
+        job_id = job_description.job_id if hasattr(job_description, 'job_id') else job_description.id
         try:
-            analysis_list = self._parse_batch_comparison_response(response.text)
-        except Exception as e:
-            logging.error(f"Failed to parse LLM response for job_id={job_id}: {e}")
-            analysis_list = []
+            return await self._compare_shortlist(db, job_id, job_description, jd_text, top_profiles, top_scores)
+        finally:
+            # matching_progress has every result recorded so far; the in-memory list only lives for the run
+            self.partial_results.pop(job_id, None)
+
+    async def _compare_shortlist(
+        self,
+        db: "Session",
+        job_id: int,
+        job_description: JobDescription,
+        jd_text: str,
+        top_profiles: List[ConsultantProfile],
+        top_scores: List[float]
+    ) -> List[Dict[str, Any]]:
+        # Matching / missing skills come from the deterministic skill matrix, not the LLM
+        skill_scores = await asyncio.to_thread(skill_matrix.score, job_description.skills, [consultant_id_of(c) for c in top_profiles])
+
+        # 4. Reuse cached analyses for (JD, profile, model) pairs seen before; only the rest go to the LLM
+        cache_keys = [analysis_cache.key(jd_text, consultant_text_of(c)) for c in top_profiles]
+        cached = await asyncio.to_thread(analysis_cache.get_many, cache_keys)
+        analysis_list = [cached.get(key) for key in cache_keys]
+        pending = [i for i, analysis in enumerate(analysis_list) if analysis is None]
+        logging.info(f"LLM analysis cache for job_id={job_id}: {len(top_profiles) - len(pending)} hits, {len(pending)} misses")
+
+        # Partial results and progress advance as each consultant's analysis actually arrives
+        self.partial_results[job_id] = [
+            self._similarity_result(top_profiles[i], analysis, top_scores[i], skill_scores)
+            for i, analysis in enumerate(analysis_list) if analysis is not None
+        ]
+        new_entries = []
+
+        async def on_result(i, analysis):
+            if analysis_list[i] is not None or not analysis_cache.is_valid(analysis):
+                return
+            # Cached by the (JD, profile) texts, so the id the LLM echoed back is not kept
+            analysis = {field: value for field, value in analysis.items() if field != "consultant_id"}
+            analysis_list[i] = analysis
+            new_entries.append((cache_keys[i], analysis))
+            self.partial_results[job_id].append(self._similarity_result(top_profiles[i], analysis, top_scores[i], skill_scores))
+            progress = len(self.partial_results[job_id]) / len(top_profiles) * 100
+            await self.update_agent_status(db, job_id, "comparison", "in-progress", progress)
 
-        # 5. Build similarity_results from LLM output
+        if pending:
+            # Shards sized by an estimated token budget run concurrently; a failed shard only
+            # falls back for its own consultants
+            shards = self._shard_by_token_budget(job_description, pending, top_profiles, top_scores)
+            logging.info(f"Calling LLM for job_id={job_id} with {len(pending)} profiles in {len(shards)} shard(s)")
+            shard_results = await asyncio.gather(
+                *[self._analyze_shard(job_id, job_description, shard, top_profiles, top_scores, on_result) for shard in shards],
+                return_exceptions=True
+            )
+            failures = [r for r in shard_results if isinstance(r, Exception)]
+            # Analyses that streamed in before a shard failed are kept; only the consultants still
+            # missing fall back below. With nothing at all back from the LLM, fail so the run is retried.
+            if failures and len(failures) == len(shards) and not new_entries:
+                raise failures[0]
+            if failures:
+                logging.warning(f"{len(failures)}/{len(shards)} LLM shard(s) failed for job_id={job_id}; {sum(a is None for a in analysis_list)} consultants fall back to their retrieval score")
+            await asyncio.to_thread(analysis_cache.put_many, new_entries)
+
+        # 5. Build similarity_results from LLM output, in shortlist order
         similarity_results = []
         for i, consultant in enumerate(top_profiles):
-            analysis = analysis_list[i] if i < len(analysis_list) else {
+            analysis = analysis_list[i] or {
                 "similarity_score": int(top_scores[i] * 100),
                 "matching_skills": [],
                 "missing_skills": [],
                 "detailed_analysis": "LLM analysis unavailable"
             }
-            similarity_results.append({
-                "consultant_id": getattr(consultant, 'consultant_id', getattr(consultant, 'id', None)),
-                "consultant_name": consultant.name,
-                "consultant_email": consultant.email,
-                "experience": consultant.experience,
-                "similarity_score": analysis["similarity_score"],
-                "matching_skills": analysis["matching_skills"],
-                "missing_skills": analysis["missing_skills"],
-                "analysis": analysis["detailed_analysis"]
-            })
+            similarity_results.append(self._similarity_result(consultant, analysis, top_scores[i], skill_scores))
             logging.info(f"LLM result for consultant_id={similarity_results[-1]['consultant_id']} (job_id={job_id}): score={analysis['similarity_score']}, reason={analysis['detailed_analysis']}")
-            progress = ((i + 1) / len(top_profiles)) * 100
-            await self.update_agent_status(db, job_id, "comparison", "in-progress", progress)
+        self.partial_results[job_id] = similarity_results
         await self.update_agent_status(db, job_id, "comparison", "completed", 100)
         logging.info(f"Comparison agent completed for job_id={job_id}")
         return similarity_results
 
+    def batch_shortlists(self, jobs: List[JobDescription], consultant_profiles: List[ConsultantProfile]) -> Dict[int, Tuple[str, List[ConsultantProfile], List[float]]]:
+        """
+        Shortlists for many jobs against the same bench: every JD is encoded in one batch and
+        jobs x consultants is scored chunk by chunk, so memory stays bounded by the chunk size
+        however large the bench is. Returns {job id: (jd_text, top profiles, fused scores)}.
+        Blocking; run it on a worker thread.
+        """
+        started = time.perf_counter()
+        jd_texts = [self._jd_text(job) for job in jobs]
+        jd_embs = normalize_rows(embedding_store.encode(jd_texts))
+        skill_index.ensure_indexed(consultant_profiles)
+        skill_matrix.ensure_indexed(consultant_profiles)
+        # Moves changed consultants out of the snapshot matrix, so its live rows are current
+        consultant_index.ensure_indexed(consultant_profiles)
+        profiles_by_id = {consultant_id_of(c): c for c in consultant_profiles}
+        candidate_ids = list(profiles_by_id)
+        top_ids, top_dense = chunked_top_k(jd_embs, self._embedding_chunks(consultant_profiles), settings.match_shortlist_size)
+        logging.info(f"Scored {len(jobs)} jobs x {len(candidate_ids)} consultants in {time.perf_counter() - started:.2f}s")
+
+        shortlists = {}
+        for n, job in enumerate(jobs):
+            query = jd_embs[n]
+            dense_top = (top_ids[n].tolist(), top_dense[n].tolist())
+            top, top_scores = self._hybrid_shortlist(
+                job.skills,
+                candidate_ids,
+                # Only the skill candidates' vectors are read for the exact re-score
+                lambda ids: dict(zip(ids, (normalize_rows(embedding_store.get_embeddings([profiles_by_id[i] for i in ids])) @ query).tolist())),
+                lambda k: (dense_top[0][:k], dense_top[1][:k])
+            )
+            shortlists[job.id] = (jd_texts[n], [profiles_by_id[i] for i in top], top_scores)
+        return shortlists
+
+    @staticmethod
+    def _embedding_chunks(consultant_profiles: List[ConsultantProfile]):
+        """
+        (ids, vectors) for the bench, one block at a time. With a consultant index snapshot loaded,
+        its memory-mapped matrix serves every consultant whose snapshot row is still live; the rest
+        are read from the embedding store.
+        """
+        size = settings.batch_match_block_rows
+        remaining = consultant_profiles
+        matrix = consultant_index.snapshot_matrix()
+        if matrix is not None:
+            ids, vectors, live = matrix
+            wanted = np.fromiter((consultant_id_of(c) for c in consultant_profiles), dtype='int64', count=len(consultant_profiles))
+            served = set()
+            for rows, block in row_blocks(vectors, size):
+                block_ids = np.asarray(ids[rows[0]:rows[-1] + 1])
+                keep = live[rows] & np.isin(block_ids, wanted)
+                served.update(block_ids[keep].tolist())
+                yield block_ids[keep], block[keep]
+            remaining = [c for c in consultant_profiles if consultant_id_of(c) not in served]
+        for start in range(0, len(remaining), size):
+            chunk = remaining[start:start + size]
+            yield [consultant_id_of(c) for c in chunk], embedding_store.get_embeddings(chunk)
+
+    @staticmethod
+    def _jd_text(job_description) -> str:
+        return job_text_of(job_description)
+
+    def _hybrid_shortlist(self, jd_skills, candidate_ids, dense_scores_of, dense_top) -> Tuple[List[int], List[float]]:
+        """
+        Shortlist by fused score: (1 - w) * dense cosine + w * BM25 skill score (0..1).
+        Only consultants sharing a required skill are densely scored (``dense_scores_of(ids)``);
+        when that is fewer than a shortlist, the dense top-k (``dense_top(k)``) tops it up.
+        """
+        k = settings.match_shortlist_size
+        weight = settings.hybrid_skill_weight
+        skill_scores = dict(skill_index.search(jd_skills, settings.skill_candidate_pool, candidate_ids))
+        dense_scores = dense_scores_of(list(skill_scores)) if skill_scores else {}
+        if len(dense_scores) < k:
+            ids, scores = dense_top(k)
+            for consultant_id, score in zip(ids, scores):
+                dense_scores.setdefault(consultant_id, score)
+        fused = {i: (1 - weight) * score + weight * skill_scores.get(i, 0.0) for i, score in dense_scores.items()}
+        top = heapq.nlargest(k, fused.items(), key=lambda item: item[1])
+        logging.info(f"Hybrid shortlist: {len(skill_scores)} skill candidates, {len(dense_scores)} densely scored, {len(top)} kept")
+        return [i for i, _ in top], [score for _, score in top]
+
+    def _similarity_result(self, consultant, analysis, score, skill_scores=None) -> Dict[str, Any]:
+        matching, missing = analysis["matching_skills"], analysis["missing_skills"]
+        if skill_scores is not None and skill_scores.required:
+            matching, missing = skill_scores.skills(consultant_id_of(consultant))
+        return {
+            "consultant_id": getattr(consultant, 'consultant_id', getattr(consultant, 'id', None)),
+            "consultant_name": consultant.name,
+            "consultant_email": consultant.email,
+            "experience": consultant.experience,
+            "similarity_score": analysis["similarity_score"],
+            "matching_skills": matching,
+            "missing_skills": missing,
+            "analysis": analysis["detailed_analysis"]
+        }
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # ~4 characters per token is close enough for English prompts to size shards
+        return len(text) // 4 + 1
+
+    def _profile_block(self, c, score) -> str:
+        return f"Consultant ID: {consultant_id_of(c)}\nName: {c.name}\nSkills: {', '.join(c.skills) if isinstance(c.skills, (list, tuple)) else c.skills}\nExperience: {c.experience} years\nBio: {getattr(c, 'bio', getattr(c, 'profile_summary', 'Not provided'))}\nInitial Similarity: {int(score*100)}%"
+
+    def _shard_by_token_budget(self, job_description, indices, consultant_profiles, top_scores) -> List[List[int]]:
+        """Greedily split shortlist indices so each shard's prompt plus expected output fits the token budget"""
+        base_tokens = self._estimate_tokens(self._create_batch_comparison_prompt(job_description, [], []))
+        shards, current, used = [], [], base_tokens
+        for i in indices:
+            cost = (self._estimate_tokens(self._profile_block(consultant_profiles[i], top_scores[i]))
+                    + settings.llm_output_tokens_per_profile)
+            if current and used + cost > settings.llm_shard_token_budget:
+                shards.append(current)
+                current, used = [], base_tokens
+            current.append(i)
+            used += cost
+        if current:
+            shards.append(current)
+        return shards
+
+    async def _analyze_shard(self, job_id, job_description, shard, consultant_profiles, top_scores, on_result):
+        """
+        Run one shard through the LLM, handing each parsed analysis to ``on_result(index, analysis)``.
+        In streaming mode each consultant object is emitted as soon as it closes in the output.
+        Analyses are matched to consultants by the ``consultant_id`` they echo back, never by
+        position, so a skipped or reordered element cannot be cached against the wrong profile.
+        """
+        index_of = {consultant_id_of(consultant_profiles[i]): i for i in shard}
+
+        async def deliver(analysis):
+            i = self._shard_index(analysis, index_of)
+            if i is None:
+                logging.warning(f"Dropping LLM analysis for job_id={job_id} with unknown consultant_id: {analysis.get('consultant_id') if isinstance(analysis, dict) else analysis!r}")
+                return False
+            await on_result(i, analysis)
+            return True
+
+        batch_prompt = self._create_batch_comparison_prompt(
+            job_description, [consultant_profiles[i] for i in shard], [top_scores[i] for i in shard]
+        )
+        logging.debug(f"LLM batch prompt: {batch_prompt}")
+        try:
+            if settings.llm_streaming:
+                parser = IncrementalJSONArrayParser()
+                received = 0
+                async for text in self.llm.stream(batch_prompt):
+                    for analysis in parser.feed(text):
+                        received += await deliver(analysis)
+                logging.info(f"LLM stream finished for job_id={job_id}: {received}/{len(shard)} results")
+                return
+            response_text = await self.llm.generate(batch_prompt)
+            logging.info(f"LLM raw response for job_id={job_id}: {response_text}")
+        except Exception as e:
+            logging.error(f"LLM call failed for job_id={job_id} (shard of {len(shard)}): {e}")
+            raise
+        # Assume LLM returns a JSON list of results for each profile
+        try:
+            analyses = self._parse_batch_comparison_response(response_text)
+        except Exception as e:
+            logging.error(f"Failed to parse LLM response for job_id={job_id}: {e}")
+            return
+        for analysis in analyses:
+            await deliver(analysis)
+
+    @staticmethod
+    def _shard_index(analysis, index_of: Dict[int, int]) -> Optional[int]:
+        """Shortlist index of the consultant an analysis names, or None when it names none of the shard"""
+        if not isinstance(analysis, dict):
+            return None
+        try:
+            return index_of.get(int(analysis.get("consultant_id")))
+        except (TypeError, ValueError):
+            return None
+
     def _create_batch_comparison_prompt(self, job_description, consultant_profiles, top_scores):
         jd_str = f"Title: {job_description.title}\nDepartment: {getattr(job_description, 'department', '')}\nDescription: {job_description.description}\nRequired Skills: {', '.join(job_description.skills)}\nExperience Required: {job_description.experience_required} years"
         profiles_str = "\n\n".join([
-            f"Name: {c.name}\nSkills: {', '.join(c.skills) if isinstance(c.skills, list) else c.skills}\nExperience: {c.experience} years\nBio: {getattr(c, 'bio', getattr(c, 'profile_summary', 'Not provided'))}\nInitial Similarity: {int(top_scores[i]*100)}%"
+            self._profile_block(c, top_scores[i])
             for i, c in enumerate(consultant_profiles)
         ])
         return f"""
         Compare the following job description with these consultant profiles. For each profile, provide a JSON object with:
+        - consultant_id (integer, the profile's Consultant ID)
         - similarity_score (0-100)
         - matching_skills (list)
         - missing_skills (list)
@@ -171,7 +428,7 @@ class AgentService:
         CONSULTANT PROFILES:
         {profiles_str}
 
-        Respond as a JSON list, one object per consultant profile, in the same order.
+        Respond as a JSON list, one object per consultant profile.
         """
 
     def _parse_batch_comparison_response(self, response_text):
@@ -183,7 +440,7 @@ class AgentService:
 
     async def ranking_agent(
         self, 
-        db: Session, 
+        db: "Session", 
         job_id: int, 
         similarity_results: List[Dict[str, Any]]
     ) -> Tuple[List[Dict[str, Any]], float]:
@@ -199,25 +456,25 @@ class AgentService:
 
     async def communication_agent(
         self, 
-        db: Session, 
+        db: "Session", 
         job_id: int, 
         job_title: str, 
         top_matches: List[Dict[str, Any]], 
         overall_score: float
-    ) -> bool:
+    ) -> List[Dict[str, Any]]:
         """
-        Communication Agent: Send emails based on matching results
+        Communication Agent: compose the emails for the matching results. Nothing is sent here;
+        the emails are queued in the outbox together with the result and sent by the outbox sender.
         """
         await self.update_agent_status(db, job_id, "communication", "in-progress", 0)
-        email_sent = False
         if overall_score >= 70 and top_matches:
             recipients = ["ar_requestor@company.com"]
-            email_sent = await email_service.send_matching_results_email(recipients, job_title, top_matches[:3], overall_score)
+            subject, html_content = email_service.matching_results_email(job_title, top_matches[:3], overall_score)
         else:
             recipients = ["recruiter@company.com"]
-            email_sent = await email_service.send_no_matches_email(recipients, job_title)
+            subject, html_content = email_service.no_matches_email(job_title)
         await self.update_agent_status(db, job_id, "communication", "completed", 100)
-        return email_sent
+        return [{"recipients": recipients, "subject": subject, "html": html_content}]
 
     def _create_comparison_prompt(self, job_description: JobDescription, consultant: ConsultantProfile) -> str:
         """Create prompt for comparison agent"""
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from typing import Any, Dict, List, Tuple
+from backend.config import get_settings
+from backend.models.llm_analysis_cache import LLMAnalysisCache
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REQUIRED_FIELDS = ("similarity_score", "matching_skills", "missing_skills", "detailed_analysis")
+
+# Eviction scans the table, so only run it after this many new entries
+EVICT_EVERY = 500
+
+class AnalysisCache:
+    """
+    Persistent cache of parsed per-consultant LLM analyses, content-addressed by
+    the JD text, the consultant's profile text and the LLM model name.
+    """
+
+    def __init__(self, model_name: str = settings.llm, max_entries: int = settings.llm_cache_max_entries):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+
+    def key(self, job_text: str, consultant_text: str) -> str:
+        payload = "\x1f".join((self.model_name, job_text, consultant_text))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_valid(analysis: Any) -> bool:
+        return isinstance(analysis, dict) and all(field in analysis for field in REQUIRED_FIELDS)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            found = LLMAnalysisCache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"LLM analysis cache lookup failed: {e}")
+            found = {}
+        with self._lock:
+            self.hits += sum(1 for k in keys if k in found)
+            self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, entries: List[Tuple[str, Dict[str, Any]]]):
+        entries = [(k, a) for k, a in entries if self.is_valid(a)]
+        if not entries:
+            return
+        try:
+            LLMAnalysisCache.put_many(self.model_name, entries)
+            with self._lock:
+                self._writes_since_evict += len(entries)
+                evict = self._writes_since_evict >= EVICT_EVERY
+                if evict:
+                    self._writes_since_evict = 0
+            if evict:
+                removed = LLMAnalysisCache.evict(self.max_entries)
+                with self._lock:
+                    self.evictions += removed
+        except Exception as e:
+            logger.warning(f"LLM analysis cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "max_entries": self.max_entries,
+        }
+
+analysis_cache = AnalysisCache()
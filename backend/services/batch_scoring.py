@@ -0,0 +1,48 @@
+from typing import Iterable, Iterator, Tuple
+import numpy as np
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """float32 copy with unit-length rows (zero rows stay zero)"""
+    vectors = np.array(vectors, dtype='float32', copy=True, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+def chunked_top_k(queries: np.ndarray, chunks: Iterable[Tuple[np.ndarray, np.ndarray]], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k items by cosine similarity for every query, over a stream of
+    ``(item ids, vectors)`` chunks (e.g. read from the database or sliced from
+    a memmap).
+
+    Each chunk is scored and its best k are merged into a running top-k with
+    ``argpartition``, so only one (queries x chunk) score tile and one chunk of
+    vectors are alive at a time: peak memory depends on the chunk size, not on
+    the number of items. Returns (item ids, scores), each (num_queries, <= k),
+    best first.
+    """
+    queries = normalize_rows(queries)
+    best_ids = np.empty((len(queries), 0), dtype='int64')
+    best_scores = np.empty((len(queries), 0), dtype='float32')
+    if k <= 0:
+        return best_ids, best_scores
+    for ids, vectors in chunks:
+        ids = np.asarray(ids, dtype='int64')
+        if not len(ids):
+            continue
+        scores = queries @ normalize_rows(vectors).T
+        take = min(k, scores.shape[1])
+        part = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+        best_ids = np.hstack([best_ids, ids[part]])
+        best_scores = np.hstack([best_scores, np.take_along_axis(scores, part, axis=1)])
+        if best_scores.shape[1] > k:
+            keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+            best_ids = np.take_along_axis(best_ids, keep, axis=1)
+            best_scores = np.take_along_axis(best_scores, keep, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    return np.take_along_axis(best_ids, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+def row_blocks(matrix: np.ndarray, block_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """(row indices, rows) blocks of an in-memory or memory-mapped matrix"""
+    for start in range(0, len(matrix), block_rows):
+        block = matrix[start:start + block_rows]
+        yield np.arange(start, start + len(block)), block
@@ -0,0 +1,241 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+import numpy as np
+from backend.config import get_settings
+from backend.models.consultant_profile import ConsultantProfile
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+class ConsultantRecord:
+    """One consultant as the matching pipeline sees it; built once per change, not per match"""
+    __slots__ = ("id", "name", "email", "skills", "experience", "bio", "availability", "rating", "created_at", "updated_at")
+
+    def __init__(self, row: Dict[str, Any]):
+        self.id = row["id"]
+        self.name = row["name"]
+        self.email = row["email"]
+        skills = row.get("skills") or ""
+        # Split exactly like db_consultant_to_schema, so the embedded profile text (and its hash) is unchanged
+        self.skills = tuple(skills.split(",")) if isinstance(skills, str) else tuple(skills)
+        self.experience = row["experience"]
+        self.bio = row.get("profile_summary") or ""
+        self.availability = row.get("availability") or "available"
+        self.rating = row.get("rating")
+        self.created_at = row.get("created_at")
+        self.updated_at = row.get("updated_at")
+
+    @property
+    def consultant_id(self) -> int:
+        return self.id
+
+class ConsultantCatalog:
+    """
+    In-process consultant catalog. Filterable fields live in NumPy columns (id,
+    experience, rating, availability code), aligned row by row with a list of
+    ``ConsultantRecord`` objects carrying the text fields, so filtering and sorting
+    the whole bench are vectorized and matches reuse the same record objects.
+
+    ``refresh`` applies changes incrementally: rows updated and consultants deleted
+    (consultant_deletions) since the last refresh, re-read with an overlap since rows can
+    commit with an older timestamp and skipped when the catalog already holds that
+    version, plus any ids marked stale by local writes. Rows of removed consultants are
+    cleared and reused.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._stale: Set[int] = set()
+        self._watermark = None
+        self._refreshed_at = 0.0
+        self._availability_codes: Dict[str, int] = {}
+        self._reset(1024)
+
+    def _reset(self, rows: int):
+        self._ids = np.full(rows, -1, dtype='int64')
+        self._experience = np.zeros(rows, dtype='int32')
+        self._rating = np.full(rows, np.nan, dtype='float32')
+        self._availability = np.full(rows, -1, dtype='int16')
+        self._records: List[Optional[ConsultantRecord]] = [None] * rows
+        self._row_of: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._rows = 0
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _availability_code(self, availability: str) -> int:
+        code = self._availability_codes.get(availability)
+        if code is None:
+            code = self._availability_codes[availability] = len(self._availability_codes)
+        return code
+
+    def _allocate_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._rows == len(self._ids):
+            grow = len(self._ids)
+            self._ids = np.concatenate([self._ids, np.full(grow, -1, dtype='int64')])
+            self._experience = np.concatenate([self._experience, np.zeros(grow, dtype='int32')])
+            self._rating = np.concatenate([self._rating, np.full(grow, np.nan, dtype='float32')])
+            self._availability = np.concatenate([self._availability, np.full(grow, -1, dtype='int16')])
+            self._records.extend([None] * grow)
+        self._rows += 1
+        return self._rows - 1
+
+    def _set_row(self, row: int, record: ConsultantRecord):
+        self._ids[row] = record.id
+        self._experience[row] = record.experience or 0
+        self._rating[row] = np.nan if record.rating is None else record.rating
+        self._availability[row] = self._availability_code(record.availability)
+        self._records[row] = record
+
+    def upsert(self, profile: Dict[str, Any]):
+        with self._lock:
+            record = ConsultantRecord(profile)
+            row = self._row_of.get(record.id)
+            if row is None:
+                row = self._row_of[record.id] = self._allocate_row()
+            self._set_row(row, record)
+            self._track(profile)
+
+    def remove(self, consultant_id: int):
+        with self._lock:
+            self._stale.discard(consultant_id)
+            row = self._row_of.pop(consultant_id, None)
+            if row is None:
+                return
+            self._ids[row] = -1
+            self._availability[row] = -1
+            self._records[row] = None
+            self._free.append(row)
+
+    def mark_stale(self, consultant_id: int):
+        """Re-read this consultant on the next refresh (called by local writes)"""
+        with self._lock:
+            self._stale.add(consultant_id)
+
+    def _track(self, profile: Dict[str, Any]):
+        updated_at = profile.get("updated_at")
+        if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+            self._watermark = updated_at
+
+    def _holds(self, profile: Dict[str, Any]) -> bool:
+        """Whether the catalog already has this version of the row"""
+        row = self._row_of.get(profile["id"])
+        return row is not None and self._records[row].updated_at == profile.get("updated_at")
+
+    def rebuild(self, profiles: Iterable[Dict[str, Any]]):
+        with self._lock:
+            profiles = list(profiles)
+            self._reset(max(1024, len(profiles)))
+            self._watermark, self._stale = None, set()
+            for profile in profiles:
+                self.upsert(profile)
+            self._built = True
+            self._refreshed_at = time.monotonic()
+            logger.info(f"Built consultant catalog with {len(self)} consultants")
+
+    def ensure_built(self):
+        with self._lock:
+            if not self._built:
+                self.rebuild(ConsultantProfile.get_all())
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Apply changes made since the last refresh; returns how many consultants changed.
+        Without ``force`` (and with nothing marked stale) the database is checked at most
+        every CONSULTANT_CATALOG_REFRESH_SECONDS.
+        """
+        with self._lock:
+            if not self._built:
+                self.ensure_built()
+                return len(self)
+            if not force and not self._stale and time.monotonic() - self._refreshed_at < settings.consultant_catalog_refresh_seconds:
+                return 0
+            stale, self._stale = self._stale, set()
+            if self._watermark is None:
+                # Nothing was ever loaded, so there is no watermark to read from (and nothing to delete)
+                changed, deleted = [row for row in ConsultantProfile.get_all() if not self._holds(row)], []
+            else:
+                since = self._watermark - timedelta(seconds=settings.consultant_catalog_overlap_seconds)
+                changed = [row for row in ConsultantProfile.get_changed_since(since) if not self._holds(row)]
+                # Read after the changes, so a row deleted in between is still removed below
+                deleted = ConsultantProfile.get_deleted_since(since)
+            missing = stale - {row["id"] for row in changed}
+            if missing:
+                fetched = ConsultantProfile.get_many(missing)
+                changed = changed + fetched
+                # Locally written ids that no longer exist were deleted
+                deleted = deleted + [(i, None) for i in missing - {row["id"] for row in fetched}]
+            for profile in changed:
+                self.upsert(profile)
+            removed = {consultant_id for consultant_id, _ in deleted if consultant_id in self._row_of}
+            for consultant_id in removed:
+                self.remove(consultant_id)
+            for _, deleted_at in deleted:
+                if deleted_at is not None and deleted_at > self._watermark:
+                    self._watermark = deleted_at
+            self._refreshed_at = time.monotonic()
+            if changed or removed:
+                logger.info(f"Refreshed consultant catalog: {len(changed)} upserted, {len(removed)} removed")
+            return len(changed) + len(removed)
+
+    def _mask(self, min_experience=None, max_experience=None, availability=None, min_rating=None) -> np.ndarray:
+        rows = slice(0, self._rows)
+        mask = self._ids[rows] >= 0
+        if min_experience is not None:
+            mask &= self._experience[rows] >= min_experience
+        if max_experience is not None:
+            mask &= self._experience[rows] <= max_experience
+        if availability is not None:
+            code = self._availability_codes.get(availability)
+            if code is None:
+                return np.zeros_like(mask)
+            mask &= self._availability[rows] == code
+        if min_rating is not None:
+            # NaN (unrated) never passes a rating filter
+            mask &= self._rating[rows] >= min_rating
+        return mask
+
+    def filter_ids(self, **filters) -> np.ndarray:
+        """Ids of consultants passing the filters (unset filters are ignored; unrated never passes ``min_rating``), vectorized"""
+        with self._lock:
+            return self._ids[:self._rows][self._mask(**filters)]
+
+    def filter(self, sort_by: Optional[str] = None, descending: bool = True, **filters) -> List[ConsultantRecord]:
+        """Records passing the filters, optionally sorted by ``experience`` or ``rating``"""
+        with self._lock:
+            rows = np.flatnonzero(self._mask(**filters))
+            if sort_by is not None:
+                column = {"experience": self._experience, "rating": self._rating}[sort_by][rows]
+                if descending:
+                    column = -column
+                # Unrated consultants sort last either way
+                rows = rows[np.argsort(np.nan_to_num(column, nan=np.inf), kind='stable')]
+            records = self._records
+            return [records[row] for row in rows.tolist()]
+
+    def get(self, consultant_id: int) -> Optional[ConsultantRecord]:
+        with self._lock:
+            row = self._row_of.get(consultant_id)
+            return self._records[row] if row is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "consultants": len(self),
+                "stale": len(self._stale),
+                "availability_values": len(self._availability_codes),
+                "column_bytes": int(self._ids.nbytes + self._experience.nbytes + self._rating.nbytes + self._availability.nbytes),
+            }
+
+consultant_catalog = ConsultantCatalog()
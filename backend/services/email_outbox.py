@@ -0,0 +1,88 @@
+import asyncio
+import os
+import socket
+from typing import Any, Dict, List, Optional
+from backend.config import get_settings
+from backend.models.email_outbox import EmailOutbox
+from backend.services.email_service import email_service
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+class OutboxSender:
+    """
+    Drains the email outbox off the matching path: claims due emails in batches, sends each
+    batch over the email service's shared SMTP connection, and retries failures with a
+    growing backoff up to EMAIL_MAX_ATTEMPTS. Several senders may run; claims use SKIP
+    LOCKED and a batch left unsent by a dead sender is requeued after the lock timeout.
+
+    For local testing point SMTP_SERVER/SMTP_PORT at a sink (e.g. ``python -m aiosmtpd -n
+    -l localhost:1025``) with SMTP_USE_TLS=false and no EMAIL_USERNAME.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, poll_seconds: Optional[float] = None, name: Optional[str] = None):
+        self.batch_size = batch_size or settings.email_outbox_batch_size
+        self.poll_seconds = settings.email_outbox_poll_seconds if poll_seconds is None else poll_seconds
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = asyncio.Event()
+        self.sent = 0
+        self.failed = 0
+
+    def stop(self):
+        """Stop claiming emails; ``run`` returns once the current batch is sent"""
+        self._stopping.set()
+
+    async def run(self):
+        logger.info(f"Outbox sender {self.name} started with batch size {self.batch_size}")
+        loop = asyncio.get_running_loop()
+        last_requeue = 0.0
+        try:
+            while not self._stopping.is_set():
+                try:
+                    if loop.time() - last_requeue >= settings.email_outbox_lock_timeout_seconds / 3:
+                        last_requeue = loop.time()
+                        requeued = await asyncio.to_thread(EmailOutbox.requeue_stale, settings.email_outbox_lock_timeout_seconds)
+                        if requeued:
+                            logger.warning(f"Requeued emails with expired locks: {requeued}")
+                    emails = await asyncio.to_thread(EmailOutbox.claim, self.name, self.batch_size)
+                    if emails:
+                        await asyncio.to_thread(self.send_batch, emails)
+                except Exception as e:
+                    logger.error(f"Outbox sender {self.name} error: {e}")
+                    emails = []
+                if len(emails) < self.batch_size:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await asyncio.to_thread(email_service.close)
+            logger.info(f"Outbox sender {self.name} stopped: {self.stats()}")
+
+    def send_batch(self, emails: List[Dict[str, Any]]):
+        """
+        Deliver claimed emails one after another over the shared connection, recording each outcome.
+        An outcome that cannot be recorded only affects its own email: the row keeps its lock and is
+        requeued after the lock timeout (so a sent email may go out again).
+        """
+        for email in emails:
+            try:
+                email_service.deliver(email["recipients"], email["subject"], email["html"])
+            except Exception as e:
+                logger.error(f"Email {email['id']} failed on attempt {email['attempts']}: {e}")
+                self.failed += 1
+                self._record(EmailOutbox.fail, email["id"], str(e), settings.email_retry_seconds)
+                continue
+            self.sent += 1
+            self._record(EmailOutbox.mark_sent, email["id"])
+
+    @staticmethod
+    def _record(update, outbox_id: int, *args):
+        try:
+            update(outbox_id, *args)
+        except Exception as e:
+            logger.error(f"Could not record the outcome of email {outbox_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sent": self.sent, "failed": self.failed, "smtp": email_service.stats()}
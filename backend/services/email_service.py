@@ -1,66 +1,41 @@
 import smtplib
 import ssl
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from backend.config import get_settings
 from backend.logging import logging
 
 settings = get_settings()
 
 class EmailService:
+    """
+    Composes notification emails and delivers them over one SMTP connection that is kept
+    open and reused (STARTTLS and login happen once per connection, not per message).
+    Matching does not send directly: it queues composed emails in the outbox, which the
+    outbox sender drains through ``deliver``.
+    """
+
     def __init__(self):
         self.smtp_server = settings.smtp_server
         self.smtp_port = settings.smtp_port
         self.email_username = settings.email_username
         self.email_password = settings.email_password
+        self.email_from = settings.email_from or settings.email_username
+        self.use_tls = settings.smtp_use_tls
+        self._smtp = None
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.sent = 0
 
-    async def send_matching_results_email(
-        self, 
-        recipients: List[str], 
-        job_title: str, 
-        top_matches: List[Dict[str, Any]],
-        similarity_score: float
-    ) -> bool:
-        """Send email with matching results to AR requestor"""
-        try:
-            message = MIMEMultipart("alternative")
-            message["Subject"] = f"Matching Results for {job_title}"
-            message["From"] = self.email_username
-            message["To"] = ", ".join(recipients)
-
-            # Create HTML content
-            html_content = self._create_matching_results_html(job_title, top_matches, similarity_score)
-            
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
-
-            # Send email
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.email_username, self.email_password)
-                server.sendmail(self.email_username, recipients, message.as_string())
-            
-            logging.info(f"Email sent successfully to {', '.join(recipients)}")
-            return True
-        except Exception as e:
-            logging.error(f"Failed to send email: {str(e)}")
-            return False
-
-    async def send_no_matches_email(
-        self, 
-        recipients: List[str], 
-        job_title: str
-    ) -> bool:
-        """Send email when no suitable matches are found"""
-        try:
-            message = MIMEMultipart("alternative")
-            message["Subject"] = f"No Matches Found for {job_title}"
-            message["From"] = self.email_username
-            message["To"] = ", ".join(recipients)
+    def matching_results_email(self, job_title: str, top_matches: List[Dict[str, Any]], similarity_score: float) -> Tuple[str, str]:
+        """(subject, HTML body) of the matching results email for the AR requestor"""
+        return f"Matching Results for {job_title}", self._create_matching_results_html(job_title, top_matches, similarity_score)
 
-            html_content = f"""
+    def no_matches_email(self, job_title: str) -> Tuple[str, str]:
+        """(subject, HTML body) of the email sent when no suitable matches are found"""
+        html_content = f"""
             <html>
                 <body>
                     <h2>No Suitable Matches Found</h2>
@@ -72,21 +47,64 @@ class EmailService:
                 </body>
             </html>
             """
-            
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
+        return f"No Matches Found for {job_title}", html_content
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=settings.smtp_timeout_seconds)
+            try:
+                if self.use_tls:
+                    server.starttls(context=ssl.create_default_context())
+                if self.email_username:
+                    server.login(self.email_username, self.email_password)
+            except Exception:
+                server.close()
+                raise
+            self._smtp = server
+            self.connections += 1
+        return self._smtp
+
+    def close(self):
+        """Close the shared SMTP connection (the next delivery opens a new one)"""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+
+    def deliver(self, recipients: List[str], subject: str, html_content: str):
+        """
+        Send one message over the shared connection (blocking; call from a worker thread).
+        A connection the server has dropped is reopened once; other errors propagate.
+        """
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = self.email_from
+        message["To"] = ", ".join(recipients)
+        message.attach(MIMEText(html_content, "html"))
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    self._connection().sendmail(self.email_from, recipients, message.as_string())
+                    break
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+                except Exception:
+                    # The session may be mid-transaction; start the next message on a fresh one
+                    self._close()
+                    raise
+            self.sent += 1
+        logging.info(f"Email sent successfully to {', '.join(recipients)}")
 
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.email_username, self.email_password)
-                server.sendmail(self.email_username, recipients, message.as_string())
-            
-            logging.info(f"Email sent successfully to {', '.join(recipients)}")
-            return True
-        except Exception as e:
-            logging.error(f"Failed to send email: {str(e)}")
-            return False
+    def stats(self) -> Dict[str, Any]:
+        return {"connected": self._smtp is not None, "connections_opened": self.connections, "sent": self.sent}
 
     def _create_matching_results_html(
         self, 
@@ -100,7 +118,7 @@ class EmailService:
             matches_html += f"""
             <div style="border: 1px solid #ddd; padding: 15px; margin: 10px 0; border-radius: 5px;">
                 <h4>#{i} - {match['consultant_name']}</h4>
-                <p><strong>Match Score:</strong> {match['score']}%</p>
+                <p><strong>Match Score:</strong> {match.get('similarity_score', match.get('score'))}%</p>
                 <p><strong>Experience:</strong> {match['experience']} years</p>
                 <p><strong>Matching Skills:</strong> {', '.join(match['matching_skills'])}</p>
                 {f"<p><strong>Skills Gap:</strong> {', '.join(match['missing_skills'])}</p>" if match.get('missing_skills') else ""}
@@ -0,0 +1,173 @@
+import hashlib
+import threading
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from backend.config import get_settings
+from backend.models.consultant_embedding import ConsultantEmbedding
+from backend.models.job_embedding import JobEmbedding
+from backend.services.embedding_worker import EmbeddingWorker
+from backend.services.quantization import check_dtype, quantize, dequantize
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+def _field(obj: Any, *names: str, default=None):
+    """Read the first present field from an ORM-style object or a RealDictCursor row"""
+    for name in names:
+        if isinstance(obj, dict):
+            if obj.get(name) is not None:
+                return obj[name]
+        elif getattr(obj, name, None) is not None:
+            return getattr(obj, name)
+    return default
+
+def consultant_id_of(consultant: Any) -> Optional[int]:
+    return _field(consultant, 'consultant_id', 'id')
+
+def consultant_text(name: str, skills: Any, experience: Any, bio: Optional[str]) -> str:
+    """Text that is embedded for a consultant profile"""
+    if isinstance(skills, (list, tuple)):
+        skills = ','.join(skills)
+    return f"{name} {skills or ''} {experience} {bio or ''}"
+
+def consultant_text_of(consultant: Any) -> str:
+    return consultant_text(
+        _field(consultant, 'name', default=''),
+        _field(consultant, 'skills', default=''),
+        _field(consultant, 'experience', default=''),
+        _field(consultant, 'bio', 'profile_summary', default='')
+    )
+
+def job_text(title: str, skills: Any, experience_required: Any, description: Optional[str]) -> str:
+    """Text that is embedded for a job description (also the JD text matching sends to the LLM)"""
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    return f"{title} {skills} {experience_required} {description}"
+
+def job_text_of(job: Any) -> str:
+    return job_text(
+        _field(job, 'title', default=''),
+        _field(job, 'skills', default=[]),
+        _field(job, 'experience_required', default=0),
+        _field(job, 'description', default='')
+    )
+
+class EmbeddingStore:
+    """
+    Persistent consultant embeddings keyed by consultant id and a content hash
+    of the embedded text, so only new or changed profiles are ever encoded.
+
+    Vectors are written in ``dtype`` (float32, float16 or scale-quantized int8)
+    and always handed back to callers as float32.
+    """
+
+    def __init__(self, model_name: str = settings.embedding_model, dtype: str = settings.embedding_dtype):
+        self.model_name = model_name
+        self.dtype = check_dtype(dtype)
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.worker = EmbeddingWorker(
+            self._encode_batch,
+            max_batch_size=settings.embedding_max_batch_size,
+            max_wait_ms=settings.embedding_max_wait_ms
+        )
+
+    @property
+    def model(self):
+        """Loaded on first use (or by the startup warmup), never at import time"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    # sentence_transformers pulls in torch; keep it out of import time
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"Loading embedding model {self.model_name}")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def content_hash(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def _row(self, consultant_id: int, content_hash: str, embedding: np.ndarray) -> tuple:
+        data, scale = quantize(embedding, self.dtype)
+        return (consultant_id, content_hash, self.model_name, embedding.shape[0], data, self.dtype, scale)
+
+    @staticmethod
+    def decode(row: Any) -> np.ndarray:
+        """float32 vector of a stored consultant_embeddings / job_embeddings row"""
+        return dequantize(row['embedding'], row.get('dtype'), row.get('scale'))
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        # Runs on the worker thread only
+        vectors = self.model.encode(texts, batch_size=self.worker.max_batch_size)
+        return np.asarray(vectors, dtype='float32').reshape(len(texts), -1)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode via the micro-batching worker; blocks the calling thread only"""
+        return self.worker.encode(texts)
+
+    async def aencode(self, texts: List[str]) -> np.ndarray:
+        return await self.worker.aencode(texts)
+
+    def upsert_profile(self, consultant_id: int, name: str, skills: Any, experience: Any, bio: Optional[str]) -> np.ndarray:
+        """Encode and store a single profile unless its stored embedding is already current"""
+        text = consultant_text(name, skills, experience, bio)
+        content_hash = self.content_hash(text)
+        rows = ConsultantEmbedding.get_many([consultant_id])
+        if rows and rows[0]['content_hash'] == content_hash:
+            return self.decode(rows[0])
+        embedding = self.encode([text])[0]
+        ConsultantEmbedding.upsert_many([self._row(consultant_id, content_hash, embedding)])
+        return embedding
+
+    def get_embeddings(self, consultants: List[Any]) -> np.ndarray:
+        """
+        Return a float32 matrix with one row per consultant, in order.
+        Stored vectors are read in bulk; only missing or stale profiles are encoded and written back.
+        """
+        if not consultants:
+            return np.empty((0, 0), dtype='float32')
+        ids = [consultant_id_of(c) for c in consultants]
+        texts = [consultant_text_of(c) for c in consultants]
+        vectors, encoded = self._stored_or_encoded(ConsultantEmbedding, 'consultant_id', ids, texts)
+        logger.info(f"Embeddings served for {len(consultants)} consultants, {encoded} encoded")
+        return vectors
+
+    def get_job_embeddings(self, jobs: List[Any]) -> np.ndarray:
+        """Same as ``get_embeddings`` for job descriptions (table job_embeddings)"""
+        if not jobs:
+            return np.empty((0, 0), dtype='float32')
+        ids = [_field(job, 'job_id', 'id') for job in jobs]
+        texts = [job_text_of(job) for job in jobs]
+        vectors, encoded = self._stored_or_encoded(JobEmbedding, 'job_id', ids, texts)
+        logger.info(f"Embeddings served for {len(jobs)} jobs, {encoded} encoded")
+        return vectors
+
+    def _stored_or_encoded(self, table, key: str, ids: List[Optional[int]], texts: List[str]) -> Tuple[np.ndarray, int]:
+        hashes = [self.content_hash(t) for t in texts]
+        stored = {row[key]: row for row in table.get_many([i for i in ids if i is not None])}
+
+        vectors: List[Optional[np.ndarray]] = [None] * len(ids)
+        stale = []
+        for i, (item_id, content_hash) in enumerate(zip(ids, hashes)):
+            row = stored.get(item_id)
+            if row is not None and row['content_hash'] == content_hash:
+                vectors[i] = self.decode(row)
+            else:
+                stale.append(i)
+
+        if stale:
+            encoded = self.encode([texts[i] for i in stale])
+            rows = []
+            for i, embedding in zip(stale, encoded):
+                vectors[i] = embedding
+                if ids[i] is not None:
+                    rows.append(self._row(ids[i], hashes[i], embedding))
+            table.upsert_many(rows)
+        return np.vstack(vectors).astype('float32', copy=False), len(stale)
+
+embedding_store = EmbeddingStore()
@@ -0,0 +1,112 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+import numpy as np
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+
+class _EncodeRequest:
+    __slots__ = ("texts", "future")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+class EmbeddingWorker:
+    """
+    Dedicated thread that owns the encoder and runs it off the event loop.
+
+    Concurrent encode calls are queued and coalesced into one batch of up to
+    ``max_batch_size`` texts, waiting at most ``max_wait_ms`` for more requests
+    to arrive after the first one.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = 64, max_wait_ms: float = 5):
+        self._encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[_EncodeRequest]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="embedding-worker", daemon=True)
+                    self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        request = _EncodeRequest(list(texts))
+        if not request.texts:
+            request.future.set_result(np.empty((0, 0), dtype='float32'))
+            return request.future
+        self._ensure_started()
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Blocking encode for synchronous callers (model hooks, CLI tools)"""
+        return self.submit(texts).result()
+
+    async def aencode(self, texts: List[str]) -> np.ndarray:
+        """Encode without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _collect(self) -> List[_EncodeRequest]:
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            try:
+                self._encode_batch(self._collect())
+            except Exception as e:
+                # Never let one bad batch end the thread every later encode waits on
+                logger.error(f"Embedding worker batch failed: {e}")
+
+    def _encode_batch(self, batch: List[_EncodeRequest]):
+        # Callers that gave up (cancelled awaits) are dropped; the rest can no longer be cancelled
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for request in batch for text in request.texts]
+        try:
+            vectors = self._encode_fn(texts)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        self.batches += 1
+        self.texts += len(texts)
+        offset = 0
+        for request in batch:
+            request.future.set_result(vectors[offset:offset + len(request.texts)])
+            offset += len(request.texts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+        }
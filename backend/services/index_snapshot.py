@@ -0,0 +1,132 @@
+import fcntl
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+
+# The current generation plus the one before it; older ones are deleted on publish.
+# Workers that still map a deleted generation keep working: unlinked files stay valid while mapped.
+KEEP_GENERATIONS = 2
+
+def _fsync(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class IndexSnapshots:
+    """
+    On-disk generations of a vector index, shared by every worker process.
+
+    A generation is a directory holding the FAISS index, the item id of every
+    FAISS label (``ids.npy``), the same ids sorted for lookups, the normalized
+    vector matrix (``vectors.npy``), optionally the content hash each vector was
+    encoded from (``hashes.npy``) and ``meta.json``. It is written under a
+    temporary name, renamed into place and only then published by atomically
+    replacing the ``<name>.current`` pointer file, so readers never observe a
+    half-written snapshot. Readers open everything memory-mapped and read-only,
+    which lets all workers share one copy through the page cache.
+    """
+
+    def __init__(self, root: str, name: str):
+        self.root = root
+        self.name = name
+        self.pointer = os.path.join(root, f"{name}.current")
+
+    def current(self) -> Optional[str]:
+        try:
+            with open(self.pointer) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def lock(self):
+        """Serialize publishers across processes"""
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, f"{self.name}.lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def publish(self, index, item_ids: Sequence[int], vectors: np.ndarray, meta: Dict[str, Any], hashes: Optional[Sequence[str]] = None) -> str:
+        """Write a new generation (FAISS label i = item_ids[i]) and make it current; returns its name"""
+        import faiss
+        os.makedirs(self.root, exist_ok=True)
+        generation = f"{self.name}-{int(time.time() * 1000)}-{os.getpid()}"
+        staging = os.path.join(self.root, f".{generation}.tmp")
+        os.makedirs(staging)
+        try:
+            ids = np.asarray(item_ids, dtype='int64')
+            order = np.argsort(ids, kind='stable')
+            files = {
+                "ids.npy": ids,
+                "sorted_ids.npy": ids[order],
+                "sorted_labels.npy": order.astype('int64'),
+                "vectors.npy": vectors,
+            }
+            if hashes is not None:
+                files["hashes.npy"] = np.asarray(hashes, dtype='S64')
+            for filename, array in files.items():
+                np.save(os.path.join(staging, filename), array)
+            faiss.write_index(index, os.path.join(staging, "index.faiss"))
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump({**meta, "size": len(ids), "created_at": time.time()}, f)
+            for filename in os.listdir(staging):
+                _fsync(os.path.join(staging, filename))
+            os.rename(staging, os.path.join(self.root, generation))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        staged_pointer = f"{self.pointer}.{os.getpid()}.tmp"
+        with open(staged_pointer, "w") as f:
+            f.write(generation)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(staged_pointer, self.pointer)
+        logger.info(f"Published {self.name} index snapshot {generation} ({len(ids)} vectors)")
+        self._prune(generation)
+        return generation
+
+    def _prune(self, current: str):
+        generations = sorted(
+            (d for d in os.listdir(self.root) if d.startswith(f"{self.name}-") and d != current),
+            key=lambda d: os.path.getmtime(os.path.join(self.root, d)),
+            reverse=True
+        )
+        for stale in generations[KEEP_GENERATIONS - 1:]:
+            shutil.rmtree(os.path.join(self.root, stale), ignore_errors=True)
+
+    def load(self, generation: str) -> Dict[str, Any]:
+        """Open a generation memory-mapped and read-only"""
+        import faiss
+        path = os.path.join(self.root, generation)
+        try:
+            index = faiss.read_index(os.path.join(path, "index.faiss"), faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError as e:
+            logger.warning(f"Cannot memory-map {generation} ({e}), reading it into memory")
+            index = faiss.read_index(os.path.join(path, "index.faiss"))
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return {
+            "generation": generation,
+            "index": index,
+            "ids": np.load(os.path.join(path, "ids.npy"), mmap_mode='r'),
+            "sorted_ids": np.load(os.path.join(path, "sorted_ids.npy"), mmap_mode='r'),
+            "sorted_labels": np.load(os.path.join(path, "sorted_labels.npy"), mmap_mode='r'),
+            "vectors": np.load(os.path.join(path, "vectors.npy"), mmap_mode='r'),
+            # Absent from generations published before hashes were recorded
+            "hashes": np.load(os.path.join(path, "hashes.npy"), mmap_mode='r') if os.path.exists(os.path.join(path, "hashes.npy")) else None,
+            "meta": meta,
+            "bytes": sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)),
+        }
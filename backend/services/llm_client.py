@@ -0,0 +1,177 @@
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from backend.config import get_settings
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# HTTP-style status codes (google.api_core exceptions expose ``code``) worth retrying
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+class LLMClient:
+    """
+    Non-blocking Gemini client shared by all agents.
+
+    At most ``max_concurrency`` calls are in flight at once; extra callers wait
+    in line (``waiting`` is the queue depth). Each attempt is bounded by
+    ``timeout`` seconds and retryable failures back off exponentially with jitter.
+    """
+
+    def __init__(
+        self,
+        model_name: str = settings.llm,
+        max_concurrency: int = settings.llm_max_concurrency,
+        timeout: float = settings.llm_timeout_seconds,
+        max_retries: int = settings.llm_max_retries,
+        backoff_base: float = settings.llm_backoff_base_seconds,
+        backoff_max: float = settings.llm_backoff_max_seconds
+    ):
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._model = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.successes = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.total_latency = 0.0
+
+    @property
+    def model(self):
+        if self._model is None:
+            # Imported on first use: google.generativeai is slow to import
+            import google.generativeai as genai
+            genai.configure(api_key=settings.google_api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, asyncio.TimeoutError):
+            return True
+        return getattr(error, "code", None) in RETRYABLE_CODES
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": spread retries over [0, cap] so concurrent callers do not retry in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _acquire(self):
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    async def _attempt(self, prompt: str) -> str:
+        await self._acquire()
+        try:
+            response = await asyncio.wait_for(self.model.generate_content_async(prompt), self.timeout)
+            return response.text
+        finally:
+            self._release()
+
+    async def _retry_or_raise(self, error: Exception, attempt: int):
+        """Sleep before the next attempt, or re-raise once retries are exhausted"""
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+        if attempt >= self.max_retries or not self._is_retryable(error):
+            self.failures += 1
+            logger.error(f"LLM call failed after {attempt + 1} attempt(s): {error!r}")
+            raise error
+        delay = self._backoff(attempt)
+        self.retries += 1
+        logger.warning(f"LLM call failed ({error!r}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    async def generate(self, prompt: str) -> str:
+        """Return the response text for ``prompt``, retrying transient failures"""
+        self.requests += 1
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                text = await self._attempt(prompt)
+                self.successes += 1
+                self.total_latency += time.perf_counter() - started
+                return text
+            except Exception as e:
+                await self._retry_or_raise(e, attempt)
+                attempt += 1
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield response text chunks as they arrive. Opening the stream (up to the
+        first chunk) is retried like ``generate``; after that, errors propagate.
+        ``timeout`` bounds the wait for each chunk.
+        """
+        self.requests += 1
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            await self._acquire()
+            try:
+                response = await asyncio.wait_for(self.model.generate_content_async(prompt, stream=True), self.timeout)
+                chunks = response.__aiter__()
+                first = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                break
+            except StopAsyncIteration:
+                self._release()
+                self.successes += 1
+                return
+            except Exception as e:
+                self._release()
+                await self._retry_or_raise(e, attempt)
+                attempt += 1
+        try:
+            yield first.text
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk.text
+            self.successes += 1
+            self.total_latency += time.perf_counter() - started
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"LLM stream failed mid-response: {e!r}")
+            raise
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "successes": self.successes,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "avg_latency_seconds": round(self.total_latency / self.successes, 3) if self.successes else 0.0,
+        }
+
+llm_client = LLMClient()
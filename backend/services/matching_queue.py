@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import json
+import os
+import socket
+from typing import Any, Awaitable, Callable, Dict, Optional
+from backend.config import get_settings
+from backend.models.matching_job import MatchingJob
+from backend.schemas.matching_result import ConsultantFilters
+from backend.services.matching_service import matching_service
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+def _filters(payload: Dict[str, Any]) -> Optional[ConsultantFilters]:
+    return ConsultantFilters(**payload["filters"]) if payload.get("filters") else None
+
+def _dedupe_key(kind: str, job_ids, filters: Optional[ConsultantFilters] = None) -> Optional[str]:
+    """Run key of the jobs as they are now; None (no dedupe) when a job no longer exists"""
+    jobs = matching_service.load_jobs(list(job_ids))
+    if len(jobs) != len(set(job_ids)):
+        return None
+    return matching_service.run_key(kind, jobs, filters)
+
+def _request_hash(kind: str, job_description_id: Optional[int], payload: Dict[str, Any]) -> str:
+    """What an Idempotency-Key is bound to: the kind, job and payload of the request (not its priority)"""
+    request = json.dumps({"kind": kind, "job_description_id": job_description_id, "payload": payload}, sort_keys=True)
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+def enqueue_match(job_id: int, filters: Optional[ConsultantFilters] = None, priority: int = 0, idempotency_key: Optional[str] = None) -> int:
+    """
+    Queue the full matching pipeline for one job; returns the queue id. While a run of the
+    same job (unchanged JD, same filters) is still queued or running, its id is returned instead.
+    """
+    payload = {"filters": filters.dict()} if filters is not None else {}
+    return MatchingJob.enqueue(
+        "match", job_id, payload, priority, settings.matching_job_max_attempts,
+        idempotency_key, _dedupe_key("match", [job_id], filters), _request_hash("match", job_id, payload)
+    )
+
+def enqueue_batch(job_ids, filters: Optional[ConsultantFilters] = None, priority: int = 0, idempotency_key: Optional[str] = None) -> int:
+    payload = {"job_ids": list(job_ids)}
+    if filters is not None:
+        payload["filters"] = filters.dict()
+    return MatchingJob.enqueue(
+        "batch", None, payload, priority, settings.matching_job_max_attempts,
+        idempotency_key, _dedupe_key("batch", job_ids, filters), _request_hash("batch", None, payload)
+    )
+
+def enqueue_comparison(job_id: int, priority: int = 0, idempotency_key: Optional[str] = None) -> int:
+    return MatchingJob.enqueue(
+        "comparison", job_id, {}, priority, settings.matching_job_max_attempts,
+        idempotency_key, _dedupe_key("comparison", [job_id]), _request_hash("comparison", job_id, {})
+    )
+
+async def _run_match(job: Dict[str, Any]) -> Dict[str, Any]:
+    return await matching_service.start_matching_process(None, job["job_description_id"], _filters(job["payload"]))
+
+async def _run_batch(job: Dict[str, Any]) -> Dict[str, Any]:
+    summary = await matching_service.start_batch_matching(None, job["payload"]["job_ids"], _filters(job["payload"]))
+    return {str(job_id): outcome for job_id, outcome in summary.items()}
+
+async def _run_comparison(job: Dict[str, Any]) -> Dict[str, Any]:
+    job_id = job["job_description_id"]
+    await asyncio.to_thread(matching_service.start_comparison, job_id)
+    status = matching_service.get_status(job_id)
+    return status.dict() if status is not None else {}
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+    "match": _run_match,
+    "batch": _run_batch,
+    "comparison": _run_comparison,
+}
+
+class MatchingWorker:
+    """
+    Drains the matching_jobs queue with at most ``concurrency`` jobs in flight. Any
+    number of these can run, in one or many processes: claims use SKIP LOCKED, running
+    jobs renew their lock with a heartbeat, and jobs whose worker died are requeued
+    once their lock is older than MATCHING_JOB_LOCK_TIMEOUT_SECONDS. Completing or
+    failing a job is fenced on the claiming worker, so a worker whose job was requeued
+    away cannot overwrite the new run's outcome.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, poll_seconds: Optional[float] = None, name: Optional[str] = None):
+        self.concurrency = concurrency or settings.matching_worker_concurrency
+        self.poll_seconds = settings.matching_worker_poll_seconds if poll_seconds is None else poll_seconds
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._running: Dict[int, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+        self.completed = 0
+        self.failed = 0
+
+    def stop(self):
+        """Stop claiming new jobs; ``run`` returns once the jobs in flight finish"""
+        self._stopping.set()
+
+    async def run(self):
+        logger.info(f"Matching worker {self.name} started with concurrency {self.concurrency}")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while not self._stopping.is_set():
+                free = self.concurrency - len(self._running)
+                jobs = await asyncio.to_thread(MatchingJob.claim, self.name, free) if free > 0 else []
+                for job in jobs:
+                    self._running[job["id"]] = asyncio.create_task(self._execute(job))
+                if not jobs or len(self._running) >= self.concurrency:
+                    await self._wait()
+        finally:
+            if self._running:
+                await asyncio.gather(*self._running.values(), return_exceptions=True)
+            heartbeat.cancel()
+            logger.info(f"Matching worker {self.name} stopped ({self.completed} completed, {self.failed} failed)")
+
+    async def _wait(self):
+        """Sleep until a slot frees up, the poll interval passes or the worker is stopped"""
+        waiters = [asyncio.create_task(self._stopping.wait())]
+        if len(self._running) >= self.concurrency:
+            waiters.extend(self._running.values())
+        await asyncio.wait(waiters, timeout=self.poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+        waiters[0].cancel()
+
+    async def _execute(self, job: Dict[str, Any]):
+        queue_id = job["id"]
+        try:
+            handler = HANDLERS.get(job["kind"])
+            if handler is None:
+                raise ValueError(f"Unknown matching job kind '{job['kind']}'")
+            logger.info(f"Worker {self.name} running matching job {queue_id} ({job['kind']}, attempt {job['attempts']})")
+            result = await handler(job)
+            if await asyncio.to_thread(MatchingJob.complete, queue_id, self.name, result):
+                self.completed += 1
+            else:
+                logger.warning(f"Worker {self.name} lost the lease on matching job {queue_id}; its result was discarded")
+        except Exception as e:
+            logger.error(f"Matching job {queue_id} failed on attempt {job['attempts']}: {e}")
+            self.failed += 1
+            try:
+                if not await asyncio.to_thread(MatchingJob.fail, queue_id, self.name, str(e), settings.matching_job_retry_seconds):
+                    logger.warning(f"Worker {self.name} lost the lease on matching job {queue_id}; its failure was not recorded")
+            except Exception as db_error:
+                logger.error(f"Could not record failure of matching job {queue_id}: {db_error}")
+        finally:
+            self._running.pop(queue_id, None)
+
+    async def _heartbeat(self):
+        interval = settings.matching_job_lock_timeout_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(MatchingJob.heartbeat, self.name, list(self._running))
+                requeued = await asyncio.to_thread(MatchingJob.requeue_stale, settings.matching_job_lock_timeout_seconds)
+                if requeued:
+                    logger.warning(f"Requeued matching jobs with expired locks: {requeued}")
+            except Exception as e:
+                logger.warning(f"Matching worker heartbeat failed: {e}")
@@ -1,115 +1,267 @@
 import asyncio
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+import hashlib
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 from ..models.job_description import JobDescription
 from ..models.consultant_profile import ConsultantProfile
 from ..models.matching_result import MatchingResult
+from ..models.matching_progress import MatchingProgress, STAGES
+from ..models.matching_checkpoint import MatchingCheckpoint
 from ..services.agent_service import agent_service
+from ..services.embedding_store import job_text_of
+from ..services.single_flight import SingleFlight
 from ..services.email_service import email_service
-from ..schemas.matching_result import AgentStatusResponse
+from ..services.skill_matrix import skill_matrix, SkillScores
+from ..services.consultant_catalog import consultant_catalog, ConsultantRecord
+from ..config import get_settings
+from ..schemas.matching_result import AgentStatusResponse, ConsultantFilters
 from datetime import datetime
 from backend.logging import logging
 import json
+if TYPE_CHECKING:
+    # Only used in annotations; importing sqlalchemy.orm costs ~250ms at startup
+    from sqlalchemy.orm import Session
 
 # Set up logging
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 class MatchingService:
     def __init__(self):
         self._status_cache = {}
+        self.flights = SingleFlight()
 
-    async def start_matching_process(self, db: Session, job_id: int) -> Dict[str, Any]:
+    @staticmethod
+    def run_key(kind: str, jobs, filters: Optional[ConsultantFilters] = None) -> str:
         """
-        Start the complete matching process using multi-agent system
+        Identity of a matching run: its kind, each job's id and JD content, and the consultant
+        filters. Runs with the same key would do the same work, so concurrent requests share one
+        (in process through ``flights``, across processes through the queue's dedupe key).
         """
+        digest = hashlib.sha256(kind.encode("utf-8"))
+        for job in sorted(jobs, key=lambda job: job.id):
+            digest.update(f"\n{job.id}\n{job_text_of(job)}".encode("utf-8"))
+        digest.update(json.dumps((filters or ConsultantFilters()).dict(), sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    async def start_matching_process(self, db: "Session", job_id: int, filters: Optional[ConsultantFilters] = None) -> Dict[str, Any]:
+        """
+        Run the complete matching pipeline (shortlist, LLM comparison, ranking, email) for one
+        job against the eligible bench. Called by the matching worker, not by request handlers.
+        A call made while the same run is in flight waits for it and returns its summary; a
+        retry of a failed run resumes after its last checkpointed stage.
+        """
+        logger.info(f"Starting matching process for job_id={job_id}")
+        jobs = await asyncio.to_thread(self.load_jobs, [job_id])
+        if not jobs:
+            logger.error(f"Job description not found for job_id={job_id}")
+            raise ValueError("Job description not found")
+        job = jobs[0]
+        run_key = self.run_key("match", [job], filters)
+        return await self.flights.run(run_key, lambda: self._match(db, job, filters, run_key))
+
+    async def _match(self, db: "Session", job, filters: Optional[ConsultantFilters], run_key: str) -> Dict[str, Any]:
+        job_id = job.id
         try:
-            logger.info(f"Starting matching process for job_id={job_id}")
-            job_description = db.query(JobDescription).filter(JobDescription.id == job_id).first()
-            if not job_description:
-                logger.error(f"Job description not found for job_id={job_id}")
-                raise ValueError("Job description not found")
-            job_description.status = "matching"
-            db.commit()
-            consultant_profiles = db.query(ConsultantProfile).filter(
-                ConsultantProfile.availability == "available"
-            ).all()
-            if not consultant_profiles:
-                logger.error(f"No available consultant profiles found for job_id={job_id}")
-                raise ValueError("No available consultant profiles found")
-            logger.info(f"Calling comparison agent for job_id={job_id}")
-            similarity_results = await agent_service.comparison_agent(
-                db, job_description, consultant_profiles
-            )
-            logger.info(f"Comparison agent completed for job_id={job_id}")
-            logger.info(f"Calling ranking agent for job_id={job_id}")
-            ranked_consultants, overall_score = await agent_service.ranking_agent(
-                db, job_id, similarity_results
-            )
-            logger.info(f"Ranking agent completed for job_id={job_id}, overall_score={overall_score}")
-            top_matches = ranked_consultants[:3]
-            logger.info(f"Calling communication agent for job_id={job_id}")
-            email_sent = await agent_service.communication_agent(
-                db, job_id, job_description.title, top_matches, overall_score, email_service
-            )
-            logging.info(f"Communication agent completed for job_id={job_id}, email_sent={email_sent}")
-            matching_result = MatchingResult(
-                job_id=job_id,
-                job_title=job_description.title,
-                department=job_description.department,
-                similarity_score=overall_score,
-                top_matches=top_matches,
-                email_sent=email_sent,
-                email_recipients=["ar_requestor@company.com"] if email_sent else []
-            )
-            db.add(matching_result)
-            job_description.status = "completed"
-            db.commit()
-            logging.info(f"Matching process completed for job_id={job_id}")
-            return {
-                "success": True,
-                "job_id": job_id,
-                "overall_score": overall_score,
-                "top_matches_count": len(top_matches),
-                "email_sent": email_sent
-            }
+            done = (await self._completed_stages([run_key])).get(run_key, {})
+            if "shortlist" in done:
+                logger.info(f"Resuming matching for job_id={job_id} after stages {sorted(done)}")
+                jd_text, top_profiles, top_scores = await asyncio.to_thread(self._restore_shortlist, job, done["shortlist"])
+            else:
+                consultants = await asyncio.to_thread(self.eligible_consultants, filters)
+                if not consultants:
+                    logger.error(f"No eligible consultant profiles found for job_id={job_id}")
+                    raise ValueError("No eligible consultant profiles found")
+                jd_text, top_profiles, top_scores = await agent_service.shortlist(db, job, consultants)
+                await self._checkpoint(run_key, job_id, "shortlist", self._shortlist_entries(top_profiles, top_scores))
+            summary = await self._rank_and_notify(db, job, run_key, done, jd_text, top_profiles, top_scores, filters)
+            logging.info(f"Matching process completed for job_id={job_id}, overall_score={summary['overall_score']}")
+            return summary
         except Exception as e:
             logging.error(f"Error in matching process for job_id={job_id}: {e}")
-            job_description = db.query(JobDescription).filter(JobDescription.id == job_id).first()
-            if job_description:
-                job_description.status = "error"
-                db.commit()
-            raise e
+            raise
+
+    async def compare(self, job_id: int) -> List[Dict[str, Any]]:
+        """LLM comparison of a job against the available bench, shared with any identical comparison in flight"""
+        jobs = await asyncio.to_thread(self.load_jobs, [job_id])
+        if not jobs:
+            raise ValueError("Job description not found")
+        job = jobs[0]
+
+        async def run():
+            consultants = await asyncio.to_thread(self.eligible_consultants)
+            if not consultants:
+                raise ValueError("No eligible consultant profiles found")
+            return await agent_service.comparison_agent(None, job, consultants)
+
+        return await self.flights.run(self.run_key("compare", [job]), run)
+
+    async def start_batch_matching(self, db: "Session", job_ids: List[int], filters: Optional[ConsultantFilters] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Match many jobs against the bench at once: jobs and eligible consultants are loaded once,
+        every shortlist comes out of one blocked jobs x consultants matrix product, and the per-job
+        LLM, ranking and communication stages then run concurrently (bounded). Each job checkpoints
+        its stages as a single match would, so a retried batch only redoes what failed.
+        """
+        logger.info(f"Starting batch matching for {len(job_ids)} jobs")
+        jobs = await asyncio.to_thread(self.load_jobs, job_ids)
+        missing = set(job_ids) - {job.id for job in jobs}
+        if missing:
+            logger.error(f"Job descriptions not found for batch: {sorted(missing)}")
+        run_keys = {job.id: self.run_key("match", [job], filters) for job in jobs}
+        completed = await self._completed_stages(list(run_keys.values()))
+        done = {job.id: completed.get(run_keys[job.id], {}) for job in jobs}
+        resumed = [(job, done[job.id]["shortlist"]) for job in jobs if "shortlist" in done[job.id]]
+        shortlists = await asyncio.to_thread(self._restore_shortlists, resumed) if resumed else {}
+        fresh = [job for job in jobs if job.id not in shortlists]
+        if fresh:
+            consultants = await asyncio.to_thread(self.eligible_consultants, filters)
+            if not consultants:
+                raise ValueError("No eligible consultant profiles found")
+            shortlists.update(await asyncio.to_thread(agent_service.batch_shortlists, fresh, consultants))
+            for job in fresh:
+                _, top_profiles, top_scores = shortlists[job.id]
+                await self._checkpoint(run_keys[job.id], job.id, "shortlist", self._shortlist_entries(top_profiles, top_scores))
+        logger.info(f"Batch shortlists: {len(fresh)} computed, {len(jobs) - len(fresh)} resumed from checkpoints")
+
+        semaphore = asyncio.Semaphore(settings.batch_match_concurrency)
+
+        async def match(job):
+            async with semaphore:
+                return await self._rank_and_notify(db, job, run_keys[job.id], done[job.id], *shortlists[job.id], filters)
+
+        outcomes = await asyncio.gather(*[match(job) for job in jobs], return_exceptions=True)
+        summary = {job_id: {"success": False, "job_id": job_id, "error": "Job description not found"} for job_id in missing}
+        for job, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error in batch matching for job_id={job.id}: {outcome}")
+                summary[job.id] = {"success": False, "job_id": job.id, "error": str(outcome)}
+            else:
+                summary[job.id] = outcome
+        logger.info(f"Batch matching completed: {sum(s['success'] for s in summary.values())}/{len(job_ids)} jobs succeeded")
+        return summary
+
+    def load_jobs(self, job_ids: List[int]) -> List[SimpleNamespace]:
+        """Job descriptions as the matching pipeline sees them; ids that do not exist are skipped"""
+        return [SimpleNamespace(id=row["id"], **self.db_job_to_schema(row)) for row in JobDescription.get_many(job_ids)]
+
+    @staticmethod
+    def _shortlist_entries(top_profiles, top_scores) -> List[Dict[str, Any]]:
+        return [{"consultant_id": c.id, "score": float(score)} for c, score in zip(top_profiles, top_scores)]
+
+    def _restore_shortlists(self, resumed: List[Tuple[Any, List[Dict[str, Any]]]]) -> Dict[int, Tuple[str, List[Any], List[float]]]:
+        """``_restore_shortlist`` for several (job, checkpointed entries) pairs; blocking"""
+        return {job.id: self._restore_shortlist(job, entries) for job, entries in resumed}
 
-    def get_matching_results(self, db: Session) -> List[MatchingResult]:
+    def _restore_shortlist(self, job, entries: List[Dict[str, Any]]):
+        """(JD text, profiles, scores) of a checkpointed shortlist; consultants deleted since are dropped"""
+        consultant_catalog.refresh()
+        top_profiles, top_scores = [], []
+        for entry in entries:
+            record = consultant_catalog.get(entry["consultant_id"])
+            if record is not None:
+                top_profiles.append(record)
+                top_scores.append(entry["score"])
+        return job_text_of(job), top_profiles, top_scores
+
+    async def _completed_stages(self, run_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Checkpointed stage outputs per run key; when they cannot be read, runs start from scratch"""
+        try:
+            return await asyncio.to_thread(MatchingCheckpoint.get_completed, run_keys, settings.matching_checkpoint_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Could not read matching checkpoints: {e}")
+            return {}
+
+    async def _checkpoint(self, run_key: str, job_id: int, stage: str, output: Any):
+        """Persist a completed stage's output; a failed write only costs redoing the stage on retry"""
+        try:
+            await asyncio.to_thread(MatchingCheckpoint.save, run_key, job_id, stage, output)
+        except Exception as e:
+            logger.warning(f"Could not checkpoint {stage} stage for job_id={job_id}: {e}")
+
+    async def _stage(self, run_key: str, job_id: int, done: Dict[str, Any], stage: str, run) -> Any:
+        """Output of a pipeline stage: its checkpoint when an earlier attempt completed it, else run and checkpoint it"""
+        if stage in done:
+            logger.info(f"Skipping {stage} stage for job_id={job_id}: completed by an earlier attempt")
+            return done[stage]
+        output = await run()
+        await self._checkpoint(run_key, job_id, stage, output)
+        return output
+
+    def eligible_consultants(self, filters: Optional[ConsultantFilters] = None) -> List[ConsultantRecord]:
+        """
+        Consultants passing the filters, from the in-process catalog (vectorized, no per-match
+        row conversion). Only these become search candidates, and the vector search pushes the
+        same set into FAISS as an id selector, so the top-k (and every LLM slot) goes to
+        eligible consultants only.
+        """
+        filters = filters or ConsultantFilters()
+        consultant_catalog.refresh()
+        return consultant_catalog.filter(**filters.dict())
+
+    async def _rank_and_notify(self, db: "Session", job, run_key: str, done: Dict[str, Any], jd_text: str, top_profiles, top_scores, filters: Optional[ConsultantFilters] = None) -> Dict[str, Any]:
+        """
+        LLM comparison, ranking and communication stages for one shortlisted job, then persist its
+        matching result and queue its emails in the outbox. The shortlist (consultant id, fused score)
+        and the filters it was drawn with are stored too, for push re-scoring to keep fresh. Stages
+        in ``done`` (checkpoints of an earlier attempt) are not run again, and the run's checkpoints
+        are dropped once the result is stored.
+        """
+        shortlist = self._shortlist_entries(top_profiles, top_scores)
+        similarity_results = await self._stage(
+            run_key, job.id, done, "comparison",
+            lambda: agent_service.compare_shortlist(db, job, jd_text, top_profiles, top_scores)
+        )
+        ranked_consultants, overall_score = await self._stage(
+            run_key, job.id, done, "ranking",
+            lambda: agent_service.ranking_agent(db, job.id, similarity_results)
+        )
+        top_matches = ranked_consultants[:3]
+        emails = await self._stage(
+            run_key, job.id, done, "communication",
+            lambda: agent_service.communication_agent(db, job.id, job.title, top_matches, overall_score)
+        )
+        # The result and its emails commit together; email_sent flips once the outbox sender delivers
+        await asyncio.to_thread(MatchingResult.create_with_emails, job.id, {
+            "similarity_score": overall_score,
+            "top_matches": top_matches,
+            "email_sent": False,
+            "email_recipients": [recipient for email in emails for recipient in email["recipients"]],
+            "shortlist": shortlist,
+            "filters": (filters or ConsultantFilters()).dict()
+        }, emails, settings.email_max_attempts)
+        try:
+            await asyncio.to_thread(MatchingCheckpoint.clear, run_key)
+        except Exception as e:
+            logger.warning(f"Could not clear checkpoints of job_id={job.id}: {e}")
+        return {
+            "success": True,
+            "job_id": job.id,
+            "overall_score": overall_score,
+            "top_matches_count": len(top_matches),
+            "emails_queued": len(emails)
+        }
+
+    def get_matching_results(self, db: "Session") -> List[MatchingResult]:
         """Get all matching results"""
         return db.query(MatchingResult).order_by(MatchingResult.created_at.desc()).all()
 
-    def get_agent_status(self, db: Session, job_id: int) -> Dict[str, Any]:
-        """Get current agent status for a job"""
-        from ..models.agent_status import AgentStatus
-        
-        agent_status = db.query(AgentStatus).filter(AgentStatus.job_id == job_id).first()
-        
-        if not agent_status:
+    def get_agent_status(self, job_id: int) -> Dict[str, Any]:
+        """Current stage status and partial results for a job: one primary-key read, no model or LLM work"""
+        progress = MatchingProgress.get(job_id)
+        if not progress:
             return {
+                "job_id": job_id,
                 "comparison": {"status": "idle", "progress": 0},
                 "ranking": {"status": "idle", "progress": 0},
-                "communication": {"status": "idle", "progress": 0}
+                "communication": {"status": "idle", "progress": 0},
+                "partial_results": []
             }
-
         return {
-            "comparison": {
-                "status": agent_status.comparison_status,
-                "progress": agent_status.comparison_progress
-            },
-            "ranking": {
-                "status": agent_status.ranking_status,
-                "progress": agent_status.ranking_progress
-            },
-            "communication": {
-                "status": agent_status.communication_status,
-                "progress": agent_status.communication_progress
-            }
+            "job_id": job_id,
+            **{stage: {"status": progress[f"{stage}_status"], "progress": progress[f"{stage}_progress"]} for stage in STAGES},
+            "partial_results": progress["partial_results"],
+            "updated_at": progress["updated_at"]
         }
 
     def db_job_to_schema(self, job):
@@ -154,9 +306,11 @@ class MatchingService:
                 "message": "Starting comparison",
                 "last_updated": datetime.utcnow()
             }
-            # Get all consultant profiles
-            consultants = ConsultantProfile.get_all()
-            consultants = [self.db_consultant_to_schema(c) for c in consultants]
+            # Get all consultant profiles and score their skills against the job in one pass
+            rows = ConsultantProfile.get_all()
+            skill_matrix.ensure_indexed(rows)
+            scores = skill_matrix.score(job["skills"])
+            consultants = [self.db_consultant_to_schema(c) for c in rows]
             # Simulate comparison process
             total_consultants = len(consultants)
             for i, consultant in enumerate(consultants):
@@ -169,7 +323,7 @@ class MatchingService:
                     "last_updated": datetime.utcnow()
                 }
                 # Create matching result
-                score = self._calculate_similarity(job, consultant)
+                score = self._calculate_similarity(job, consultant, scores)
                 MatchingResult.create(
                     job_description_id=job_id,
                     status="completed"
@@ -223,13 +377,15 @@ class MatchingService:
             job = JobDescription.get_by_id(job_id)
             job_title = job['title'] if job else ''
             department = job.get('department', '') if job else ''
-            for row in results:
-                row_dict = dict(zip(columns, row))
+            rows = [dict(zip(columns, row)) for row in results]
+            names = self._shortlist_names(rows)
+            for row_dict in rows:
                 # Parse the 'results' JSON if present
                 results_json = None
                 if row_dict.get('results'):
                     try:
-                        results_json = json.loads(row_dict['results'])
+                        # JSONB comes back from psycopg2 already decoded
+                        results_json = row_dict['results'] if isinstance(row_dict['results'], dict) else json.loads(row_dict['results'])
                     except Exception:
                         results_json = None
                 # Map to schema fields
@@ -240,6 +396,10 @@ class MatchingService:
                     'department': department,
                     'similarity_score': float(results_json.get('similarity_score', 0.0)) if results_json else 0.0,
                     'top_matches': (results_json.get('top_matches') if results_json else []),
+                    'shortlist': [
+                        {**entry, 'consultant_name': names.get(entry['consultant_id'], '')}
+                        for entry in (results_json.get('shortlist') or [] if results_json else [])
+                    ],
                     'email_sent': (results_json.get('email_sent') if results_json else False),
                     'email_recipients': (results_json.get('email_recipients') if results_json else []),
                     'created_at': row_dict['created_at'],
@@ -250,10 +410,26 @@ class MatchingService:
             logger.error(f"Error getting results: {str(e)}")
             return []
 
-    def _calculate_similarity(self, job: dict, consultant: dict) -> float:
-        """Calculate similarity score between job and consultant"""
-        # This is a placeholder for the actual similarity calculation
-        # In a real implementation, this would use NLP or other techniques
-        return 0.75  # Placeholder score
+    @staticmethod
+    def _shortlist_names(rows: List[dict]) -> Dict[int, str]:
+        """Consultant names for every stored shortlist, in one query"""
+        ids = {
+            entry['consultant_id']
+            for row in rows if isinstance(row.get('results'), dict)
+            for entry in row['results'].get('shortlist') or []
+        }
+        return {profile['id']: profile['name'] for profile in ConsultantProfile.get_many(ids)} if ids else {}
+
+    def _calculate_similarity(self, job: dict, consultant: dict, scores: Optional[SkillScores] = None) -> float:
+        """
+        Calculate similarity score between job and consultant: the IDF-weighted share of the
+        job's required skills the consultant has (0..1). Pass ``scores`` from one
+        ``skill_matrix.score`` call when scoring many consultants for the same job.
+        """
+        if scores is None:
+            skill_matrix.ensure_indexed([consultant])
+            scores = skill_matrix.score(job["skills"], [consultant["consultant_id"]])
+        pos = scores.position(consultant["consultant_id"])
+        return float(scores.weighted_coverage[pos]) if pos is not None else 0.0
 
 matching_service = MatchingService()
\ No newline at end of file
@@ -0,0 +1,36 @@
+from typing import Optional, Tuple
+import numpy as np
+
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+
+# Symmetric int8 range; -128 is left unused so that q and -q are both representable
+INT8_MAX = 127
+
+def check_dtype(dtype: str) -> str:
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Unknown embedding dtype '{dtype}', expected one of {EMBEDDING_DTYPES}")
+    return dtype
+
+def quantize(vector: np.ndarray, dtype: str) -> Tuple[bytes, Optional[float]]:
+    """
+    Encode one vector for storage as (bytes, scale).
+
+    ``int8`` uses a per-vector symmetric scale (max |x| / 127) which must be kept
+    alongside the bytes; the other dtypes have no scale.
+    """
+    vector = np.asarray(vector, dtype='float32').ravel()
+    if check_dtype(dtype) == "float32":
+        return vector.tobytes(), None
+    if dtype == "float16":
+        return vector.astype('float16').tobytes(), None
+    peak = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = peak / INT8_MAX if peak > 0 else 1.0
+    return np.clip(np.rint(vector / scale), -INT8_MAX, INT8_MAX).astype('int8').tobytes(), scale
+
+def dequantize(data: bytes, dtype: Optional[str] = "float32", scale: Optional[float] = None) -> np.ndarray:
+    """Decode stored bytes back to a float32 vector (rows written before quantization have no dtype)"""
+    dtype = check_dtype(dtype or "float32")
+    vector = np.frombuffer(bytes(data), dtype=dtype)
+    if dtype == "int8":
+        return vector.astype('float32') * np.float32(scale if scale is not None else 1.0)
+    return vector.astype('float32', copy=False)
@@ -0,0 +1,117 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+from backend.config import get_settings
+from backend.models.consultant_profile import ConsultantProfile
+from backend.models.job_description import JobDescription
+from backend.models.matching_result import MatchingResult
+from backend.schemas.matching_result import ConsultantFilters
+from backend.services.embedding_store import embedding_store
+from backend.services.vector_index import job_index
+from backend.services.skill_index import skill_index
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+class ConsultantRescorer:
+    """
+    Push re-scoring: when a consultant is added or changed, score just that consultant
+    against every job's stored JD vector and splice it into the stored shortlist of each
+    job that already has a matching result, instead of re-running every match.
+
+    Work runs on one background thread; repeated changes to a consultant that is still
+    queued collapse into a single re-score.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="consultant-rescore")
+        self._pending: Set[int] = set()
+        self._lock = threading.Lock()
+        self.rescored = 0
+        self.shortlists_updated = 0
+        self.errors = 0
+
+    def enqueue(self, consultant_id: int):
+        with self._lock:
+            if consultant_id in self._pending:
+                return
+            self._pending.add(consultant_id)
+        self._executor.submit(self._run, consultant_id)
+
+    def _run(self, consultant_id: int):
+        with self._lock:
+            self._pending.discard(consultant_id)
+        try:
+            self.rescore(consultant_id)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not re-score consultant {consultant_id}: {e}")
+
+    def rescore(self, consultant_id: int) -> int:
+        """
+        Update the stored shortlists this consultant now qualifies for (or dropped out of, by score
+        or by the eligibility filters the match ran with); returns how many changed
+        """
+        consultant = ConsultantProfile.get_by_id(consultant_id)
+        if consultant is None:
+            return 0
+        job_index.refresh()
+        skill_index.ensure_indexed([consultant])
+        job_ids, dense_scores, _ = job_index.search(embedding_store.get_embeddings([consultant]), len(job_index))
+        results = {row['job_description_id']: row for row in MatchingResult.get_latest_by_job_ids(job_ids)}
+        jobs = {job['id']: job for job in JobDescription.get_many(list(results))}
+        weight = settings.hybrid_skill_weight
+        updated = 0
+        for job_id, dense in zip(job_ids, dense_scores):
+            if job_id not in results or job_id not in jobs:
+                continue
+            stored = results[job_id]['results'] or {}
+            if ConsultantFilters(**stored.get('filters', {})).allows(consultant):
+                # Same fused score as the matching shortlist: dense cosine plus the BM25 skill score
+                skill = dict(skill_index.search(jobs[job_id]['skills'], 1, [consultant_id])).get(consultant_id, 0.0)
+                shortlist = self._merge(stored.get('shortlist'), consultant_id, (1 - weight) * dense + weight * skill)
+            else:
+                # No longer eligible under the filters the match ran with
+                shortlist = self._drop(stored.get('shortlist'), consultant_id)
+            if shortlist is not None:
+                MatchingResult.update_shortlist(results[job_id]['id'], shortlist)
+                updated += 1
+        self.rescored += 1
+        self.shortlists_updated += updated
+        logger.info(f"Re-scored consultant {consultant_id} against {len(job_ids)} jobs, {updated} shortlists updated")
+        return updated
+
+    @staticmethod
+    def _merge(shortlist: Optional[List[Dict[str, Any]]], consultant_id: int, score: float) -> Optional[List[Dict[str, Any]]]:
+        """New top-k with the consultant's fresh score, or None when the stored list is unchanged"""
+        if shortlist is None:
+            return None
+        k = settings.match_shortlist_size
+        previous = [entry for entry in shortlist if entry['consultant_id'] == consultant_id]
+        others = [entry for entry in shortlist if entry['consultant_id'] != consultant_id]
+        merged = sorted(others + [{"consultant_id": consultant_id, "score": score}], key=lambda entry: entry['score'], reverse=True)[:k]
+        qualifies = any(entry['consultant_id'] == consultant_id for entry in merged)
+        if not previous and not qualifies:
+            return None
+        # A consultant already listed but now outscored drops out, leaving the list one short until the next full match
+        return merged if qualifies else others
+
+    @staticmethod
+    def _drop(shortlist: Optional[List[Dict[str, Any]]], consultant_id: int) -> Optional[List[Dict[str, Any]]]:
+        """The shortlist without the consultant, or None when they were not on it"""
+        if not shortlist or not any(entry['consultant_id'] == consultant_id for entry in shortlist):
+            return None
+        return [entry for entry in shortlist if entry['consultant_id'] != consultant_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "rescored": self.rescored,
+            "shortlists_updated": self.shortlists_updated,
+            "errors": self.errors,
+        }
+
+consultant_rescorer = ConsultantRescorer()
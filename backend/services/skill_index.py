@@ -0,0 +1,170 @@
+import heapq
+import math
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from backend.models.consultant_profile import ConsultantProfile
+from backend.services.embedding_store import _field, consultant_id_of
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+
+# Common spellings that should land on the same posting list
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "js": "javascript",
+    "ts": "typescript",
+    "golang": "go",
+    "postgres": "postgresql",
+    "py": "python",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "react.js": "react",
+    "reactjs": "react",
+    "ml": "machine learning",
+    "aws cloud": "aws",
+    "gcp": "google cloud",
+}
+
+# BM25 parameters; skills are binary (a consultant has one or not), so only length normalization uses b
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+@lru_cache(maxsize=65536)
+def normalize_skill(skill: str) -> str:
+    """Lowercase, trim and collapse a skill name, keeping symbols that matter (c++, c#, node.js)"""
+    skill = re.sub(r"[^\w+#./ -]", " ", skill.lower())
+    skill = re.sub(r"\s+", " ", skill).strip(" .-/")
+    return SKILL_ALIASES.get(skill, skill)
+
+def skills_text(skills: Any) -> str:
+    """Canonical comma-separated form, so list and TEXT inputs compare equal when unchanged"""
+    if isinstance(skills, (list, tuple)):
+        return ','.join(str(skill) for skill in skills)
+    return skills or ''
+
+def parse_skills(skills: Any) -> List[str]:
+    """Unique normalized skills from a list or the comma-separated TEXT column"""
+    if not skills:
+        return []
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    seen = []
+    for skill in skills:
+        normalized = normalize_skill(str(skill))
+        if normalized and normalized not in seen:
+            seen.append(normalized)
+    return seen
+
+class SkillIndex:
+    """
+    In-memory inverted index from normalized skill to consultant ids, scored with BM25.
+
+    Used as a cheap candidate generator ahead of dense similarity: only consultants
+    that share at least one required skill are scored. ``search`` scales BM25 scores
+    to 0..1 relative to a consultant having every queried skill.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._skills: Dict[int, Tuple[str, ...]] = {}
+        # Skills text per consultant, to notice rows changed by another process
+        self._raw: Dict[int, str] = {}
+        self._total_length = 0
+        self._built = False
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def upsert(self, consultant_id: int, skills: Any):
+        with self._lock:
+            self._remove(consultant_id)
+            parsed = tuple(parse_skills(skills))
+            self._skills[consultant_id] = parsed
+            self._raw[consultant_id] = skills_text(skills)
+            self._total_length += len(parsed)
+            for skill in parsed:
+                self._postings.setdefault(skill, set()).add(consultant_id)
+
+    def remove(self, consultant_id: int):
+        with self._lock:
+            self._remove(consultant_id)
+
+    def _remove(self, consultant_id: int):
+        parsed = self._skills.pop(consultant_id, None)
+        self._raw.pop(consultant_id, None)
+        if parsed is None:
+            return
+        self._total_length -= len(parsed)
+        for skill in parsed:
+            posting = self._postings.get(skill)
+            if posting is not None:
+                posting.discard(consultant_id)
+                if not posting:
+                    del self._postings[skill]
+
+    def rebuild(self, consultants: Iterable[Any]):
+        with self._lock:
+            self._postings, self._skills, self._raw, self._total_length = {}, {}, {}, 0
+            for consultant in consultants:
+                self.upsert(consultant_id_of(consultant), _field(consultant, 'skills', default=''))
+            self._built = True
+            logger.info(f"Built skill index: {len(self._skills)} consultants, {len(self._postings)} distinct skills")
+
+    def ensure_built(self):
+        with self._lock:
+            if not self._built:
+                self.rebuild(ConsultantProfile.get_all())
+
+    def ensure_indexed(self, consultants: List[Any]):
+        """Index consultants that are missing or whose skills changed (e.g. rows written by another process)"""
+        with self._lock:
+            self.ensure_built()
+            for consultant in consultants:
+                consultant_id = consultant_id_of(consultant)
+                skills = skills_text(_field(consultant, 'skills', default=''))
+                if consultant_id is not None and self._raw.get(consultant_id) != skills:
+                    self.upsert(consultant_id, skills)
+
+    def _idf(self, skill: str) -> float:
+        df = len(self._postings.get(skill, ()))
+        return math.log(1 + (len(self._skills) - df + 0.5) / (df + 0.5))
+
+    def search(self, skills: Any, limit: int, allowed_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """Top ``limit`` (consultant id, normalized BM25 score) pairs having any of ``skills``"""
+        query = parse_skills(skills)
+        allowed = set(allowed_ids) if allowed_ids is not None else None
+        with self._lock:
+            if not query or not self._skills:
+                return []
+            avg_length = self._total_length / len(self._skills) or 1.0
+            scores: Dict[int, float] = {}
+            best = 0.0
+            for skill in query:
+                idf = self._idf(skill)
+                # Upper bound of a term's contribution, reached by the shortest profiles
+                best += idf * (BM25_K1 + 1) / (1 + BM25_K1 * (1 - BM25_B))
+                for consultant_id in self._postings.get(skill, ()):
+                    if allowed is not None and consultant_id not in allowed:
+                        continue
+                    length = len(self._skills[consultant_id])
+                    norm = 1 + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    scores[consultant_id] = scores.get(consultant_id, 0.0) + idf * (BM25_K1 + 1) / norm
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(consultant_id, min(1.0, score / best) if best else 0.0) for consultant_id, score in top]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "consultants": len(self._skills),
+                "skills": len(self._postings),
+                "avg_skills_per_consultant": round(self._total_length / len(self._skills), 2) if self._skills else 0.0,
+            }
+
+skill_index = SkillIndex()
@@ -0,0 +1,273 @@
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from backend.models.consultant_profile import ConsultantProfile
+from backend.services.embedding_store import _field, consultant_id_of
+from backend.services.skill_index import normalize_skill, skills_text
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+
+WORD_BITS = 64
+
+if hasattr(np, "bitwise_count"):
+    def popcount(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words)
+else:
+    # NumPy < 2.0: count bits byte by byte through a lookup table
+    _POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype='uint8')
+
+    def popcount(words: np.ndarray) -> np.ndarray:
+        words = np.ascontiguousarray(words)
+        return _POPCOUNT8[words.view('uint8')].reshape(*words.shape, 8).sum(axis=-1, dtype='uint8')
+
+def _query(skills: Any) -> List[Tuple[str, str]]:
+    """(as written, normalized) pairs for the unique skills of a JD"""
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    pairs, seen = [], set()
+    for skill in skills or []:
+        normalized = normalize_skill(str(skill))
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            pairs.append((str(skill).strip(), normalized))
+    return pairs
+
+class SkillScores:
+    """
+    Result of scoring one JD against many consultants; every array is aligned with ``ids``.
+
+    ``overlap`` counts required skills the consultant has, ``jaccard`` is overlap over the
+    union of both skill sets, ``coverage`` is the share of required skills covered and
+    ``weighted_coverage`` weights each required skill by its IDF, so rare skills count more.
+    """
+
+    def __init__(self, ids, overlap, jaccard, coverage, weighted_coverage, has, query):
+        self.ids = ids
+        self.overlap = overlap
+        self.jaccard = jaccard
+        self.coverage = coverage
+        self.weighted_coverage = weighted_coverage
+        # (required skill, consultant) flags
+        self._has = has
+        self._query = query
+        self._position = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def required(self) -> List[str]:
+        return list(self._query)
+
+    def position(self, consultant_id: int) -> Optional[int]:
+        if self._position is None:
+            self._position = {int(i): pos for pos, i in enumerate(self.ids)}
+        return self._position.get(consultant_id)
+
+    def skills(self, consultant_id: int) -> Tuple[List[str], List[str]]:
+        """(matching, missing) required skills for one consultant, as written in the JD"""
+        pos = self.position(consultant_id)
+        has = self._has[:, pos] if pos is not None else np.zeros(len(self._query), dtype=bool)
+        matching = [skill for skill, hit in zip(self._query, has.tolist()) if hit]
+        missing = [skill for skill, hit in zip(self._query, has.tolist()) if not hit]
+        return matching, missing
+
+    def top(self, k: int, by: str = "weighted_coverage") -> List[Tuple[int, float]]:
+        values = getattr(self, by)
+        k = min(k, len(values))
+        if k <= 0:
+            return []
+        best = np.argpartition(-values, k - 1)[:k]
+        best = best[np.argsort(-values[best], kind='stable')]
+        return [(int(self.ids[i]), float(values[i])) for i in best]
+
+class SkillMatrix:
+    """
+    Consultant skills as packed bitsets: row r is one consultant, bit j of the row is
+    vocabulary skill j, stored as ``uint64`` words. Scoring a JD ANDs its query words
+    against every row and popcounts, one vectorized pass over all consultants.
+
+    The words are stored word-major (``_bits[word, row]``) so the handful of words a JD
+    touches are contiguous arrays rather than strided columns. Rows of deleted
+    consultants are zeroed and reused. The matrix grows by doubling (rows) and by whole
+    words (vocabulary), so memory is about vocabulary / 8 bytes per consultant.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._vocabulary: Dict[str, int] = {}
+        self._built = False
+        self._reset(1024, 1)
+
+    def _reset(self, rows: int, words: int):
+        self._bits = np.zeros((words, rows), dtype='uint64')
+        self._ids = np.full(rows, -1, dtype='int64')
+        self._sizes = np.zeros(rows, dtype='int32')
+        self._df = np.zeros(words * WORD_BITS, dtype='int64')
+        self._row_of: Dict[int, int] = {}
+        self._raw: Dict[int, str] = {}
+        self._free: List[int] = []
+        self._rows = 0
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _skill_bit(self, skill: str) -> int:
+        bit = self._vocabulary.get(skill)
+        if bit is None:
+            bit = self._vocabulary[skill] = len(self._vocabulary)
+            if bit >= self._bits.shape[0] * WORD_BITS:
+                self._bits = np.vstack([self._bits, np.zeros_like(self._bits)])
+                self._df = np.concatenate([self._df, np.zeros_like(self._df)])
+        return bit
+
+    def _allocate_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._rows == len(self._ids):
+            grow = len(self._ids)
+            self._bits = np.hstack([self._bits, np.zeros((self._bits.shape[0], grow), dtype='uint64')])
+            self._ids = np.concatenate([self._ids, np.full(grow, -1, dtype='int64')])
+            self._sizes = np.concatenate([self._sizes, np.zeros(grow, dtype='int32')])
+        self._rows += 1
+        return self._rows - 1
+
+    def _bit_list(self, skills: Any) -> List[int]:
+        if isinstance(skills, str):
+            skills = skills.split(',')
+        return sorted({self._skill_bit(s) for s in (normalize_skill(str(skill)) for skill in skills or []) if s})
+
+    def upsert(self, consultant_id: int, skills: Any):
+        with self._lock:
+            bits = self._bit_list(skills)
+            row = self._row_of.get(consultant_id)
+            if row is None:
+                row = self._row_of[consultant_id] = self._allocate_row()
+            else:
+                self._clear_row(row)
+            for bit in bits:
+                self._bits[bit // WORD_BITS, row] |= np.uint64(1) << np.uint64(bit % WORD_BITS)
+            self._df[bits] += 1
+            self._ids[row] = consultant_id
+            self._sizes[row] = len(bits)
+            self._raw[consultant_id] = skills_text(skills)
+
+    def _clear_row(self, row: int):
+        words = self._bits[:, row]
+        for word in np.flatnonzero(words):
+            value = int(words[word])
+            while value:
+                low = value & -value
+                self._df[word * WORD_BITS + low.bit_length() - 1] -= 1
+                value ^= low
+        self._bits[:, row] = 0
+        self._sizes[row] = 0
+
+    def remove(self, consultant_id: int):
+        with self._lock:
+            row = self._row_of.pop(consultant_id, None)
+            self._raw.pop(consultant_id, None)
+            if row is None:
+                return
+            self._clear_row(row)
+            self._ids[row] = -1
+            self._free.append(row)
+
+    def rebuild(self, consultants: Iterable[Any]):
+        """Bulk load: parse every profile first, then set all bits in one vectorized scatter"""
+        with self._lock:
+            consultants = [c for c in consultants if consultant_id_of(c) is not None]
+            self._vocabulary = {}
+            self._reset(1, 1)
+            raw = [skills_text(_field(c, 'skills', default='')) for c in consultants]
+            parsed = [self._bit_list(skills) for skills in raw]
+            words = max(1, -(-len(self._vocabulary) // WORD_BITS))
+            self._reset(max(1024, len(consultants)), words)
+            rows = np.repeat(np.arange(len(parsed), dtype='int64'), [len(bits) for bits in parsed])
+            bits = np.fromiter((bit for row_bits in parsed for bit in row_bits), dtype='int64', count=len(rows))
+            np.bitwise_or.at(self._bits, (bits // WORD_BITS, rows), np.left_shift(np.uint64(1), (bits % WORD_BITS).astype('uint64')))
+            self._df[:] = np.bincount(bits, minlength=len(self._df))
+            self._sizes[:len(parsed)] = [len(row_bits) for row_bits in parsed]
+            ids = [consultant_id_of(c) for c in consultants]
+            self._ids[:len(ids)] = ids
+            self._row_of = {consultant_id: row for row, consultant_id in enumerate(ids)}
+            self._raw = dict(zip(ids, raw))
+            self._rows = len(ids)
+            self._built = True
+            logger.info(f"Built skill matrix: {len(self)} consultants x {len(self._vocabulary)} skills ({self._bits.nbytes / 2**20:.1f} MB)")
+
+    def ensure_built(self):
+        with self._lock:
+            if not self._built:
+                self.rebuild(ConsultantProfile.get_all())
+
+    def ensure_indexed(self, consultants: List[Any]):
+        """Add consultants that are missing or whose skills changed (e.g. rows written by another process)"""
+        with self._lock:
+            self.ensure_built()
+            for consultant in consultants:
+                consultant_id = consultant_id_of(consultant)
+                skills = skills_text(_field(consultant, 'skills', default=''))
+                if consultant_id is not None and self._raw.get(consultant_id) != skills:
+                    self.upsert(consultant_id, skills)
+
+    def score(self, jd_skills: Any, consultant_ids: Optional[Sequence[int]] = None) -> SkillScores:
+        """Score a JD's required skills against all consultants (or just ``consultant_ids``) in one pass"""
+        query = _query(jd_skills)
+        required = len(query)
+        with self._lock:
+            if consultant_ids is None:
+                rows = slice(0, self._rows)
+            else:
+                rows = np.array([self._row_of[i] for i in consultant_ids if i in self._row_of], dtype='int64')
+            ids = self._ids[rows]
+            sizes = self._sizes[rows]
+            total = max(1, len(self))
+            known = [(pos, self._vocabulary[normalized]) for pos, (_, normalized) in enumerate(query) if normalized in self._vocabulary]
+
+            # Only the words holding a required skill can contribute
+            query_words: Dict[int, int] = {}
+            for _, bit in known:
+                query_words[bit // WORD_BITS] = query_words.get(bit // WORD_BITS, 0) | 1 << (bit % WORD_BITS)
+            overlap = np.zeros(len(ids), dtype='int32')
+            for word, mask in query_words.items():
+                overlap += popcount(self._bits[word, rows] & np.uint64(mask))
+
+            has = np.zeros((required, len(ids)), dtype=bool)
+            weights = np.zeros(required, dtype='float32')
+            # Skills no consultant has get the highest possible IDF
+            weights[:] = math.log(1 + (total + 0.5) / 0.5)
+            for pos, bit in known:
+                has[pos] = (self._bits[bit // WORD_BITS, rows] & np.uint64(1 << (bit % WORD_BITS))) != 0
+                weights[pos] = math.log(1 + (total - self._df[bit] + 0.5) / (self._df[bit] + 0.5))
+
+        if consultant_ids is None and len(ids) > total:
+            # Drop the zeroed rows of deleted consultants
+            live = ids >= 0
+            ids, sizes, overlap, has = ids[live], sizes[live], overlap[live], has[:, live]
+        union = sizes + required - overlap
+        jaccard = np.divide(overlap, union, out=np.zeros(len(ids), dtype='float32'), where=union > 0)
+        coverage = (overlap / np.float32(max(1, required))).astype('float32')
+        weighted = np.zeros(len(ids), dtype='float32')
+        for pos in range(required):
+            weighted += weights[pos] * has[pos]
+        if required:
+            weighted /= weights.sum()
+        return SkillScores(ids, overlap, jaccard, coverage, weighted, has, [skill for skill, _ in query])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "consultants": len(self),
+                "vocabulary": len(self._vocabulary),
+                "words_per_row": self._bits.shape[0],
+                "memory_bytes": int(self._bits.nbytes + self._ids.nbytes + self._sizes.nbytes),
+            }
+
+skill_matrix = SkillMatrix()
@@ -0,0 +1,62 @@
+import json
+from typing import Any, List
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+
+class IncrementalJSONArrayParser:
+    """
+    Incremental parser for a streamed top-level JSON array of objects.
+
+    Text is fed in arbitrary chunks as it arrives; ``feed`` returns every
+    element object that closed within the chunk. Anything before the first
+    ``[`` (e.g. a markdown fence) is skipped, and an element that fails to
+    parse is dropped without affecting the ones after it.
+    """
+
+    def __init__(self):
+        self.done = False
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buffer: List[str] = []
+
+    def feed(self, text: str) -> List[Any]:
+        completed = []
+        for ch in text:
+            if self.done:
+                break
+            if not self._started:
+                self._started = ch == '['
+                continue
+            if self._depth == 0:
+                # Between elements: only an object start or the closing bracket matter
+                if ch == '{':
+                    self._depth = 1
+                    self._buffer = [ch]
+                elif ch == ']':
+                    self.done = True
+                continue
+            self._buffer.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    element = ''.join(self._buffer)
+                    self._buffer = []
+                    try:
+                        completed.append(json.loads(element))
+                    except ValueError as e:
+                        logger.warning(f"Skipping malformed streamed element: {e}")
+        return completed
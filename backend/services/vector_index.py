@@ -0,0 +1,635 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from backend.config import get_settings
+from backend.models.consultant_profile import ConsultantProfile
+from backend.models.job_description import JobDescription
+from backend.models.job_embedding import JobEmbedding
+from backend.services.embedding_store import embedding_store, consultant_id_of, consultant_text_of, job_text_of
+from backend.services.quantization import check_dtype
+from backend.services.index_snapshot import IndexSnapshots
+from backend.logging import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# faiss is imported inside the methods that need it so importing this module stays cheap
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# Below these sizes a trained index is not worth it (or cannot be trained), so we fall back to exact search
+MIN_IVF_TRAINING_POINTS = 39 * 8
+MIN_PQ_TRAINING_POINTS = 256 * 4
+# int8 scalar quantization learns a per-dimension range; with fewer points it would clip new vectors
+MIN_SQ8_TRAINING_POINTS = 256
+
+class _LabelMap:
+    """
+    FAISS label <-> item id maps.
+
+    Labels below ``len(base_ids)`` come from a published snapshot and are looked
+    up in its (memory-mapped) arrays instead of being copied into dicts, so every
+    worker shares them; removed base labels are remembered in a small set. Labels
+    assigned afterwards live in plain dicts.
+    """
+
+    def __init__(self, base_ids: Optional[np.ndarray] = None, sorted_ids: Optional[np.ndarray] = None, sorted_labels: Optional[np.ndarray] = None):
+        self._base_ids = base_ids if base_ids is not None else np.empty(0, dtype='int64')
+        self._sorted_ids = sorted_ids if sorted_ids is not None else self._base_ids
+        self._sorted_labels = sorted_labels if sorted_labels is not None else np.empty(0, dtype='int64')
+        self._removed = set()
+        self._label_to_id: Dict[int, int] = {}
+        self._id_to_label: Dict[int, int] = {}
+
+    @property
+    def base_size(self) -> int:
+        return len(self._base_ids)
+
+    def __len__(self) -> int:
+        return self.base_size - len(self._removed) + len(self._id_to_label)
+
+    def _base_label_of(self, item_id: int) -> Optional[int]:
+        pos = int(np.searchsorted(self._sorted_ids, item_id))
+        if pos < len(self._sorted_ids) and self._sorted_ids[pos] == item_id:
+            label = int(self._sorted_labels[pos])
+            if label not in self._removed:
+                return label
+        return None
+
+    def label_of(self, item_id: int) -> Optional[int]:
+        label = self._id_to_label.get(item_id)
+        if label is None and self.base_size:
+            label = self._base_label_of(item_id)
+        return label
+
+    def id_of(self, label: int) -> Optional[int]:
+        if 0 <= label < self.base_size:
+            return None if label in self._removed else int(self._base_ids[label])
+        return self._label_to_id.get(label)
+
+    def add(self, label: int, item_id: int):
+        self._label_to_id[label] = item_id
+        self._id_to_label[item_id] = label
+
+    def pop(self, item_id: int) -> Optional[int]:
+        label = self._id_to_label.pop(item_id, None)
+        if label is not None:
+            del self._label_to_id[label]
+            return label
+        label = self._base_label_of(item_id) if self.base_size else None
+        if label is not None:
+            self._removed.add(label)
+        return label
+
+    def removed_base_labels(self) -> List[int]:
+        return list(self._removed)
+
+    def items(self) -> List[Tuple[int, int]]:
+        """(item id, label) of every live item"""
+        base = [(int(i), label) for label, i in enumerate(self._base_ids) if label not in self._removed]
+        return base + list(self._id_to_label.items())
+
+class VectorIndex:
+    """
+    Id-addressable FAISS index over L2-normalized embeddings (inner product = cosine).
+
+    Each vector gets an internal FAISS label; the label <-> item id maps let single
+    items be added, replaced or removed without a rebuild. ``version`` is bumped on
+    every mutation so callers can record which snapshot they searched.
+
+    ``index_type`` selects exact search (``flat``) or an approximate backend
+    (``ivf_flat``, ``ivf_pq``, ``hnsw``). IVF types are trained on rebuild; HNSW
+    cannot delete vectors, so removals are tombstoned and compacted away.
+
+    ``dtype`` sets the precision vectors are held at: ``float16`` halves and
+    ``int8`` quarters the memory of the flat, IVF-flat and HNSW backends via
+    FAISS scalar quantizers (IVF-PQ is already compressed and ignores it).
+
+    An index can also be backed by a published snapshot (``load_snapshot``),
+    which is memory-mapped read-only; later upserts then go to a small
+    in-memory delta index and replaced or removed snapshot vectors are
+    tombstoned until the next snapshot.
+
+    Callers may pass the content hash each vector was encoded from; the index
+    remembers it (``indexed_hash``) so rows changed elsewhere can be detected.
+    """
+
+    def __init__(self, name: str, index_type: Optional[str] = None, **params):
+        index_type = index_type or settings.vector_index_type
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown vector index type '{index_type}', expected one of {INDEX_TYPES}")
+        self.name = name
+        self.index_type = index_type
+        self.params = {
+            "nlist": settings.ivf_nlist,
+            "nprobe": settings.ivf_nprobe,
+            "pq_m": settings.pq_m,
+            "hnsw_m": settings.hnsw_m,
+            "ef_construction": settings.hnsw_ef_construction,
+            "ef_search": settings.hnsw_ef_search,
+            "dtype": settings.embedding_dtype,
+        }
+        self.params.update(params)
+        check_dtype(self.params["dtype"])
+        self.built_type: Optional[str] = None
+        self.built_dtype: Optional[str] = None
+        self.version = 0
+        self._lock = threading.RLock()
+        self._index = None
+        self._built = False
+        self._dim: Optional[int] = None
+        self._next_label = 0
+        self._tombstones = 0
+        self._labels = _LabelMap()
+        self._hashes: Dict[int, str] = {}
+        self._delta = None
+        self.snapshot: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, item_id: int) -> bool:
+        return self._labels.label_of(item_id) is not None
+
+    def indexed_hash(self, item_id: int) -> Optional[str]:
+        """Content hash the item's vector was indexed with; None if unknown or not indexed"""
+        content_hash = self._hashes.get(item_id)
+        if content_hash is None and self.snapshot is not None and self.snapshot.get("hashes") is not None:
+            label = self._labels.label_of(item_id)
+            if label is not None and label < self._labels.base_size:
+                content_hash = self.snapshot["hashes"][label].decode() or None
+        return content_hash
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        import faiss
+        vectors = np.array(vectors, dtype='float32', copy=True).reshape(-1, np.shape(vectors)[-1])
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def _effective_type(self, num_vectors: int) -> str:
+        if self.index_type == "ivf_pq" and num_vectors < MIN_PQ_TRAINING_POINTS:
+            return "ivf_flat" if num_vectors >= MIN_IVF_TRAINING_POINTS else "flat"
+        if self.index_type == "ivf_flat" and num_vectors < MIN_IVF_TRAINING_POINTS:
+            return "flat"
+        return self.index_type
+
+    def _effective_dtype(self, index_type: str, num_vectors: int) -> str:
+        if index_type == "ivf_pq":
+            return "pq"
+        if self.params["dtype"] == "int8" and num_vectors < MIN_SQ8_TRAINING_POINTS:
+            return "float16"
+        return self.params["dtype"]
+
+    def _new_index(self, dim: int, training: np.ndarray):
+        """Create (and train, for IVF and int8 types) an empty index sized for ``training``"""
+        import faiss
+        index_type = self._effective_type(len(training))
+        dtype = self._effective_dtype(index_type, len(training))
+        qtype = {"float16": faiss.ScalarQuantizer.QT_fp16, "int8": faiss.ScalarQuantizer.QT_8bit}.get(dtype)
+        if index_type == "flat":
+            if qtype is None:
+                index = faiss.IndexFlatIP(dim)
+            else:
+                index = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_INNER_PRODUCT)
+        elif index_type == "hnsw":
+            if qtype is None:
+                index = faiss.IndexHNSWFlat(dim, self.params["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexHNSWSQ(dim, qtype, self.params["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.params["ef_construction"]
+            index.hnsw.efSearch = self.params["ef_search"]
+        else:
+            # Keep ~39+ training points per list, as FAISS recommends
+            nlist = max(1, min(self.params["nlist"], len(training) // 39))
+            quantizer = faiss.IndexFlatIP(dim)
+            if index_type == "ivf_pq":
+                pq_m = max(m for m in range(1, self.params["pq_m"] + 1) if dim % m == 0)
+                index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+            elif qtype is None:
+                index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, qtype, faiss.METRIC_INNER_PRODUCT)
+            index.nprobe = min(self.params["nprobe"], nlist)
+            # Lets ``score`` reconstruct single vectors by label
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        if not index.is_trained:
+            started = time.perf_counter()
+            index.train(training)
+            logger.info(f"Trained {self.name} {index_type}/{dtype} index on {len(training)} vectors in {time.perf_counter() - started:.2f}s")
+        if index_type in ("flat", "hnsw"):
+            index = faiss.IndexIDMap2(index)
+        self.built_type = index_type
+        self.built_dtype = dtype
+        return index
+
+    @property
+    def _supports_remove(self) -> bool:
+        return self.built_type != "hnsw" and self.snapshot is None
+
+    def _assign_labels(self, item_ids: Sequence[int]) -> np.ndarray:
+        labels = np.arange(self._next_label, self._next_label + len(item_ids), dtype='int64')
+        self._next_label += len(item_ids)
+        for label, item_id in zip(labels.tolist(), item_ids):
+            self._labels.add(label, item_id)
+        return labels
+
+    def _writable_index(self):
+        """The index new vectors go to: the snapshot is read-only, so they land in the delta"""
+        if self.snapshot is None:
+            return self._index
+        if self._delta is None:
+            import faiss
+            self._delta = faiss.IndexIDMap2(faiss.IndexFlatIP(self._dim))
+        return self._delta
+
+    def rebuild(self, item_ids: Sequence[int], vectors: np.ndarray, hashes: Optional[Sequence[Optional[str]]] = None) -> int:
+        """Replace (and retrain) the whole index; returns the new version"""
+        item_ids = list(item_ids)
+        with self._lock:
+            self._labels, self._next_label, self._tombstones = _LabelMap(), 0, 0
+            self._hashes = {i: h for i, h in zip(item_ids, hashes or ()) if h is not None}
+            self._delta, self.snapshot = None, None
+            if not item_ids:
+                self._index, self._dim, self.built_type, self.built_dtype = None, None, None, None
+            else:
+                vectors = self._normalize(vectors)
+                self._dim = vectors.shape[1]
+                self._index = self._new_index(self._dim, vectors)
+                self._index.add_with_ids(vectors, self._assign_labels(item_ids))
+            self._built = True
+            self.version += 1
+            logger.info(f"Rebuilt {self.name} index ({self.built_type}) with {len(item_ids)} vectors (version {self.version})")
+            return self.version
+
+    def upsert(self, item_id: int, vector: np.ndarray, content_hash: Optional[str] = None) -> int:
+        """Add or replace the vector for one item; returns the new version"""
+        with self._lock:
+            vector = self._normalize(vector)
+            if self._index is None:
+                self._dim = vector.shape[1]
+                self._index = self._new_index(self._dim, vector)
+            self._remove_label(item_id)
+            self._writable_index().add_with_ids(vector, self._assign_labels([item_id]))
+            if content_hash is not None:
+                self._hashes[item_id] = content_hash
+            self.version += 1
+            self._maybe_compact()
+            return self.version
+
+    def remove(self, item_id: int) -> int:
+        """Drop one item if present; returns the new version"""
+        with self._lock:
+            if self._remove_label(item_id):
+                self.version += 1
+                self._maybe_compact()
+            return self.version
+
+    def _remove_label(self, item_id: int) -> bool:
+        self._hashes.pop(item_id, None)
+        label = self._labels.pop(item_id)
+        if label is None:
+            return False
+        if self.snapshot is not None and label >= self._labels.base_size:
+            self._delta.remove_ids(np.array([label], dtype='int64'))
+        elif self._supports_remove:
+            self._index.remove_ids(np.array([label], dtype='int64'))
+        else:
+            self._tombstones += 1
+        return True
+
+    def _maybe_compact(self):
+        """
+        Rebuild an HNSW index once tombstoned vectors make up a quarter of it.
+        Snapshot-backed indexes are left alone: the next published snapshot drops them.
+        """
+        if self.snapshot is not None or self._tombstones <= max(64, len(self) // 3):
+            return
+        live = self._labels.items()
+        item_ids = [item_id for item_id, _ in live]
+        vectors = np.vstack([self._reconstruct(label) for _, label in live]) if live else None
+        logger.info(f"Compacting {self.name} index: dropping {self._tombstones} tombstoned vectors")
+        self.rebuild(item_ids, vectors, [self.indexed_hash(item_id) for item_id in item_ids])
+
+    def search(self, query: np.ndarray, k: int, allowed_ids: Optional[Iterable[int]] = None) -> Tuple[List[int], List[float], int]:
+        """
+        Return (item ids, cosine scores, version) for the k nearest items,
+        optionally restricted to ``allowed_ids``. The restriction is pushed into
+        FAISS as an id selector, so the top k is taken over allowed items only.
+        """
+        with self._lock:
+            if self._index is None or not len(self._labels) or k <= 0:
+                return [], [], self.version
+            query = self._normalize(query)[:1]
+            if allowed_ids is not None:
+                return self._search_allowed(query, k, allowed_ids)
+            total = self._index.ntotal + (self._delta.ntotal if self._delta is not None else 0)
+            fetch = min(total, k + self._tombstones)
+            while True:
+                scores, labels = self._search_labels(query, fetch)
+                ids, hits = self._resolve(labels, scores)
+                if len(ids) >= k or fetch >= total:
+                    return ids[:k], hits[:k], self.version
+                fetch = min(total, fetch * 4)
+
+    def _search_allowed(self, query: np.ndarray, k: int, allowed_ids: Iterable[int]) -> Tuple[List[int], List[float], int]:
+        import faiss
+        labels = np.fromiter(
+            (label for label in map(self._labels.label_of, set(allowed_ids)) if label is not None), dtype='int64'
+        )
+        if not len(labels):
+            return [], [], self.version
+        if len(labels) == len(self._labels):
+            # Everything is allowed: a plain search is cheaper than a selector
+            return self.search(query, k)
+        # Removed vectors never carry an allowed label, so there is nothing to over-fetch for
+        fetch = min(k, len(labels))
+        selector = faiss.IDSelectorBatch(labels)
+        scores, found = self._search_labels(query, fetch, selector)
+        ids, hits = self._resolve(found, scores)
+        if len(ids) < fetch:
+            # Approximate backends can exhaust their search before finding enough allowed
+            # vectors under a narrow filter; score the allowed set exactly instead
+            exact = self.score(query, [self._labels.id_of(label) for label in labels.tolist()])
+            best = sorted(exact.items(), key=lambda item: item[1], reverse=True)[:k]
+            ids, hits = [item_id for item_id, _ in best], [score for _, score in best]
+        return ids[:k], hits[:k], self.version
+
+    def _resolve(self, labels: np.ndarray, scores: np.ndarray) -> Tuple[List[int], List[float]]:
+        """Item ids and scores of live labels (drops tombstones and FAISS's -1 padding)"""
+        ids, hits = [], []
+        for label, score in zip(labels.tolist(), scores.tolist()):
+            item_id = self._labels.id_of(label) if label >= 0 else None
+            if item_id is not None:
+                ids.append(item_id)
+                hits.append(score)
+        return ids, hits
+
+    def score(self, query: np.ndarray, item_ids: Iterable[int]) -> Dict[int, float]:
+        """Exact cosine scores of the query against the given items' indexed vectors; unindexed items are skipped"""
+        with self._lock:
+            if self._index is None:
+                return {}
+            query = self._normalize(query)[0]
+            found = [(item_id, self._labels.label_of(item_id)) for item_id in item_ids]
+            found = [(item_id, label) for item_id, label in found if label is not None]
+            if not found:
+                return {}
+            vectors = np.vstack([self._reconstruct(label) for _, label in found])
+            return dict(zip([item_id for item_id, _ in found], (vectors @ query).tolist()))
+
+    def _reconstruct(self, label: int) -> np.ndarray:
+        if self.snapshot is not None and label >= self._labels.base_size:
+            return self._delta.reconstruct(label)
+        return self._index.reconstruct(label)
+
+    def _search_labels(self, query: np.ndarray, fetch: int, selector=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top ``fetch`` (scores, labels) across the main index and, if any, the delta"""
+        scores, labels = self._index.search(query, fetch, params=self._search_params(self._index, selector))
+        if self._delta is None or not self._delta.ntotal:
+            return scores[0], labels[0]
+        delta_scores, delta_labels = self._delta.search(query, min(fetch, self._delta.ntotal), params=self._search_params(self._delta, selector))
+        scores = np.concatenate([scores[0], delta_scores[0]])
+        labels = np.concatenate([labels[0], delta_labels[0]])
+        order = np.argsort(-scores, kind='stable')[:fetch]
+        return scores[order], labels[order]
+
+    @staticmethod
+    def _search_params(index, selector):
+        """Search parameters carrying an id selector; IVF indexes need their nprobe restated"""
+        if selector is None:
+            return None
+        import faiss
+        if hasattr(index, "nprobe"):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+        return faiss.SearchParameters(sel=selector)
+
+    def load_snapshot(self, snapshot: Dict[str, Any]) -> int:
+        """Switch to a loaded snapshot (see ``IndexSnapshots.load``); returns the new version"""
+        with self._lock:
+            meta = snapshot["meta"]
+            self._index = snapshot["index"]
+            self._dim = self._index.d
+            self._labels = _LabelMap(snapshot["ids"], snapshot["sorted_ids"], snapshot["sorted_labels"])
+            self._next_label, self._tombstones, self._delta = len(snapshot["ids"]), 0, None
+            self._hashes = {}
+            self.built_type, self.built_dtype = meta.get("built_type"), meta.get("built_dtype")
+            self.snapshot = snapshot
+            self._built = True
+            self.version += 1
+            logger.info(f"Loaded {self.name} index snapshot {snapshot['generation']} ({len(self)} vectors, version {self.version})")
+            return self.version
+
+    def snapshot_matrix(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        (item ids, normalized vectors, live rows) of the loaded snapshot, the first two memory-mapped;
+        ``live`` is False for rows replaced or removed since it was published. None when not snapshot-backed.
+        """
+        with self._lock:
+            snapshot = self.snapshot
+            if snapshot is None:
+                return None
+            live = np.ones(len(snapshot["ids"]), dtype=bool)
+            live[self._labels.removed_base_labels()] = False
+            return snapshot["ids"], snapshot["vectors"], live
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "index_type": self.index_type,
+                "built_type": self.built_type,
+                "dtype": self.params["dtype"],
+                "built_dtype": self.built_dtype,
+                "size": len(self),
+                "tombstones": self._tombstones,
+                "version": self.version,
+                "memory_bytes": self._memory_bytes(),
+                "snapshot": self.snapshot["generation"] if self.snapshot is not None else None,
+                "snapshot_bytes": self.snapshot["bytes"] if self.snapshot is not None else 0,
+            }
+
+    def _memory_bytes(self) -> int:
+        """Private memory held by the index; a snapshot is shared page cache, so only its delta counts"""
+        import faiss
+        index = self._delta if self.snapshot is not None else self._index
+        return int(faiss.serialize_index(index).nbytes) if index is not None else 0
+
+class ConsultantIndex(VectorIndex):
+    """
+    The consultant index. With VECTOR_INDEX_PATH set, builds are published as
+    on-disk snapshots that every worker memory-maps, and workers switch to a
+    newer snapshot as soon as another process publishes one.
+    """
+
+    def __init__(self, index_type: Optional[str] = None, snapshot_path: Optional[str] = None, **params):
+        super().__init__("consultant", index_type, **params)
+        snapshot_path = settings.vector_index_path if snapshot_path is None else snapshot_path
+        self.snapshots = IndexSnapshots(snapshot_path, self.name) if snapshot_path else None
+
+    def rebuild_from_store(self) -> int:
+        """Full rebuild (and retrain) from the stored consultant embeddings, published as a snapshot if enabled"""
+        with self._lock:
+            if self.snapshots is None:
+                return self._rebuild_from_store()
+            with self.snapshots.lock():
+                return self._rebuild_from_store()
+
+    def _rebuild_from_store(self) -> int:
+        profiles = ConsultantProfile.get_all()
+        item_ids = [p['id'] for p in profiles]
+        hashes = [embedding_store.content_hash(consultant_text_of(p)) for p in profiles]
+        vectors = embedding_store.get_embeddings(profiles)
+        if self.snapshots is None or not item_ids:
+            return self.rebuild(item_ids, vectors, hashes)
+        vectors = self._normalize(vectors)
+        self.rebuild(item_ids, vectors, hashes)
+        meta = {"index_type": self.index_type, "built_type": self.built_type, "built_dtype": self.built_dtype, "model": embedding_store.model_name}
+        matrix = vectors if self.params["dtype"] == "float32" else vectors.astype('float16')
+        generation = self.snapshots.publish(self._index, item_ids, matrix, meta, hashes)
+        # Drop the private copy in favour of the shared, memory-mapped one
+        return self.load_snapshot(self.snapshots.load(generation))
+
+    def sync_snapshot(self) -> bool:
+        """Switch to the currently published snapshot if it is newer than the loaded one"""
+        generation = self.snapshots.current()
+        if generation is None or (self.snapshot is not None and self.snapshot["generation"] == generation):
+            return False
+        self.load_snapshot(self.snapshots.load(generation))
+        return True
+
+    def ensure_built(self) -> int:
+        """Build (or load the published snapshot) once per process; later changes are applied incrementally"""
+        with self._lock:
+            if self.snapshots is None:
+                if not self.is_built:
+                    self._rebuild_from_store()
+                return self.version
+            if self.sync_snapshot() or self.is_built:
+                return self.version
+            with self.snapshots.lock():
+                # Another worker may have published while we waited for the lock
+                if not self.sync_snapshot():
+                    self._rebuild_from_store()
+            return self.version
+
+    def ensure_indexed(self, consultants: List[Any]) -> int:
+        """Index consultants that are missing or whose profile text changed (e.g. rows written by another process)"""
+        with self._lock:
+            self.ensure_built()
+            stale, hashes = [], []
+            for consultant in consultants:
+                consultant_id = consultant_id_of(consultant)
+                if consultant_id is None:
+                    continue
+                content_hash = embedding_store.content_hash(consultant_text_of(consultant))
+                indexed = self.indexed_hash(consultant_id)
+                # Snapshots published before hashes were recorded leave them unknown; those count as current
+                if consultant_id not in self or (indexed is not None and indexed != content_hash):
+                    stale.append(consultant)
+                    hashes.append(content_hash)
+            if stale:
+                vectors = embedding_store.get_embeddings(stale)
+                for consultant, vector, content_hash in zip(stale, vectors, hashes):
+                    super().upsert(consultant_id_of(consultant), vector, content_hash)
+            return self.version
+
+    def upsert(self, item_id: int, vector: np.ndarray, content_hash: Optional[str] = None) -> int:
+        # Until the first build, the build itself picks the change up from the database
+        with self._lock:
+            if not self.is_built:
+                return self.version
+            return super().upsert(item_id, vector, content_hash)
+
+class JobIndex(VectorIndex):
+    """
+    Job description vectors for reverse matching (best jobs for a consultant). Jobs are
+    few next to consultants, so the index lives in process memory. The job create /
+    update / delete hooks keep it current within a process; ``ensure_indexed`` picks up
+    jobs written or deleted by other processes from job_embeddings, which ``refresh``
+    does at most every JOB_INDEX_REFRESH_SECONDS so searches stay in memory.
+    """
+
+    def __init__(self, index_type: Optional[str] = None, **params):
+        super().__init__("job", index_type, **params)
+        self._refreshed_at = 0.0
+        self._refreshing = False
+        self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-index-refresh")
+
+    def rebuild_from_store(self) -> int:
+        with self._lock:
+            jobs = JobDescription.get_all()
+            hashes = [embedding_store.content_hash(job_text_of(job)) for job in jobs]
+            self._refreshed_at = time.monotonic()
+            return self.rebuild([job['id'] for job in jobs], embedding_store.get_job_embeddings(jobs), hashes)
+
+    def ensure_built(self) -> int:
+        with self._lock:
+            if not self.is_built:
+                self.rebuild_from_store()
+            return self.version
+
+    def ensure_indexed(self) -> int:
+        """
+        Bring the index in line with job_embeddings: load new or changed vectors and drop deleted
+        jobs. The database is read without holding the lock, so searches are not held up; jobs the
+        local hooks touch meanwhile are left as the hooks wrote them.
+        """
+        self.ensure_built()
+        with self._lock:
+            indexed = dict(self._hashes)
+        stored = JobEmbedding.get_hashes(embedding_store.model_name)
+        changed = [job_id for job_id, content_hash in stored.items() if indexed.get(job_id) != content_hash]
+        rows = JobEmbedding.get_many(changed)
+        with self._lock:
+            for row in rows:
+                if self.indexed_hash(row['job_id']) == indexed.get(row['job_id']):
+                    super().upsert(row['job_id'], embedding_store.decode(row), row['content_hash'])
+            for job_id, content_hash in indexed.items():
+                if job_id not in stored and self.indexed_hash(job_id) == content_hash:
+                    self.remove(job_id)
+            if changed:
+                logger.info(f"Reconciled job index: {len(changed)} jobs changed in other processes")
+            self._refreshed_at = time.monotonic()
+            return self.version
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= settings.job_index_refresh_seconds
+
+    def refresh(self, force: bool = False) -> int:
+        """``ensure_indexed`` unless the index was reconciled within JOB_INDEX_REFRESH_SECONDS"""
+        if force or self._due():
+            return self.ensure_indexed()
+        return self.version
+
+    def refresh_in_background(self):
+        """Schedule a ``refresh`` on the index's helper thread when one is due; never touches the database itself"""
+        with self._lock:
+            if self._refreshing or not self._due():
+                return
+            self._refreshing = True
+        self._refresher.submit(self._background_refresh)
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Could not refresh the job index: {e}")
+        finally:
+            self._refreshing = False
+
+    def upsert(self, item_id: int, vector: np.ndarray, content_hash: Optional[str] = None) -> int:
+        # Until the first build, the build itself picks the change up from the database
+        with self._lock:
+            if not self.is_built:
+                return self.version
+            return super().upsert(item_id, vector, content_hash)
+
+consultant_index = ConsultantIndex()
+job_index = JobIndex()
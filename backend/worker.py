@@ -0,0 +1,45 @@
+import os
+import sys
+import asyncio
+import signal
+import argparse
+import logging
+
+# Add the project root to the Python path
+# This allows the script to be run from the 'backend' directory or the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.services.agent_service import agent_service
+from backend.services.matching_queue import MatchingWorker
+from backend.services.email_outbox import OutboxSender
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run_worker(concurrency=None, poll_seconds=None, send_email=True):
+    """Warm the models and indexes up, then drain the matching queue (and the email outbox) until SIGINT / SIGTERM"""
+    worker = MatchingWorker(concurrency, poll_seconds)
+    sender = OutboxSender() if send_email else None
+
+    def stop():
+        worker.stop()
+        if sender is not None:
+            sender.stop()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+    sending = asyncio.create_task(sender.run()) if sender is not None else None
+    await asyncio.to_thread(agent_service.warmup)
+    await worker.run()
+    if sending is not None:
+        sender.stop()
+        await sending
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a matching queue worker")
+    parser.add_argument("--concurrency", type=int, help="jobs in flight (defaults to MATCHING_WORKER_CONCURRENCY)")
+    parser.add_argument("--poll-seconds", type=float, dest="poll_seconds", help="idle poll interval (defaults to MATCHING_WORKER_POLL_SECONDS)")
+    parser.add_argument("--no-email", action="store_false", dest="send_email", help="do not run the email outbox sender in this process")
+    args = parser.parse_args()
+    asyncio.run(run_worker(args.concurrency, args.poll_seconds, args.send_email))